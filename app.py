@@ -1,21 +1,27 @@
+import uuid
+
 import streamlit as st
 from dotenv import load_dotenv
-import json
 
 # Import logger
-from src.logger import get_logger
+from src.logger import configure_logging, get_logger
+from src.json_codec import extract_json, loads
+from src.metrics import summary as metrics_summary
 
 # Import workflows
-from src.workflows.conditional_graph_workflow import create_conditional_graph_workflow, get_initial_state as get_conditional_state
-from src.workflows.web_search_workflow import create_web_search_graph, get_initial_state as get_web_search_state
-from src.workflows.simple_chat_workflow import create_simple_chat_graph, get_initial_state as get_chat_state
+from src.workflows.registry import get_workflow, get_initial_state, warm_start
+from src.workflows.checkpointing import get_checkpointer, run_with_resume, thread_id_for
 
-# Get logger
+# Set up logging once per process (later reruns are no-ops) and get logger
+configure_logging()
 logger = get_logger(__name__)
 
 # Load environment variables
 load_dotenv()
 
+# Compile workflows and create clients once per process; later reruns are no-ops
+warm_start()
+
 # Set page config
 st.set_page_config(
     page_title="Graph Search & Visualization",
@@ -39,10 +45,22 @@ def main():
         help="Select the type of processing you want to perform"
     )
     
+    # Checkpoint threads are per browser session, so users asking the same
+    # question never share (or resume) each other's runs
+    session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+    
     # Create the appropriate workflow
+    thread_scope = session_id
     if workflow_type == "Conditional Graph Workflow":
-        graph = create_conditional_graph_workflow()
-        get_state_func = get_conditional_state
+        speculative_search = st.sidebar.checkbox(
+            "Speculative web search",
+            value=False,
+            help="Start the web search while the query is being classified"
+        )
+        workflow_name = "conditional"
+        graph = get_workflow(workflow_name, speculative_search=speculative_search, checkpointer=get_checkpointer())
+        # The two variants have different nodes, so they keep separate checkpoints
+        thread_scope = f"{session_id}:speculative" if speculative_search else session_id
         workflow_description = """
         **Conditional Graph Workflow**: 
         - First checks if your query can generate a graph
@@ -51,8 +69,8 @@ def main():
         - Best for queries that might or might not be suitable for visualization
         """
     elif workflow_type == "Web Search Only":
-        graph = create_web_search_graph()
-        get_state_func = get_web_search_state
+        workflow_name = "web_search"
+        graph = get_workflow(workflow_name, checkpointer=get_checkpointer())
         workflow_description = """
         **Web Search Only**: 
         - Performs web search for your query
@@ -61,8 +79,8 @@ def main():
         - Best for informational queries that don't need visualization
         """
     else:  # Simple Chat
-        graph = create_simple_chat_graph()
-        get_state_func = get_chat_state
+        workflow_name = "simple_chat"
+        graph = get_workflow(workflow_name)
         workflow_description = """
         **Simple Chat**: 
         - Provides a basic chat interface
@@ -73,6 +91,12 @@ def main():
     # Display workflow description
     st.sidebar.markdown(workflow_description)
     
+    show_diagnostics = st.sidebar.checkbox(
+        "Show diagnostics",
+        value=False,
+        help="Per-node latency, LLM tokens, cache hits and payload sizes for this process"
+    )
+    
     # User input
     user_query = st.text_input(
         "Enter your search query:",
@@ -83,11 +107,12 @@ def main():
         if user_query:
             with st.spinner("Processing your request..."):
                 try:
-                    # Create initial state using the appropriate function
-                    initial_state = get_state_func(user_query)
+                    # Create initial state for the selected workflow
+                    initial_state = get_initial_state(workflow_name, user_query)
                     
-                    # Run the workflow
-                    result = graph.invoke(initial_state)
+                    # Run the workflow; retrying a query that failed part-way
+                    # resumes from the failed node instead of starting over
+                    result = run_with_resume(graph, initial_state, thread_id_for(workflow_name, user_query, thread_scope))
                     
                     # Display results
                     st.success("✅ Processing complete!")
@@ -104,12 +129,14 @@ def main():
                         st.info(classification_status)
                         
                         # Show graph if it was generated
-                        if result.get("graph_object") and result["can_generate_graph"] == "Yes":
+                        if result.get("graph_json") and result["can_generate_graph"] == "Yes":
                             st.subheader("📈 Selected Visualization")
                             st.info(f"Graph Type: {result['selected_graph_type']}")
                             
                             st.subheader("📊 Generated Graph")
-                            st.plotly_chart(result["graph_object"], use_container_width=True)
+                            # Checkpointed runs keep only the figure JSON in state;
+                            # Streamlit takes the spec as a dict without rebuilding a Figure
+                            st.plotly_chart(loads(result["graph_json"]), use_container_width=True)
                     
                     elif workflow_type == "Web Search Only":
                         # Show search results
@@ -125,22 +152,27 @@ def main():
                             
                             if result.get("formatted_data"):
                                 st.subheader("Formatted JSON Data")
-                                json_string = result["formatted_data"]
-                                json_string = json_string.strip()
-                                if json_string.startswith("```json"):
-                                    json_string = json_string[7:-3].strip()
-                                try:
-                                    st.json(json.loads(json_string))
-                                except Exception as e:
+                                parsed_data = result.get("parsed_data") or extract_json(result["formatted_data"])
+                                if parsed_data is not None:
+                                    st.json(parsed_data)
+                                else:
                                     st.text("Could not parse formatted data as JSON. Displaying raw string:")
-                                    st.text(json_string)
-                                    logger.error(f"Streamlit app error: {e}")
+                                    st.text(result["formatted_data"])
                         
                 except Exception as e:
                     st.error(f"❌ Error: {str(e)}")
-                    logger.error(f"Streamlit app error: {e}")
+                    logger.error("Streamlit app error: %s", e)
         else:
             st.warning("Please enter a search query.")
+    
+    if show_diagnostics:
+        with st.expander("⏱️ Diagnostics", expanded=True):
+            rows = metrics_summary()
+            if rows:
+                st.dataframe(rows, use_container_width=True)
+                st.caption("Latency percentiles are estimated from histogram buckets; the same data is served at /metrics by src/server.py.")
+            else:
+                st.text("No workflow runs recorded yet.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1 @@
+"""Microbenchmarks for the parsing and rendering hot paths; see benchmarks/run.py."""
@@ -0,0 +1,42 @@
+"""
+Synthetic column-oriented payloads in the shape chat_with_search produces:
+
+    {"col_names": [...], "<col>": {"dtype": ..., "values": [...]}, ...}
+
+The first column holds numeric-looking string labels (usable as categories
+and, for scatterplots, as x values); the rest are numeric. Every other numeric
+column is declared as a float, and the others hold formatted strings
+("$1,234.50", "12.5%", "3.4M") without a dtype, so both the vectorized and
+the per-value parsing paths are exercised.
+"""
+
+import random
+from typing import Any, Dict, List
+
+_FORMATS = ("${:,.2f}", "{:.1f}%", "{:.1f}M", "{:,.0f}")
+
+
+def make_values(rows: int, formatted: bool, seed: int = 0) -> List[Any]:
+    """`rows` random numbers, as floats or as formatted strings."""
+    rng = random.Random(seed)
+    values = [rng.uniform(0, 10000) for _ in range(rows)]
+    if not formatted:
+        return [round(value, 2) for value in values]
+    template = _FORMATS[seed % len(_FORMATS)]
+    return [template.format(value) for value in values]
+
+
+def make_payload(rows: int, columns: int, seed: int = 0) -> Dict[str, Any]:
+    """A table of `rows` rows: one label column plus `columns - 1` numeric ones."""
+    names = ["label"] + [f"series_{index}" for index in range(1, columns)]
+    payload: Dict[str, Any] = {
+        "col_names": names,
+        "label": {"dtype": "str", "values": [str(1000 + row) for row in range(rows)]},
+    }
+    for index, name in enumerate(names[1:], 1):
+        formatted = index % 2 == 0
+        column = {"values": make_values(rows, formatted, seed + index)}
+        if not formatted:
+            column["dtype"] = "float"
+        payload[name] = column
+    return payload
@@ -0,0 +1,274 @@
+"""
+Microbenchmarks for the parsing and rendering hot paths.
+
+    python -m benchmarks.run                          # full matrix, print results
+    python -m benchmarks.run --quick --save-baseline  # record benchmarks/baseline.json
+    python -m benchmarks.run --compare                # exit 1 on regressions
+
+Cases, each over synthetic payloads (benchmarks/payloads.py) of 10 to 100k
+rows and a few to many columns:
+
+    to_float               per-value parsing of one formatted-string column
+    coerce_column          vectorized parsing of the same column
+    parse_data_for_graph   JSON string -> (columns, rows)
+    create_graph/<chart>   table -> Plotly figure, for every registered chart
+    graph_renderer/<chart> the renderer node (figure cache miss + to_json)
+
+Each case reports the best per-call time over `--repeat` timed runs and the
+peak memory allocated during one extra run traced with tracemalloc. Baselines
+are machine-specific; record one on the machine you compare on.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from benchmarks.payloads import make_payload
+from src import figure_cache
+from src.charts import available_charts
+from src.coercion import coerce_column
+from src.figure_cache import FigureCache
+from src.logger import configure_logging
+from src.nodes.graph_renderer import create_graph, graph_renderer_node, parse_data_for_graph, to_float
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_ROWS = (10, 1000, 10000, 100000)
+QUICK_ROWS = (10, 1000, 10000)
+DEFAULT_COLUMNS = (3, 12)
+
+# A case regresses when it is slower (or allocates more) than the baseline by
+# more than the threshold ratio *and* the absolute difference is above the
+# noise floor, so microsecond jitter on tiny inputs does not fail a run.
+DEFAULT_TIME_THRESHOLD = 0.2
+DEFAULT_MEMORY_THRESHOLD = 0.2
+MIN_TIME_DELTA = 0.0005
+MIN_MEMORY_DELTA = 64 * 1024
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+@contextmanager
+def cold_figure_cache() -> Iterator[None]:
+    """Route renders through a figure cache that never holds anything, so every call is a miss."""
+    previous = figure_cache._figure_cache
+    figure_cache._figure_cache = FigureCache(max_entries=0, max_memory_bytes=0)
+    try:
+        yield
+    finally:
+        figure_cache._figure_cache = previous
+
+
+def cases_for(rows: int, columns: int, charts: Iterable[str]) -> List[Case]:
+    """All benchmark cases for one payload size."""
+    payload = make_payload(rows, columns)
+    payload_json = json.dumps(payload)
+    # Column 2 holds formatted strings without a dtype
+    formatted = payload["series_2"]["values"] if columns > 2 else [str(value) for value in payload["series_1"]["values"]]
+    suffix = f"rows={rows}/cols={columns}"
+
+    cases: List[Case] = [
+        (f"to_float/{suffix}", lambda: [to_float(value) for value in formatted]),
+        (f"coerce_column/{suffix}", lambda: coerce_column(formatted)),
+        (f"parse_data_for_graph/{suffix}", lambda: parse_data_for_graph(payload_json)),
+    ]
+    for chart in charts:
+        state = {
+            "selected_graph_type": chart,
+            "formatted_data": payload_json,
+            "parsed_data": payload,
+            "user_query": "benchmark",
+            "selected_columns": [],
+        }
+        cases.append((f"create_graph/{chart}/{suffix}", lambda chart=chart: create_graph(chart, payload, "benchmark")))
+        cases.append((f"graph_renderer/{chart}/{suffix}", lambda state=state: graph_renderer_node(state)))
+    return cases
+
+
+def _time(func: Callable[[], Any], number: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        return time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def measure(func: Callable[[], Any], repeat: int = 3, min_time: float = 0.2) -> Dict[str, Any]:
+    """
+    Best per-call time over `repeat` runs, each of `number` calls (calibrated
+    so a run lasts at least `min_time / repeat` seconds), and the peak traced
+    allocation of a single call.
+    """
+    number = 1
+    elapsed = _time(func, number)
+    target = min_time / repeat
+    while elapsed < target and number < 1_000_000:
+        number *= 10 if elapsed < target / 10 else 2
+        elapsed = _time(func, number)
+    timings = [elapsed] + [_time(func, number) for _ in range(repeat - 1)]
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time_s": min(timings) / number, "peak_bytes": peak, "number": number, "repeat": repeat}
+
+
+def run_suite(
+    rows: Iterable[int] = DEFAULT_ROWS,
+    columns: Iterable[int] = DEFAULT_COLUMNS,
+    charts: Optional[Iterable[str]] = None,
+    name_filter: str = "",
+    repeat: int = 3,
+    min_time: float = 0.2,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Run every case matching `name_filter`; returns results keyed by case name."""
+    charts = list(charts or available_charts())
+    results = {}
+    with cold_figure_cache():
+        for row_count in rows:
+            for column_count in columns:
+                for name, func in cases_for(row_count, column_count, charts):
+                    if name_filter and name_filter not in name:
+                        continue
+                    results[name] = measure(func, repeat=repeat, min_time=min_time)
+                    if progress is not None:
+                        progress(name, results[name])
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    time_threshold: float = DEFAULT_TIME_THRESHOLD,
+    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> List[str]:
+    """Describe every case that regressed against `baseline`; cases missing from either side are skipped."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        time_delta = result["time_s"] - base["time_s"]
+        if time_delta > MIN_TIME_DELTA and result["time_s"] > base["time_s"] * (1 + time_threshold):
+            regressions.append(
+                f"{name}: time {_format_time(base['time_s'])} -> {_format_time(result['time_s'])} "
+                f"(+{time_delta / base['time_s']:.0%})"
+            )
+        memory_delta = result["peak_bytes"] - base["peak_bytes"]
+        if memory_delta > MIN_MEMORY_DELTA and result["peak_bytes"] > base["peak_bytes"] * (1 + memory_threshold):
+            regressions.append(
+                f"{name}: peak memory {_format_bytes(base['peak_bytes'])} -> {_format_bytes(result['peak_bytes'])} "
+                f"(+{memory_delta / max(base['peak_bytes'], 1):.0%})"
+            )
+    return regressions
+
+
+def _format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
+
+
+def _print_result(name: str, result: Dict[str, Any]) -> None:
+    print(f"{name:<60} {_format_time(result['time_s']):>10} {_format_bytes(result['peak_bytes']):>10}", flush=True)
+
+
+def _document(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(value) for value in text.split(",") if value]
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark parsing and rendering hot paths.")
+    parser.add_argument("--rows", type=_int_list, help="Comma-separated row counts (default 10,1000,10000,100000)")
+    parser.add_argument("--columns", type=_int_list, default=list(DEFAULT_COLUMNS), help="Comma-separated column counts")
+    parser.add_argument("--charts", type=lambda text: text.split(","), help="Comma-separated chart types (default all)")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="Skip the 100k-row payloads")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds to spend timing each case")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE_PATH, help="Write results as the baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE_PATH, help="Fail on regressions against this baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_TIME_THRESHOLD, help="Allowed slowdown ratio")
+    parser.add_argument("--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD, help="Allowed peak memory growth ratio")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    baseline = None
+    if args.compare:
+        if not os.path.exists(args.compare):
+            parser.error(f"no baseline at {args.compare}; record one first with --save-baseline")
+        # Read before any results are written, so --save-baseline --compare
+        # compares against the previous baseline rather than this run
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    configure_logging(level="WARNING")
+    rows = args.rows or (QUICK_ROWS if args.quick else DEFAULT_ROWS)
+    print(f"{'case':<60} {'time':>10} {'peak mem':>10}")
+    results = run_suite(
+        rows=rows,
+        columns=args.columns,
+        charts=args.charts,
+        name_filter=args.filter,
+        repeat=args.repeat,
+        min_time=args.min_time,
+        progress=_print_result,
+    )
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(_document(results), f, indent=2, sort_keys=True)
+        print(f"Wrote {len(results)} results to {path}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+        compared = sum(1 for name in results if name in baseline)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"No regressions in {compared} cases compared against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,244 @@
+"""
+Batch runner: pre-generate charts for many queries through the conditional workflow.
+
+    python -m src.batch queries.jsonl --out-dir batch_output --max-concurrency 8
+
+Each input line is a JSON object with a "query" (or "user_query") and an
+optional "id"; a bare JSON string is also accepted. Results stream to
+`<out-dir>/results.jsonl` as queries finish, and each rendered figure is
+written to `<out-dir>/figures/<id>.json` as Plotly JSON. Re-running with the
+same output directory skips queries that already completed.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.json_codec import JSONDecodeError, dumps, loads
+from src.logger import configure_logging, get_logger
+from src.search_cache import normalize_query
+from src.utils import load_config_section
+
+logger = get_logger(__name__)
+
+# Defaults for the batch runner, overridable from the `batch` section of
+# llm_config.yaml.
+DEFAULT_BATCH_CONFIG = {
+    "max_concurrency": 8,
+}
+
+RESULTS_FILE = "results.jsonl"
+FIGURES_DIR = "figures"
+
+OK = "ok"
+NO_GRAPH = "no_graph"
+ERROR = "error"
+# Statuses that count as done when resuming; errors are retried.
+DONE_STATUSES = {OK, NO_GRAPH}
+
+_UNSAFE_ID_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def query_id(query: str) -> str:
+    """Stable id for a query without an explicit one."""
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()[:16]
+
+
+def _safe_id(raw_id: str) -> str:
+    """
+    Make `raw_id` usable as a file name. Ids that need sanitizing get a short
+    hash of the original appended, so "a/1" and "a_1" stay distinct.
+    """
+    sanitized = _UNSAFE_ID_RE.sub("_", raw_id)
+    if sanitized == raw_id:
+        return raw_id
+    return f"{sanitized}-{hashlib.sha256(raw_id.encode('utf-8')).hexdigest()[:8]}"
+
+
+def read_queries(path: str) -> List[Dict[str, str]]:
+    """
+    Read {"id", "query"} records from a JSONL file, skipping blank lines and
+    duplicate ids.
+    """
+    records = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = loads(line)
+            if isinstance(record, str):
+                record = {"query": record}
+            query = record.get("query") or record.get("user_query")
+            if not query:
+                raise ValueError(f"{path}:{line_number}: missing 'query'")
+            record_id = _safe_id(str(record.get("id") or query_id(query)))
+            if record_id in seen:
+                continue
+            seen.add(record_id)
+            records.append({"id": record_id, "query": query})
+    return records
+
+
+def completed_ids(results_path: str) -> Set[str]:
+    """Ids already finished in an existing results file (a torn last line is ignored)."""
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = loads(line)
+            except JSONDecodeError:
+                continue
+            if isinstance(record, dict) and record.get("status") in DONE_STATUSES:
+                done.add(record["id"])
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    """Whether `path` is empty or ends in a newline (a crash can leave a torn last line)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _write_atomic(path: str, text: str) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def _result_record(record: Dict[str, str], output: Any, elapsed: Optional[float], figures_dir: str) -> Dict[str, Any]:
+    result = {"id": record["id"], "query": record["query"]}
+    if elapsed is not None:
+        result["elapsed_ms"] = round(elapsed * 1000, 1)
+    if isinstance(output, Exception):
+        result.update(status=ERROR, error=f"{type(output).__name__}: {output}")
+        return result
+
+    result["can_generate_graph"] = output.get("can_generate_graph")
+    graph_json = output.get("graph_json")
+    if output.get("can_generate_graph") != "Yes" or not graph_json:
+        result.update(status=NO_GRAPH, response=output.get("response", ""))
+        return result
+
+    figure_path = os.path.join(figures_dir, f"{record['id']}.json")
+    _write_atomic(figure_path, graph_json)
+    result.update(
+        status=OK,
+        graph_type=output.get("selected_graph_type"),
+        columns=output.get("selected_columns"),
+        figure_path=os.path.relpath(figure_path, os.path.dirname(figures_dir)),
+    )
+    return result
+
+
+def run_batch(
+    records: Iterable[Dict[str, str]],
+    out_dir: str,
+    max_concurrency: int = DEFAULT_BATCH_CONFIG["max_concurrency"],
+    graph=None,
+    speculative_search: bool = False,
+) -> Dict[str, int]:
+    """
+    Run `records` through the conditional workflow with at most
+    `max_concurrency` queries in flight, streaming one result line per query
+    as it completes. Queries already completed in `out_dir` are skipped.
+
+    `graph` defaults to the shared compiled conditional workflow (with
+    intermediates dropped to keep memory flat). Returns per-status counts.
+    """
+    from src.workflows.registry import get_initial_state, get_workflow
+
+    if graph is None:
+        graph = get_workflow("conditional", speculative_search=speculative_search, drop_intermediates=True)
+
+    figures_dir = os.path.join(out_dir, FIGURES_DIR)
+    os.makedirs(figures_dir, exist_ok=True)
+    results_path = os.path.join(out_dir, RESULTS_FILE)
+
+    records = list(records)
+    done = completed_ids(results_path)
+    pending = [record for record in records if record["id"] not in done]
+    counts = {OK: 0, NO_GRAPH: 0, ERROR: 0, "skipped": len(records) - len(pending)}
+    if not pending:
+        logger.info("Nothing to do: all queries already have results in %s", results_path)
+        return counts
+    logger.info("Running %s queries (%s already done), max_concurrency=%s", len(pending), counts['skipped'], max_concurrency)
+
+    # Per-query wall time, measured by run listeners keyed on the batch index
+    started: Dict[int, float] = {}
+    elapsed: Dict[int, float] = {}
+    timing_lock = threading.Lock()
+
+    def on_start(run):
+        with timing_lock:
+            started[run.metadata["batch_index"]] = time.perf_counter()
+
+    def on_end(run):
+        index = run.metadata["batch_index"]
+        with timing_lock:
+            elapsed[index] = time.perf_counter() - started.get(index, time.perf_counter())
+
+    timed_graph = graph.with_listeners(on_start=on_start, on_end=on_end, on_error=on_end)
+    inputs = [get_initial_state("conditional", record["query"]) for record in pending]
+    configs = [
+        {"max_concurrency": max_concurrency, "metadata": {"batch_index": index}, "run_name": "batch_query"}
+        for index in range(len(pending))
+    ]
+
+    batch_started = time.perf_counter()
+    with open(results_path, "a", encoding="utf-8") as results_file:
+        if not _ends_with_newline(results_path):
+            results_file.write("\n")
+        for index, output in timed_graph.batch_as_completed(inputs, configs, return_exceptions=True):
+            record = pending[index]
+            try:
+                result = _result_record(record, output, elapsed.get(index), figures_dir)
+            except OSError as e:
+                result = {"id": record["id"], "query": record["query"], "status": ERROR, "error": f"OSError: {e}"}
+            counts[result["status"]] += 1
+            results_file.write(dumps(result) + "\n")
+            results_file.flush()
+            if result["status"] == ERROR:
+                logger.warning("Query %s failed: %s", record['id'], result['error'])
+
+    logger.info(
+        "Batch finished in %.1fs: %s ok, %s without graph, %s failed",
+        time.perf_counter() - batch_started, counts[OK], counts[NO_GRAPH], counts[ERROR],
+    )
+    return counts
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    configure_logging()
+    settings = {**DEFAULT_BATCH_CONFIG, **load_config_section("batch")}
+    parser = argparse.ArgumentParser(description="Pre-generate charts for a JSONL file of queries.")
+    parser.add_argument("queries", help="JSONL file with one {\"query\": ..., \"id\": ...} per line")
+    parser.add_argument("--out-dir", default="batch_output", help="Directory for results.jsonl and figures/")
+    parser.add_argument("--max-concurrency", type=int, default=settings["max_concurrency"])
+    parser.add_argument("--speculative-search", action="store_true", help="Search while classifying")
+    args = parser.parse_args(argv)
+    if args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+
+    counts = run_batch(
+        read_queries(args.queries),
+        args.out_dir,
+        max_concurrency=args.max_concurrency,
+        speculative_search=args.speculative_search,
+    )
+    return 1 if counts[ERROR] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,11 @@
+# Chart rendering: columnar data model, chart registry and builders
+from src.charts.columnar import ColumnarData, parse_columnar_data
+from src.charts.registry import (
+    ChartSpec,
+    available_charts,
+    build_chart,
+    get_chart,
+    register_chart,
+    resolve_chart,
+)
+import src.charts.builders  # noqa: F401  (registers the built-in chart types)
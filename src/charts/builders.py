@@ -0,0 +1,100 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from src.charts.columnar import ColumnarData
+from src.charts.downsample import downsample, get_render_settings
+from src.charts.registry import new_figure, register_chart
+
+
+def _xy_titles(table: ColumnarData) -> dict:
+    return {"xaxis_title": table.columns[0], "yaxis_title": table.columns[1]}
+
+
+@register_chart("bar_graph", fallback=None, description="categorical data with numerical values")
+def build_bar_graph(table: ColumnarData, title: str) -> go.Figure:
+    x = table.columns[0]
+    y = table.columns[1]
+    return new_figure([go.Bar(x=table.labels(x), y=table.numeric(y))], title, **_xy_titles(table))
+
+
+def _series_bars(table: ColumnarData) -> list:
+    categories = table.labels(table.columns[0])
+    return [go.Bar(name=col, x=categories, y=table.numeric(col)) for col in table.columns[1:]]
+
+
+@register_chart("stacked_bar_chart", min_columns=3, description="parts of a whole across categories")
+def build_stacked_bar_chart(table: ColumnarData, title: str) -> go.Figure:
+    return new_figure(_series_bars(table), title, xaxis_title=table.columns[0], yaxis_title="Value", barmode='stack')
+
+
+@register_chart("multi_bar_graph", min_columns=3, description="multiple series side by side across categories")
+def build_multi_bar_graph(table: ColumnarData, title: str) -> go.Figure:
+    return new_figure(_series_bars(table), title, xaxis_title=table.columns[0], yaxis_title="Value", barmode='group')
+
+
+@register_chart("pie_chart", description="proportions/percentages of a whole")
+def build_pie_chart(table: ColumnarData, title: str) -> go.Figure:
+    return new_figure([go.Pie(labels=table.labels(table.columns[0]), values=table.numeric(table.columns[1]))], title)
+
+
+@register_chart("line_graph", description="time series or continuous data")
+def build_line_graph(table: ColumnarData, title: str) -> go.Figure:
+    x = table.labels(table.columns[0])
+    y = table.numeric(table.columns[1])
+    settings = get_render_settings()
+    meta = {}
+    if len(y) > settings["line_max_points"]:
+        method = settings["line_downsample_method"]
+        keep = downsample(y, settings["line_max_points"], method)
+        meta["downsampling"] = {"method": method, "original_points": len(y), "rendered_points": len(keep)}
+        x, y = x[keep], y[keep]
+    # Markers only help when individual points are distinguishable
+    mode = 'lines' if meta else 'lines+markers'
+    fig = new_figure([go.Scatter(x=x, y=y, mode=mode)], title, **_xy_titles(table))
+    if meta:
+        fig.update_layout(meta=meta)
+    return fig
+
+
+@register_chart("scatterplot", description="relationship between two numerical variables")
+def build_scatterplot(table: ColumnarData, title: str) -> go.Figure:
+    x = table.numeric(table.columns[0])
+    y = table.numeric(table.columns[1])
+    if len(x) > get_render_settings()["scatter_webgl_threshold"]:
+        fig = new_figure([go.Scattergl(x=x, y=y, mode='markers')], title, **_xy_titles(table))
+        fig.update_layout(meta={"webgl": True, "original_points": len(x)})
+        return fig
+    return new_figure([go.Scatter(x=x, y=y, mode='markers')], title, **_xy_titles(table))
+
+
+@register_chart("histogram", min_columns=1, description="distribution of a numerical variable")
+def build_histogram(table: ColumnarData, title: str) -> go.Figure:
+    value_columns = table.columns[1:] or table.columns
+    traces = [go.Histogram(name=col, x=table.numeric(col)) for col in value_columns]
+    return new_figure(
+        traces, title,
+        xaxis_title=value_columns[0] if len(value_columns) == 1 else "Value",
+        yaxis_title="Count",
+        barmode='overlay' if len(traces) > 1 else None,
+    )
+
+
+@register_chart("area_chart", fallback="line_graph", description="cumulative totals or composition over time")
+def build_area_chart(table: ColumnarData, title: str) -> go.Figure:
+    x = table.labels(table.columns[0])
+    traces = [
+        go.Scatter(name=col, x=x, y=table.numeric(col), mode='lines', stackgroup='one')
+        for col in table.columns[1:]
+    ]
+    yaxis_title = table.columns[1] if len(traces) == 1 else "Value"
+    return new_figure(traces, title, xaxis_title=table.columns[0], yaxis_title=yaxis_title)
+
+
+@register_chart("heatmap", min_columns=3, description="matrix of values across categories and series")
+def build_heatmap(table: ColumnarData, title: str) -> go.Figure:
+    series = table.columns[1:]
+    z = np.vstack([table.numeric(col) for col in series])
+    return new_figure(
+        [go.Heatmap(z=z, x=table.labels(table.columns[0]), y=series, colorscale='Viridis')],
+        title, xaxis_title=table.columns[0],
+    )
@@ -0,0 +1,98 @@
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from src.coercion import coerce_column
+from src.json_codec import extract_json
+from src.logger import get_logger, payload
+
+logger = get_logger(__name__)
+
+
+class ColumnarData:
+    """
+    Column-oriented table for rendering. Each column keeps its raw values as a
+    NumPy object array; numeric (float64) and label (str) views are built once
+    per column with vectorized coercion and cached. Cells that could not be
+    parsed as numbers are NaN and listed per column in `coercion_failures`.
+    """
+
+    def __init__(self, columns: List[str], raw: Dict[str, np.ndarray], dtypes: Optional[Dict[str, str]] = None):
+        self.columns = columns
+        self.raw = raw
+        self.dtypes = dtypes or {}
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._labels: Dict[str, np.ndarray] = {}
+        self.coercion_failures: Dict[str, List[int]] = {}
+
+    @property
+    def num_columns(self) -> int:
+        return len(self.columns)
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.raw[self.columns[0]]) if self.columns else 0
+
+    def numeric(self, column: str) -> np.ndarray:
+        """Float64 view of a column honouring its declared dtype; unparseable cells are NaN."""
+        if column not in self._numeric:
+            result = coerce_column(self.raw[column], self.dtypes.get(column))
+            if result.failed:
+                self.coercion_failures[column] = result.failed
+                logger.warning("Could not parse %s value(s) in column %r: rows %s", len(result.failed), column, result.failed[:20])
+            self._numeric[column] = result.values
+        return self._numeric[column]
+
+    def labels(self, column: str) -> np.ndarray:
+        """String view of a column, for categorical axes and pie labels."""
+        if column not in self._labels:
+            self._labels[column] = self.raw[column].astype(str)
+        return self._labels[column]
+
+    def rows(self) -> List[list]:
+        """Materialise the table as a list of row lists."""
+        return [list(row) for row in zip(*(self.raw[column] for column in self.columns))]
+
+
+def parse_columnar_data(formatted_data: Union[str, dict], selected_columns=None, min_columns: int = 2) -> Optional[ColumnarData]:
+    """
+    Parses extracted data (a JSON string or an already-decoded dict) into a
+    ColumnarData table, using only selected columns if provided.
+    `min_columns` is the fewest columns the caller can render.
+    """
+    try:
+        data = extract_json(formatted_data)
+        if data is None:
+            raise ValueError("no JSON object found")
+        # Defensive: strip whitespace from all keys
+        if any(k.strip() != k for k in data.keys()):
+            data = {k.strip(): v for k, v in data.items()}
+        # Use only selected columns if provided
+        if selected_columns and isinstance(selected_columns, list) and len(selected_columns) >= min_columns:
+            columns = selected_columns
+            logger.info("Using selected columns for graph: %s", columns)
+        elif "col_names" in data:
+            columns = data.get("col_names", [])
+            logger.info("Using all columns from col_names: %s", columns)
+        else:
+            columns = list(data.keys())
+            logger.info("Using all columns from keys: %s", columns)
+        if not columns or len(columns) < min_columns:
+            return None
+        # Build one array per column from the column-oriented JSON
+        num_rows = len(data.get(columns[0], {}).get("values", []))
+        raw = {}
+        dtypes = {}
+        for col in columns:
+            values = data.get(col, {}).get("values", [])
+            if len(values) < num_rows:
+                raise IndexError(f"column {col!r} has {len(values)} values, expected {num_rows}")
+            column = np.empty(num_rows, dtype=object)
+            column[:] = values[:num_rows]
+            raw[col] = column
+            dtypes[col] = data.get(col, {}).get("dtype", "")
+        logger.info("Parsed data: %s columns, %s rows", len(columns), num_rows)
+        return ColumnarData(columns, raw, dtypes)
+    except (ValueError, IndexError, KeyError, AttributeError) as e:
+        logger.error("Error parsing JSON data for graph: %r | Error: %s", payload(formatted_data), e)
+        return None
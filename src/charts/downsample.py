@@ -0,0 +1,80 @@
+from functools import lru_cache
+
+import numpy as np
+
+from src.utils import load_config_section
+
+# Defaults for size-aware rendering, overridable from the `rendering`
+# section of llm_config.yaml.
+DEFAULT_RENDER_CONFIG = {
+    "line_max_points": 2000,
+    "line_downsample_method": "lttb",
+    "scatter_webgl_threshold": 1000,
+}
+
+
+@lru_cache(maxsize=None)
+def get_render_settings() -> dict:
+    """Return the merged `rendering` configuration."""
+    return {**DEFAULT_RENDER_CONFIG, **load_config_section("rendering")}
+
+
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: pick `n_out` point indices that preserve
+    the visual shape of the series. x is taken as the row position, so the
+    method also works for categorical or date-string axes.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        avg_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[previous] - avg_x) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+    return indices
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Min/max decimation: keep the lowest and highest point of each of
+    `n_out // 2` equal buckets, so peaks and troughs survive.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(np.int64)
+    picks = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        bucket = y[start:end]
+        picks.append(start + int(np.argmin(bucket)))
+        picks.append(start + int(np.argmax(bucket)))
+    return np.unique(picks)
+
+
+DOWNSAMPLERS = {"lttb": lttb_indices, "minmax": minmax_indices}
+
+
+def downsample(y: np.ndarray, max_points: int, method: str = "lttb") -> np.ndarray:
+    """Return the row indices to plot for a series of length len(y)."""
+    return DOWNSAMPLERS.get(method, lttb_indices)(y, max_points)
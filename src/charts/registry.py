@@ -0,0 +1,99 @@
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from src.charts.columnar import ColumnarData
+
+ChartBuilder = Callable[[ColumnarData, str], go.Figure]
+
+DEFAULT_CHART = "bar_graph"
+
+
+class ChartSpec:
+    """
+    A registered chart type: its builder plus the column requirements the
+    builder relies on. When a table has fewer than `min_columns` columns the
+    renderer uses the `fallback` chart type instead.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        builder: ChartBuilder,
+        min_columns: int = 2,
+        fallback: Optional[str] = DEFAULT_CHART,
+        description: str = "",
+    ):
+        self.name = name
+        self.builder = builder
+        self.min_columns = min_columns
+        self.fallback = fallback
+        self.description = description
+
+    def supports(self, table: ColumnarData) -> bool:
+        return table.num_columns >= self.min_columns
+
+    def build(self, table: ColumnarData, title: str) -> go.Figure:
+        return self.builder(table, title)
+
+    def __repr__(self) -> str:
+        return f"ChartSpec(name={self.name!r}, min_columns={self.min_columns})"
+
+
+_CHART_REGISTRY: Dict[str, ChartSpec] = {}
+
+
+def register_chart(name: str, min_columns: int = 2, fallback: Optional[str] = DEFAULT_CHART, description: str = ""):
+    """
+    Decorator registering a builder `(table, title) -> go.Figure` under `name`.
+    """
+    def decorator(builder: ChartBuilder) -> ChartBuilder:
+        _CHART_REGISTRY[name] = ChartSpec(name, builder, min_columns, fallback, description)
+        return builder
+    return decorator
+
+
+def get_chart(name: str) -> ChartSpec:
+    """Return the spec for `name`, or the default bar chart for unknown types."""
+    return _CHART_REGISTRY.get(name) or _CHART_REGISTRY[DEFAULT_CHART]
+
+
+def available_charts() -> List[str]:
+    """Names of all registered chart types."""
+    return list(_CHART_REGISTRY)
+
+
+def resolve_chart(name: str, table: ColumnarData) -> ChartSpec:
+    """
+    Return the spec to render `table` with, following fallbacks when the
+    requested chart's column requirements are not met.
+    """
+    spec = get_chart(name)
+    seen = set()
+    while not spec.supports(table) and spec.fallback and spec.name not in seen:
+        seen.add(spec.name)
+        spec = get_chart(spec.fallback)
+    return spec
+
+
+def build_chart(name: str, table: ColumnarData, title: str) -> go.Figure:
+    """Build a figure for a parsed table; usable directly for per-type benchmarks."""
+    return resolve_chart(name, table).build(table, title)
+
+
+@lru_cache(maxsize=None)
+def layout_template() -> go.layout.Template:
+    """
+    The resolved default Plotly template, looked up once per process and
+    shared by every figure instead of being re-resolved per render.
+    """
+    return pio.templates[pio.templates.default]
+
+
+def new_figure(traces: list, title: str, **layout) -> go.Figure:
+    """Create a figure on the cached template with the given title and layout settings."""
+    fig = go.Figure(data=traces, layout=go.Layout(template=layout_template()))
+    fig.update_layout(title=title, **layout)
+    return fig
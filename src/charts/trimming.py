@@ -0,0 +1,84 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.coercion import coerce_column
+from src.utils import load_config_section
+
+# Defaults for Top-N + "Others" aggregation, overridable from the `trimming`
+# section of llm_config.yaml.
+DEFAULT_TRIMMING_CONFIG = {
+    "enabled": True,
+    "top_n": 10,
+    "min_share": 0.02,
+    "others_label": "Others",
+    "chart_types": ["pie_chart"],
+}
+
+
+def get_trimming_settings() -> dict:
+    """Return the merged `trimming` configuration."""
+    return {**DEFAULT_TRIMMING_CONFIG, **load_config_section("trimming")}
+
+
+def trim_categories(
+    data: Dict[str, Any],
+    columns: List[str],
+    top_n: int = 10,
+    min_share: float = 0.0,
+    others_label: str = "Others",
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Keep the largest categories and fold the rest into one `others_label` row.
+
+    `columns[0]` is the category column and every later column a numeric
+    series. Categories are ranked by their total across all series; a
+    category is kept if it ranks within `top_n` and its share of the grand
+    total is at least `min_share`. The dropped rows are summed per series in
+    a single vectorized reduction, so the series must be additive (shares,
+    counts, amounts); series mixing positive and negative values are never
+    folded, since their tails would cancel out.
+
+    Returns the trimmed column-oriented data (same format as the extraction
+    output, limited to `columns`) and a summary of what was folded, or the
+    original data and None when there is nothing worth folding.
+    """
+    categories = np.asarray(data[columns[0]].get("values", []), dtype=object)
+    series = columns[1:]
+    if not series or len(categories) == 0:
+        return data, None
+    matrix = np.vstack([
+        coerce_column(data[col].get("values", [])[:len(categories)], data[col].get("dtype")).values
+        for col in series
+    ])
+    if (np.nanmin(matrix, initial=0.0) < 0) and (np.nanmax(matrix, initial=0.0) > 0):
+        return data, None
+    totals = np.nansum(np.abs(matrix), axis=0)
+    grand_total = totals.sum()
+
+    order = np.argsort(-totals, kind="stable")
+    keep = np.zeros(len(categories), dtype=bool)
+    keep[order[:top_n]] = True
+    if min_share and grand_total > 0:
+        keep &= totals / grand_total >= min_share
+
+    dropped = int((~keep).sum())
+    if dropped < 2:
+        return data, None
+
+    others = np.nansum(matrix[:, ~keep], axis=1)
+    trimmed = {"col_names": list(columns)}
+    trimmed[columns[0]] = {
+        "dtype": data[columns[0]].get("dtype", "str"),
+        "values": categories[keep].tolist() + [others_label],
+    }
+    for i, col in enumerate(series):
+        trimmed[col] = {"dtype": "float", "values": matrix[i, keep].tolist() + [float(others[i])]}
+
+    summary = {
+        "original_categories": len(categories),
+        "kept_categories": int(keep.sum()),
+        "folded_categories": dropped,
+        "others_label": others_label,
+    }
+    return trimmed, summary
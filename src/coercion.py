@@ -0,0 +1,224 @@
+import math
+import re
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+NUMERIC_DTYPES = {"int", "float", "integer", "number", "double"}
+INTEGER_DTYPES = {"int", "integer"}
+
+SCALE_SUFFIXES = {
+    "k": 1e3, "thousand": 1e3,
+    "lakh": 1e5, "lakhs": 1e5,
+    "m": 1e6, "mn": 1e6, "mm": 1e6, "mil": 1e6, "million": 1e6, "millions": 1e6,
+    "crore": 1e7, "crores": 1e7,
+    "b": 1e9, "bn": 1e9, "billion": 1e9, "billions": 1e9,
+    "t": 1e12, "tn": 1e12, "trillion": 1e12, "trillions": 1e12,
+}
+
+_CURRENCY = r"(?:[$€£¥₹₩]|usd|eur|gbp|inr|jpy|cny|rmb|us\$)"
+_NUMBER_RE = re.compile(
+    r"^(?:~|≈|approx\.?|approximately|about|around|over|under|nearly|almost|est\.?|[<>]=?)?\s*"
+    r"(?P<neg>[-−–])?\s*"
+    rf"(?:{_CURRENCY}\s*)?"
+    r"(?P<neg2>[-−–])?\s*"
+    r"(?P<number>(?:\d{1,3}(?:[,\s]\d{3})+|\d+)(?:\.\d+)?|\.\d+)\s*"
+    r"(?P<suffix>[a-z]+)?\.?\s*"
+    r"(?P<percent>%|percent|pct)?\s*"
+    rf"(?:{_CURRENCY})?\s*$",
+    re.IGNORECASE,
+)
+# Per-character classes for `_parse_formatted`, indexed by code point.
+# Affix characters may surround the digits of a formatted value ("-$1.2bn",
+# "12.5 %", "3.4M USD"); code point 0 is NumPy's fixed-width padding.
+_LEAD, _TRAIL, _DIGIT, _DOT, _COMMA, _PAD = 1, 2, 4, 8, 16, 32
+_CHAR_CLASSES = np.zeros(0x2300, dtype=np.uint8)
+# Longer cells (notes, sentences) are parsed per value, so one verbose cell
+# cannot widen the code-point matrix of the whole column
+_MAX_FORMATTED_WIDTH = 32
+for _chars, _flag in (
+    ("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ$€£¥₹₩ ", _LEAD | _TRAIL),
+    ("-−–~≈<>=", _LEAD),
+    ("%.", _TRAIL),
+    ("0123456789", _DIGIT),
+    (".", _DOT),
+    (",", _COMMA),
+    ("\0", _PAD | _TRAIL),
+):
+    _CHAR_CLASSES[[ord(char) for char in _chars]] |= _flag
+_NOTE_RE = re.compile(r"\s*[\(\[][^\)\]]*[\)\]]\s*|\*+$")
+_ACCOUNTING_NEGATIVE_RE = re.compile(r"^\(\s*([^()]*\d[^()]*)\s*\)$")
+
+
+class CoercionResult(NamedTuple):
+    """Numeric column plus the row indices that could not be parsed (left as NaN)."""
+    values: np.ndarray
+    failed: List[int]
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """
+    Parse a single extracted value such as "$1.2B", "12.5%", "3.4 trillion",
+    "1,234 (est.)" or "(350)" into a float. Returns None if it cannot be parsed.
+    Percentages keep their percent units ("12.5%" -> 12.5).
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    text = str(value).strip()
+    if not text:
+        return None
+    negative = False
+    accounting = _ACCOUNTING_NEGATIVE_RE.match(text)
+    if accounting:
+        negative = True
+        text = accounting.group(1)
+    text = _NOTE_RE.sub(" ", text).strip()
+    match = _NUMBER_RE.match(text)
+    if not match:
+        return None
+    suffix = (match.group("suffix") or "").lower()
+    if suffix in ("percent", "pct"):
+        suffix = ""
+    if suffix and suffix not in SCALE_SUFFIXES:
+        return None
+    number = float(re.sub(r"[,\s]", "", match.group("number")))
+    number *= SCALE_SUFFIXES.get(suffix, 1.0)
+    if negative or match.group("neg") or match.group("neg2"):
+        number = -number
+    return number
+
+
+def coerce_column(values: Sequence[Any], dtype: Optional[str] = None) -> CoercionResult:
+    """
+    Coerce a whole column to float64.
+
+    Columns that are already numeric convert in a single step. Plain numbers
+    with thousands separators and formatted values ("$1.2B", "12.5%",
+    "3.4 trillion") are split into prefix, digits and suffix with array
+    operations over the whole column; only the few distinct prefixes and
+    suffixes go through `parse_number`. Values that do not fit that shape
+    (notes, accounting negatives, junk) are parsed once per distinct value
+    with `parse_number` and scattered back. Missing or unparseable cells
+    become NaN (a gap in the chart rather than a fake zero) and are reported
+    in `failed`. A declared integer dtype rounds the result.
+    """
+    array = values if isinstance(values, np.ndarray) else np.asarray(values, dtype=object)
+    result = _vectorized_float(array)
+    if result is None:
+        result = _parse_formatted(array)
+
+    failed = np.flatnonzero(np.isnan(result)).tolist()
+    if (dtype or "").lower() in INTEGER_DTYPES:
+        result = np.rint(result)
+    return CoercionResult(result, failed)
+
+
+def _vectorized_float(array: np.ndarray) -> Optional[np.ndarray]:
+    try:
+        return np.asarray(array, dtype=np.float64)
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_formatted(array: np.ndarray) -> np.ndarray:
+    """
+    Parse "<prefix><digits><suffix>" values column-wise: the prefix gives the
+    sign ("-", "-$", "about "), the suffix the scale ("bn", "%", "M USD").
+
+    Cells of up to `_MAX_FORMATTED_WIDTH` characters are viewed as a
+    (rows, width) matrix of code points, so finding the digits and cutting off
+    the affixes is plain array arithmetic. Longer cells, and rows whose digits
+    or affixes do not parse, fall back to `_parse_distinct`.
+    """
+    short = np.fromiter(
+        (len(str(value)) <= _MAX_FORMATTED_WIDTH for value in array), dtype=bool, count=len(array)
+    )
+    result = np.full(len(array), np.nan)
+    valid = np.zeros(len(array), dtype=bool)
+    result[short], valid[short] = _parse_affixed(np.ascontiguousarray(array[short].astype(str)))
+    pending = ~valid
+    if pending.any():
+        result[pending] = _parse_distinct(array[pending])
+    return result
+
+
+def _parse_affixed(text: np.ndarray):
+    """Values and validity mask for a fixed-width string column."""
+    rows, width = len(text), text.dtype.itemsize // 4
+    codes = text.view(np.uint32).reshape(rows, width)
+    classes = _CHAR_CLASSES[np.minimum(codes, _CHAR_CLASSES.size - 1)]
+    position = np.arange(width)
+
+    lead = (classes & _LEAD) > 0
+    start = np.where(lead.all(axis=1), width, np.argmax(~lead, axis=1))
+    trail = (classes & _TRAIL) > 0
+    end = np.where(trail.all(axis=1), 0, width - np.argmax(~trail[:, ::-1], axis=1))
+    end = np.maximum(end, start)
+
+    core = (position >= start[:, None]) & (position < end[:, None])
+    valid = (
+        ~(core & ((classes & (_DIGIT | _DOT | _COMMA)) == 0)).any(axis=1)
+        & ((core & ((classes & _DOT) > 0)).sum(axis=1) <= 1)
+        & (core & ((classes & _DIGIT) > 0)).any(axis=1)
+        & _commas_group_thousands(core, classes, start)
+    )
+    digits = _compact(codes, core & ((classes & _COMMA) == 0))
+    sign = _parse_affixes(_compact(codes, position < start[:, None]), "{}1")
+    scale = _parse_affixes(_compact(codes, (position >= end[:, None]) & ((classes & _PAD) == 0)), "1{}")
+    valid &= ~np.isnan(sign) & ~np.isnan(scale)
+
+    values = np.full(rows, np.nan)
+    values[valid] = digits[valid].astype(np.float64) * sign[valid] * scale[valid]
+    return values, valid
+
+
+def _commas_group_thousands(core: np.ndarray, classes: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """
+    True for rows whose commas are thousands separators, as `parse_number`
+    requires: 1-3 leading digits, then groups of exactly three digits, and no
+    comma after the decimal point ("1,234.5" but not "12,34" or "1,2,3").
+    """
+    digit = core & ((classes & _DIGIT) > 0)
+    comma = core & ((classes & _COMMA) > 0)
+    dot = core & ((classes & _DOT) > 0)
+    width = core.shape[1]
+
+    def ahead(mask, offset):
+        return np.pad(mask, ((0, 0), (0, offset)))[:, offset:offset + width]
+
+    group_end = ahead(comma, 4) | ahead(dot, 4) | ~ahead(core, 4)
+    grouped = ahead(digit, 1) & ahead(digit, 2) & ahead(digit, 3) & group_end
+    first = np.argmax(comma, axis=1) - start
+    return ~comma.any(axis=1) | (
+        ~(comma & ~grouped).any(axis=1)
+        & ~(comma & (np.cumsum(dot, axis=1) > 0)).any(axis=1)
+        & (first >= 1) & (first <= 3)
+    )
+
+
+def _compact(codes: np.ndarray, keep: np.ndarray) -> np.ndarray:
+    """Strings made of the kept code points of each row, in order."""
+    kept = np.zeros_like(codes)
+    rows, columns = np.nonzero(keep)
+    kept[rows, (np.cumsum(keep, axis=1) - 1)[rows, columns]] = codes[rows, columns]
+    return kept.view(f"<U{codes.shape[1]}").reshape(len(codes))
+
+
+def _parse_affixes(affixes: np.ndarray, template: str) -> np.ndarray:
+    """Parse each distinct affix once, as `template` around a unit value."""
+    distinct, inverse = np.unique(affixes, return_inverse=True)
+    parsed = [parse_number(template.format(affix)) for affix in distinct]
+    return np.array([np.nan if value is None else value for value in parsed])[inverse.reshape(-1)]
+
+
+def _parse_distinct(array: np.ndarray) -> np.ndarray:
+    keys = array.astype(str)
+    _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    parsed = np.array(
+        [parse_number(array[index]) for index in first_index], dtype=object
+    )
+    parsed = np.where(parsed == None, np.nan, parsed).astype(np.float64)  # noqa: E711
+    return parsed[inverse.reshape(-1)]
+
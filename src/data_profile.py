@@ -0,0 +1,81 @@
+from typing import Any, Dict, List, Optional
+
+from src.coercion import NUMERIC_DTYPES, parse_number
+
+DEFAULT_SAMPLE_ROWS = 3
+
+
+def _monotonicity(values: List[Any]) -> Optional[str]:
+    """Return "increasing", "decreasing" or None for a comparable sequence."""
+    if len(values) < 2:
+        return None
+    try:
+        if all(a <= b for a, b in zip(values, values[1:])):
+            return "increasing"
+        if all(a >= b for a, b in zip(values, values[1:])):
+            return "decreasing"
+    except TypeError:
+        pass
+    return None
+
+
+def _profile_column(name: str, column_data: dict) -> Dict[str, Any]:
+    values = column_data.get("values") or []
+    dtype = str(column_data.get("dtype", "str"))
+    present = [value for value in values if value is not None and value != ""]
+    profile: Dict[str, Any] = {
+        "name": name,
+        "dtype": dtype,
+        "count": len(values),
+        "nulls": len(values) - len(present),
+        "cardinality": len({str(value) for value in present}),
+    }
+    if dtype.lower() in NUMERIC_DTYPES:
+        numbers = [number for number in map(parse_number, present) if number is not None]
+        if numbers:
+            profile["min"] = min(numbers)
+            profile["max"] = max(numbers)
+            profile["monotonic"] = _monotonicity(numbers)
+    else:
+        strings = [str(value) for value in present]
+        if strings:
+            profile["monotonic"] = _monotonicity(strings)
+    return profile
+
+
+def _sample_indices(row_count: int, sample_rows: int) -> List[int]:
+    """Evenly spaced row indices, always including the first and last row."""
+    if row_count <= sample_rows:
+        return list(range(row_count))
+    if sample_rows <= 1:
+        return [0]
+    step = (row_count - 1) / (sample_rows - 1)
+    return sorted({round(i * step) for i in range(sample_rows)})
+
+
+def profile_data(data: dict, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> Dict[str, Any]:
+    """
+    Summarise column-oriented extracted data for the graph selector.
+
+    The profile holds column names, dtypes, cardinality, min/max and
+    monotonicity per column plus a few evenly spaced sample rows, so its size
+    does not grow with the number of rows.
+    """
+    columns = data.get("col_names") or [key for key in data.keys() if key != "col_names"]
+    columns = [column for column in columns if isinstance(data.get(column), dict)]
+    row_count = max((len(data[column].get("values") or []) for column in columns), default=0)
+
+    samples = []
+    for index in _sample_indices(row_count, sample_rows):
+        row = []
+        for column in columns:
+            values = data[column].get("values") or []
+            row.append(values[index] if index < len(values) else None)
+        samples.append(row)
+
+    return {
+        "col_names": columns,
+        "row_count": row_count,
+        "columns": [_profile_column(column, data[column]) for column in columns],
+        "sample_rows": samples,
+    }
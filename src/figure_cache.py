@@ -0,0 +1,200 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import plotly
+import plotly.io as pio
+
+from src.json_codec import dumps
+from src.logger import get_logger
+from src.metrics import record_cache
+from src.utils import LLM_CONFIG_PATH, load_config_section
+
+logger = get_logger(__name__)
+
+# Defaults for the rendered-figure cache, overridable from the `figure_cache`
+# section of llm_config.yaml.
+DEFAULT_FIGURE_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 256,
+    "max_memory_bytes": 64 * 1024 * 1024,
+    "sqlite_path": None,
+    "max_disk_entries": 5000,
+}
+
+# Part of every figure key. Bump it whenever a chart builder, the chart
+# registry or the figure layout changes, so figures rendered by older code
+# (including those in the persistent SQLite tier) are no longer served.
+FIGURE_CACHE_VERSION = 1
+
+
+def make_figure_key(*parts: Any) -> str:
+    """
+    Hash the render inputs (data, chart type, columns, title, ...) into a
+    content address. Dict keys are sorted so equal data always hashes equally.
+    The key also covers `FIGURE_CACHE_VERSION` and the Plotly version.
+    """
+    versioned = [FIGURE_CACHE_VERSION, plotly.__version__, *parts]
+    return hashlib.sha256(dumps(versioned, compact=True, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class FigureCache:
+    """
+    Content-addressed cache of rendered Plotly figures.
+
+    Each entry holds the pre-serialized figure JSON. The in-memory LRU, bounded
+    by entry count and total JSON size, also keeps the live figure object so a
+    hit needs neither building nor serializing; figures returned from the
+    cache are shared and must be treated as read-only. An optional SQLite
+    table shares the JSON across processes, and disk hits are promoted to
+    memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        sqlite_path: Optional[str] = None,
+        max_disk_entries: int = 5000,
+    ):
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "evictions": 0}
+        self._conn = None
+        if sqlite_path:
+            self._conn = self._open_sqlite(sqlite_path)
+
+    @staticmethod
+    def _open_sqlite(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS figure_cache ("
+            "key TEXT PRIMARY KEY, figure_json TEXT NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS figure_cache_accessed ON figure_cache (accessed_at)"
+        )
+        conn.commit()
+        return conn
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of hit/miss/eviction counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    def get(self, key: str) -> Optional[Tuple[Any, str]]:
+        """Return (figure, figure_json) for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["memory_hits"] += 1
+                record_cache("figure", "hit")
+                return entry[1], entry[0]
+
+            row = None
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT figure_json FROM figure_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE figure_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+                    )
+                    self._conn.commit()
+            if row is None:
+                self._stats["misses"] += 1
+                record_cache("figure", "miss")
+                return None
+
+        figure_json = row[0]
+        figure = pio.from_json(figure_json, skip_invalid=True)
+        with self._lock:
+            self._memory_put(key, figure_json, figure)
+            self._stats["hits"] += 1
+            self._stats["disk_hits"] += 1
+        record_cache("figure", "hit")
+        return figure, figure_json
+
+    def put(self, key: str, figure: Any, figure_json: Optional[str] = None) -> str:
+        """Store a rendered figure; returns its JSON (serialized here if not given)."""
+        if figure_json is None:
+            figure_json = figure.to_json()
+        with self._lock:
+            self._memory_put(key, figure_json, figure)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO figure_cache (key, figure_json, accessed_at) VALUES (?, ?, ?)",
+                    (key, figure_json, time.time()),
+                )
+                self._conn.execute(
+                    "DELETE FROM figure_cache WHERE key IN ("
+                    "SELECT key FROM figure_cache ORDER BY accessed_at ASC LIMIT "
+                    "MAX((SELECT COUNT(*) FROM figure_cache) - ?, 0))",
+                    (self.max_disk_entries,),
+                )
+                self._conn.commit()
+        return figure_json
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM figure_cache")
+                self._conn.commit()
+
+    def _memory_put(self, key: str, figure_json: str, figure: Any) -> None:
+        """Insert into the LRU tier, evicting by count and size. Caller holds the lock."""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        if len(figure_json) > self.max_memory_bytes:
+            return
+        self._memory[key] = (figure_json, figure)
+        self._memory_bytes += len(figure_json)
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_memory_bytes:
+            _, (evicted_json, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted_json)
+            self._stats["evictions"] += 1
+
+
+_figure_cache = None
+_figure_cache_lock = threading.Lock()
+
+
+def get_figure_cache() -> Optional[FigureCache]:
+    """
+    Return the process-wide figure cache configured from `figure_cache` in
+    llm_config.yaml, or None if caching is disabled.
+    """
+    global _figure_cache
+    with _figure_cache_lock:
+        if _figure_cache is None:
+            settings = {**DEFAULT_FIGURE_CACHE_CONFIG, **load_config_section("figure_cache")}
+            if not settings["enabled"]:
+                return None
+            sqlite_path = settings["sqlite_path"]
+            if sqlite_path and not os.path.isabs(sqlite_path):
+                sqlite_path = os.path.join(os.path.dirname(LLM_CONFIG_PATH), sqlite_path)
+            _figure_cache = FigureCache(
+                max_entries=settings["max_entries"],
+                max_memory_bytes=settings["max_memory_bytes"],
+                sqlite_path=sqlite_path,
+                max_disk_entries=settings["max_disk_entries"],
+            )
+        return _figure_cache
@@ -0,0 +1,82 @@
+import re
+from typing import List, Optional, Tuple
+
+from src.coercion import NUMERIC_DTYPES
+
+_TIME_COLUMN_RE = re.compile(r"\b(year|date|month|quarter|week|day|time|period|fy)s?\b", re.IGNORECASE)
+_DATE_VALUE_RE = re.compile(
+    r"^\s*(\d{4}([-/]\d{1,2}([-/]\d{1,2})?)?|q[1-4][\s-]*\d{2,4}|\d{2,4}[\s-]*q[1-4]|"
+    r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?(\s+\d{2,4})?)\s*$",
+    re.IGNORECASE,
+)
+_SHARE_QUERY_RE = re.compile(r"(%|\bpercent(age)?s?\b|\bshare\b|\bproportion\b|\bcomposition\b|\bbreakdown\b|\bcontribution\b|\bsplit\b)", re.IGNORECASE)
+_COMPARE_QUERY_RE = re.compile(r"\b(compare|comparison|versus|vs\.?|side by side)\b", re.IGNORECASE)
+
+
+def _columns(data: dict) -> List[str]:
+    columns = data.get("col_names") or [key for key in data.keys() if key != "col_names"]
+    return [column for column in columns if isinstance(data.get(column), dict)]
+
+
+def _is_numeric(column_data: dict) -> bool:
+    return str(column_data.get("dtype", "")).lower() in NUMERIC_DTYPES
+
+
+def is_time_like(name: str, column_data: dict) -> bool:
+    """
+    Whether a column looks like a time axis, judged by its name or values
+    (four-digit years, ISO-ish dates, month names or quarters).
+    """
+    if _TIME_COLUMN_RE.search(name):
+        return True
+    values = column_data.get("values") or []
+    if not values:
+        return False
+    if _is_numeric(column_data):
+        return all(
+            isinstance(value, (int, float)) and float(value).is_integer() and 1800 <= value <= 2100
+            for value in values
+        )
+    return all(isinstance(value, str) and _DATE_VALUE_RE.match(value) for value in values)
+
+
+def select_graph_by_rules(data: dict, user_query: str = "") -> Optional[Tuple[str, List[str]]]:
+    """
+    Pick a graph type and columns from column names and declared dtypes alone.
+
+    Handles the common shapes deterministically:
+    - time-like column + one numeric column -> line_graph
+    - category + one numeric column -> pie_chart for share-style queries, else bar_graph
+    - two numeric columns (no time axis) -> scatterplot
+    - category + several numeric columns -> stacked_bar_chart for share-style
+      queries, multi_bar_graph for comparison queries
+
+    Returns None for anything else so the caller can consult the LLM.
+    """
+    columns = _columns(data)
+    if len(columns) < 2:
+        return None
+
+    first = columns[0]
+    first_data = data[first]
+    numeric = [column for column in columns[1:] if _is_numeric(data[column])]
+    first_is_time = is_time_like(first, first_data)
+    first_is_numeric = _is_numeric(first_data)
+    share_query = bool(_SHARE_QUERY_RE.search(user_query or ""))
+
+    if len(columns) == 2 and len(numeric) == 1:
+        if first_is_time:
+            return "line_graph", columns
+        if first_is_numeric:
+            return "scatterplot", columns
+        if share_query:
+            return "pie_chart", columns
+        return "bar_graph", columns
+
+    if len(columns) > 2 and len(numeric) == len(columns) - 1 and not first_is_numeric and not first_is_time:
+        if share_query:
+            return "stacked_bar_chart", columns
+        if _COMPARE_QUERY_RE.search(user_query or ""):
+            return "multi_bar_graph", columns
+
+    return None
@@ -0,0 +1,100 @@
+import json
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see the `fast` extra
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so callers catch one type either way
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(text) -> Any:
+    """Decode JSON text with orjson when it is installed, else the stdlib."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def dumps(obj: Any, compact: bool = False, sort_keys: bool = False) -> str:
+    """
+    Encode `obj` as a JSON string. `compact` drops whitespace, for prompts and
+    cache payloads; `sort_keys` gives a canonical form for hashing. Non-JSON
+    values fall back to str().
+    """
+    if orjson is not None:
+        try:
+            option = orjson.OPT_SORT_KEYS if sort_keys else 0
+            return orjson.dumps(obj, default=str, option=option).decode("utf-8")
+        except TypeError:
+            pass
+    if compact:
+        return json.dumps(obj, separators=(",", ":"), default=str, sort_keys=sort_keys)
+    return json.dumps(obj, default=str, sort_keys=sort_keys)
+
+
+def find_json_object(text: str) -> Optional[str]:
+    """
+    Return the first balanced `{...}` span in `text`, or None.
+
+    Brace matching skips over string literals (and escapes inside them), so
+    braces in values do not confuse it. Surrounding prose, ```json fences and
+    trailing commentary from the LLM are ignored.
+    """
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        in_string = False
+        escaped = False
+        for index in range(start, len(text)):
+            char = text[index]
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:index + 1]
+        # Unbalanced from this brace; try the next one
+        start = text.find("{", start + 1)
+    return None
+
+
+def extract_json(payload) -> Optional[dict]:
+    """
+    Decode the JSON object in an LLM response, or None if there is none.
+
+    Already-parsed dicts pass straight through. Clean JSON is decoded directly;
+    anything else (fences, prose before or after) is scanned once for the
+    first balanced object.
+    """
+    if isinstance(payload, dict):
+        return payload
+    if payload is None:
+        return None
+    text = str(payload).strip()
+    if not text:
+        return None
+    if text[0] == "{":
+        try:
+            data = loads(text)
+            return data if isinstance(data, dict) else None
+        except JSONDecodeError:
+            pass
+    candidate = find_json_object(text)
+    if candidate is None:
+        return None
+    try:
+        data = loads(candidate)
+    except JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+from src.json_codec import extract_json
+from src.logger import get_logger
+from src.metrics import record_cache
+
+logger = get_logger(__name__)
+
+
+def _serialize_generations(generations: List[Generation]) -> str:
+    """Encode a list of generations as plain JSON."""
+    payload = []
+    for generation in generations:
+        entry = {"text": generation.text, "generation_info": generation.generation_info}
+        if isinstance(generation, ChatGeneration):
+            entry["message"] = message_to_dict(generation.message)
+        payload.append(entry)
+    return json.dumps(payload)
+
+
+def _deserialize_generations(value: str) -> List[Generation]:
+    """Decode generations previously written by `_serialize_generations`."""
+    generations = []
+    for entry in json.loads(value):
+        if "message" in entry:
+            message = messages_from_dict([entry["message"]])[0]
+            generations.append(
+                ChatGeneration(message=message, generation_info=entry.get("generation_info"))
+            )
+        else:
+            generations.append(
+                Generation(text=entry["text"], generation_info=entry.get("generation_info"))
+            )
+    return generations
+
+
+def has_json_object(generations: List[Generation]) -> bool:
+    """True if every generation's text contains a JSON object."""
+    return all(extract_json(generation.text) is not None for generation in generations)
+
+
+class LLMResponseCache(BaseCache):
+    """
+    Two-tier LLM response cache: a bounded in-memory LRU in front of an
+    optional size-bounded SQLite table.
+
+    Entries are keyed on the serialized message list and the LLM string
+    (model and invocation parameters) that LangChain passes to every cache.
+    Freshness is decided at read time, so scoped views (see `scoped`) can
+    apply different TTLs to the same underlying store.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        sqlite_path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+        default_ttl: float = 3600,
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.default_ttl = default_ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+        self._conn = None
+        if sqlite_path:
+            self._conn = self._open_sqlite(sqlite_path)
+
+    @staticmethod
+    def _open_sqlite(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)"
+        )
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        """Hash the prompt and LLM configuration into a fixed-size key."""
+        digest = hashlib.sha256()
+        digest.update(llm_string.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of hit/miss/eviction counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    def scoped(
+        self,
+        ttl: Optional[float],
+        validate: Optional[Callable[[List[Generation]], bool]] = None,
+    ) -> "ScopedLLMCache":
+        """
+        Return a view of this cache that applies `ttl` on lookup and only
+        stores responses accepted by `validate`.
+        """
+        return ScopedLLMCache(self, self.default_ttl if ttl is None else ttl, validate)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[List[Generation]]:
+        return self.lookup_with_ttl(prompt, llm_string, self.default_ttl)
+
+    def update(self, prompt: str, llm_string: str, return_val: List[Generation]) -> None:
+        key = self.make_key(prompt, llm_string)
+        value = _serialize_generations(return_val)
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                cursor = self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    "SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT "
+                    "MAX((SELECT COUNT(*) FROM llm_cache) - ?, 0))",
+                    (self.max_disk_entries,),
+                )
+                self._stats["evictions"] += max(cursor.rowcount, 0)
+                self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def lookup_with_ttl(
+        self, prompt: str, llm_string: str, ttl: float
+    ) -> Optional[List[Generation]]:
+        """Look up an entry, treating anything older than `ttl` seconds as a miss."""
+        if ttl <= 0:
+            return None
+        key = self.make_key(prompt, llm_string)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= ttl:
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    record_cache("llm", "hit")
+                    return _deserialize_generations(value)
+                self._stats["expired"] += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= ttl:
+                    value, created_at = row
+                    self._conn.execute(
+                        "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    self._conn.commit()
+                    self._memory_put(key, value, created_at)
+                    self._stats["hits"] += 1
+                    self._stats["disk_hits"] += 1
+                    record_cache("llm", "hit")
+                    return _deserialize_generations(value)
+
+            self._stats["misses"] += 1
+            record_cache("llm", "miss")
+            return None
+
+    def _memory_put(self, key: str, value: str, created_at: float) -> None:
+        """Insert into the LRU tier, evicting the least recently used entries. Caller holds the lock."""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+
+class ScopedLLMCache(BaseCache):
+    """
+    A view of an `LLMResponseCache` with its own TTL, e.g. one per workflow node.
+
+    Responses rejected by `validate` are not stored, so a reply the node cannot
+    parse is fetched again on retry instead of being replayed for the whole TTL.
+    """
+
+    def __init__(
+        self,
+        cache: LLMResponseCache,
+        ttl: float,
+        validate: Optional[Callable[[List[Generation]], bool]] = None,
+    ):
+        self.cache = cache
+        self.ttl = ttl
+        self.validate = validate
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[List[Generation]]:
+        return self.cache.lookup_with_ttl(prompt, llm_string, self.ttl)
+
+    def update(self, prompt: str, llm_string: str, return_val: List[Generation]) -> None:
+        if self.ttl <= 0:
+            return
+        if self.validate is not None and not self.validate(return_val):
+            logger.info("Not caching LLM response rejected by its scope validator")
+            return
+        self.cache.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear(**kwargs)
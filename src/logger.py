@@ -1,40 +1,173 @@
+"""
+Logging setup for the app, the HTTP service and the batch runner.
+
+Modules only call `get_logger(__name__)`; handlers are installed once by
+`configure_logging()` from an entry point (app.py, `python -m src.server`,
+`python -m src.batch`). Records are put on a queue by the calling thread and
+written to stdout by a `QueueListener` thread, so slow terminals or disks do
+not block requests.
+
+Log messages use %-style arguments, which are only formatted if a record is
+emitted. Large values (search results, extracted data, prompts, LLM output)
+are wrapped in `payload()`, which truncates them to `max_field_chars` when
+formatted, and such records are sampled at `payload_sample_rate`.
+"""
+
+import atexit
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from typing import Optional
+import threading
+from typing import Any, Optional
 
-# Global logger instance
-_logger: Optional[logging.Logger] = None
+# Defaults for logging, overridable from the `logging` section of
+# llm_config.yaml and by keyword arguments to `configure_logging`.
+DEFAULT_LOGGING_CONFIG = {
+    "level": "INFO",
+    "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    "max_field_chars": 500,
+    "payload_sample_rate": 1.0,
+    "use_queue": True,
+}
+
+_max_field_chars = DEFAULT_LOGGING_CONFIG["max_field_chars"]
+_listener: Optional[logging.handlers.QueueListener] = None
+_handlers = []
+_configured = False
+_configure_lock = threading.Lock()
 
 
 def get_logger(name: str = __name__) -> logging.Logger:
     """
-    Get a configured logger instance.
-    
+    Get a logger instance.
+
     Args:
         name: The name for the logger (usually __name__)
-        
+
     Returns:
-        Configured logger instance
-    """
-    global _logger
-    
-    if _logger is None:
-        # Configure the root logger
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            handlers=[logging.StreamHandler(sys.stdout)],
-        )
-        _logger = logging.getLogger()
-    
+        Logger instance; its output goes wherever `configure_logging` sent it
+    """
     return logging.getLogger(name)
 
 
+class Payload:
+    """
+    A log argument that is truncated to `limit` characters (default
+    `max_field_chars`) when, and only if, the record is formatted.
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: Optional[int] = None):
+        self.value = value
+        self.limit = limit
+
+    def _truncate(self, text: str) -> str:
+        limit = _max_field_chars if self.limit is None else self.limit
+        if limit is None or len(text) <= limit:
+            return text
+        return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+    def __str__(self) -> str:
+        return self._truncate(str(self.value))
+
+    def __repr__(self) -> str:
+        return self._truncate(repr(self.value))
+
+
+def payload(value: Any, limit: Optional[int] = None) -> Payload:
+    """Wrap a large log argument, e.g. `logger.debug("Search results: %s", payload(results))`."""
+    return Payload(value, limit)
+
+
+class PayloadSamplingFilter(logging.Filter):
+    """Pass only a `sample_rate` fraction of records carrying `payload` arguments."""
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.sample_rate >= 1:
+            return True
+        args = record.args if isinstance(record.args, tuple) else (record.args,)
+        if not any(isinstance(arg, Payload) for arg in args):
+            return True
+        return random.random() < self.sample_rate
+
+
+def _load_settings() -> dict:
+    try:
+        from src.prompt_registry import get_config
+
+        return dict(get_config().get("logging") or {})
+    except Exception:
+        return {}
+
+
+def configure_logging(force: bool = False, **overrides: Any) -> None:
+    """
+    Install the root handlers. Safe to call from every entry point: only the
+    first call (or one with `force=True`) has an effect.
+
+    Settings come from `DEFAULT_LOGGING_CONFIG`, the `logging` section of
+    llm_config.yaml and `overrides`, in that order.
+    """
+    global _configured, _listener, _max_field_chars
+    with _configure_lock:
+        if _configured and not force:
+            return
+        _shutdown()
+        settings = {**DEFAULT_LOGGING_CONFIG, **_load_settings(), **overrides}
+
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(logging.Formatter(settings["format"]))
+        if settings["use_queue"]:
+            # Unbounded, so logging never blocks; the listener drains it in order
+            log_queue = queue.SimpleQueue()
+            handler = logging.handlers.QueueHandler(log_queue)
+            _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+            _listener.start()
+        else:
+            handler = stream_handler
+        handler.addFilter(PayloadSamplingFilter(settings["payload_sample_rate"]))
+
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(getattr(logging, str(settings["level"]).upper()))
+        _handlers.append(handler)
+        _max_field_chars = settings["max_field_chars"]
+        _configured = True
+
+
+def _shutdown() -> None:
+    """Remove our handlers and flush the queue. Caller holds the lock."""
+    global _listener
+    root = logging.getLogger()
+    for handler in _handlers:
+        root.removeHandler(handler)
+    _handlers.clear()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+@atexit.register
+def shutdown_logging() -> None:
+    """Flush queued records and remove the handlers installed by `configure_logging`."""
+    global _configured
+    with _configure_lock:
+        _shutdown()
+        _configured = False
+
+
 def set_log_level(level: str = "INFO"):
     """
     Set the logging level for all loggers.
-    
+
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
     """
-    logging.getLogger().setLevel(getattr(logging, level.upper())) 
\ No newline at end of file
+    logging.getLogger().setLevel(getattr(logging, level.upper()))
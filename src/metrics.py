@@ -0,0 +1,270 @@
+"""
+In-process metrics for workflow runs: per-node wall time, LLM prompt and
+completion tokens, cache lookups and payload sizes, aggregated into
+histograms and counters.
+
+Workflow nodes are traced by `src.state.node`, LLM token usage arrives via
+`TOKEN_USAGE_CALLBACK` (attached to every pooled LLM), and the caches report
+lookups with `record_cache`. Everything is labelled with the node running at
+the time, so a slow or expensive run can be pinned on search, extraction,
+selection or rendering.
+
+`render_prometheus()` returns the Prometheus text exposition served at
+`/metrics` by src/server.py; `summary()` returns per-node rows for the
+Streamlit diagnostics panel.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+METRIC_PREFIX = "graph_search"
+
+# Bucket upper bounds; a +Inf bucket is implied.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# State fields whose size is recorded whenever a node returns them.
+PAYLOAD_FIELDS = ("search_results", "formatted_data", "graph_json")
+
+_HELP = {
+    "node_duration_seconds": "Wall time of one workflow node run.",
+    "node_runs_total": "Workflow node runs by outcome.",
+    "llm_prompt_tokens": "Prompt tokens per LLM call (cache hits excluded).",
+    "llm_completion_tokens": "Completion tokens per LLM call (cache hits excluded).",
+    "cache_lookups_total": "Cache lookups by cache and result.",
+    "payload_bytes": "UTF-8 size of large state fields returned by a node.",
+}
+
+_current_node: ContextVar[str] = ContextVar("current_node", default="")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the `q` quantile by interpolating within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled histograms and counters."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> Tuple[str, Labels]:
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name: str, value: float, buckets: Sequence[float], **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def histograms(self) -> Dict[Tuple[str, Labels], Histogram]:
+        with self._lock:
+            return dict(self._histograms)
+
+    def counters(self) -> Dict[Tuple[str, Labels], float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Return the process-wide metrics registry."""
+    return _registry
+
+
+def current_node() -> str:
+    """Name of the workflow node running in this context, or "" outside one."""
+    return _current_node.get()
+
+
+@contextmanager
+def node_span(node: str) -> Iterator[None]:
+    """Time a node run and attribute LLM and cache metrics inside it to `node`."""
+    token = _current_node.set(node)
+    started = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        _registry.observe("node_duration_seconds", time.perf_counter() - started, DURATION_BUCKETS, node=node)
+        _registry.inc("node_runs_total", node=node, status=status)
+        _current_node.reset(token)
+
+
+def record_payloads(node: str, update: Any) -> None:
+    """Record the sizes of the large fields in a node's state update."""
+    if not isinstance(update, dict):
+        return
+    for field in PAYLOAD_FIELDS:
+        value = update.get(field)
+        if isinstance(value, str) and value:
+            _registry.observe("payload_bytes", len(value.encode("utf-8")), SIZE_BUCKETS, node=node, field=field)
+
+
+def record_cache(cache: str, result: str) -> None:
+    """Count one lookup of `cache` ("llm", "search", "figure") with its result."""
+    _registry.inc("cache_lookups_total", cache=cache, node=current_node(), result=result)
+
+
+def record_llm_tokens(prompt_tokens: int, completion_tokens: int) -> None:
+    node = current_node()
+    _registry.observe("llm_prompt_tokens", prompt_tokens, TOKEN_BUCKETS, node=node)
+    _registry.observe("llm_completion_tokens", completion_tokens, TOKEN_BUCKETS, node=node)
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """
+    Records prompt/completion tokens of each LLM call. Runs inline so the
+    current node is still set when it fires; responses served from the LLM
+    cache carry no `llm_output` and are not counted.
+    """
+
+    run_inline = True
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            record_llm_tokens(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+
+
+TOKEN_USAGE_CALLBACK = TokenUsageCallback()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render_prometheus(registry: Optional[MetricsRegistry] = None) -> str:
+    """Render every metric in the Prometheus text exposition format (0.0.4)."""
+    registry = registry or _registry
+    by_name: Dict[str, List[str]] = {}
+    types: Dict[str, str] = {}
+
+    for (name, labels), value in sorted(registry.counters().items()):
+        full_name = f"{METRIC_PREFIX}_{name}"
+        types[full_name] = "counter"
+        by_name.setdefault(full_name, []).append(f"{full_name}{_format_labels(labels)} {_format_number(value)}")
+
+    for (name, labels), histogram in sorted(registry.histograms().items()):
+        full_name = f"{METRIC_PREFIX}_{name}"
+        types[full_name] = "histogram"
+        lines = by_name.setdefault(full_name, [])
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _format_number(bound)
+            lines.append(f"{full_name}_bucket{_format_labels(labels, (('le', le),))} {cumulative}")
+        lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_number(histogram.sum)}")
+        lines.append(f"{full_name}_count{_format_labels(labels)} {histogram.count}")
+
+    output = []
+    for full_name in sorted(by_name):
+        short_name = full_name[len(METRIC_PREFIX) + 1:]
+        output.append(f"# HELP {full_name} {_HELP.get(short_name, short_name)}")
+        output.append(f"# TYPE {full_name} {types[full_name]}")
+        output.extend(by_name[full_name])
+    return "\n".join(output) + "\n" if output else ""
+
+
+def summary(registry: Optional[MetricsRegistry] = None) -> List[Dict[str, Any]]:
+    """
+    One row per node with run counts, p50/p95 latency, mean tokens, mean
+    payload sizes and cache hit counts, for display in the diagnostics panel.
+    """
+    registry = registry or _registry
+    rows: Dict[str, Dict[str, Any]] = {}
+
+    def row(node: str) -> Dict[str, Any]:
+        return rows.setdefault(node or "(outside nodes)", {"node": node or "(outside nodes)"})
+
+    for (name, labels), histogram in registry.histograms().items():
+        label_map = dict(labels)
+        target = row(label_map.get("node", ""))
+        if name == "node_duration_seconds":
+            target["runs"] = histogram.count
+            target["p50_ms"] = round(histogram.quantile(0.5) * 1000, 1)
+            target["p95_ms"] = round(histogram.quantile(0.95) * 1000, 1)
+        elif name in ("llm_prompt_tokens", "llm_completion_tokens"):
+            target[f"mean_{name[len('llm_'):]}"] = round(histogram.sum / histogram.count)
+        elif name == "payload_bytes":
+            target[f"mean_{label_map['field']}_bytes"] = round(histogram.sum / histogram.count)
+
+    for (name, labels), value in registry.counters().items():
+        label_map = dict(labels)
+        if name == "node_runs_total" and label_map["status"] == "error":
+            row(label_map["node"])["errors"] = int(value)
+        elif name == "cache_lookups_total":
+            column = f"{label_map['cache']}_cache_{label_map['result']}"
+            target = row(label_map["node"])
+            target[column] = target.get(column, 0) + int(value)
+
+    return sorted(rows.values(), key=lambda r: r["node"])
+
+
+def reset() -> None:
+    """Clear all recorded metrics (for tests)."""
+    _registry.reset()
@@ -0,0 +1,47 @@
+from src.charts.trimming import get_trimming_settings, trim_categories
+from src.json_codec import extract_json
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def data_trimming_node(state):
+    """
+    Fold long-tail categories into an "Others" row for categorical charts.
+
+    Runs between graph selection and rendering. The trimmed table is stored in
+    `trimmed_data`; `formatted_data` and `parsed_data` keep the full
+    extraction for display and export.
+    """
+    settings = get_trimming_settings()
+    graph_type = state.get("selected_graph_type", "")
+    trimmed_data = None
+
+    data = state.get("parsed_data")
+    if data is None:
+        data = extract_json(state.get("formatted_data", ""))
+    if settings["enabled"] and graph_type in settings["chart_types"] and data is not None:
+        selected_columns = state.get("selected_columns") or []
+        columns = selected_columns if len(selected_columns) >= 2 else (
+            data.get("col_names") or [key for key in data.keys() if key != "col_names"]
+        )
+        if len(columns) >= 2 and all(isinstance(data.get(col), dict) for col in columns):
+            trimmed, summary = trim_categories(
+                data,
+                columns,
+                top_n=settings["top_n"],
+                min_share=settings["min_share"],
+                others_label=settings["others_label"],
+            )
+            if summary is not None:
+                logger.info("Trimmed %s of %s categories into %r", summary['folded_categories'], summary['original_categories'], summary['others_label'])
+                trimmed_data = trimmed
+
+    return {"trimmed_data": trimmed_data}
+
+
+async def adata_trimming_node(state):
+    """
+    Async variant of `data_trimming_node`; pure computation, so it runs inline.
+    """
+    return data_trimming_node(state)
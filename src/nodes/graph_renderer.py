@@ -1,190 +1,125 @@
+import asyncio
 import logging
-import json
 import plotly.graph_objects as go
-from typing import TypedDict, Annotated, List, Any
-from langchain_core.messages import BaseMessage
+from typing import Any
+from src.charts import ColumnarData, parse_columnar_data, get_chart, resolve_chart
+from src.charts.downsample import get_render_settings
+from src.coercion import parse_number
+from src.figure_cache import get_figure_cache, make_figure_key
+from src.json_codec import extract_json
 from src.logger import get_logger
+from src.state import GraphState
 import traceback
 
 logger = get_logger(__name__)
 
-# Define the state for our graph
-class GraphState(TypedDict):
-    messages: Annotated[List[BaseMessage], "The messages in the conversation"]
-    response: Annotated[str, "The response from the LLM"]
-    search_results: Annotated[str, "Results from web search"]
-    user_query: Annotated[str, "The original user query"]
-    selected_graph_type: Annotated[str, "The selected graph type"]
-    formatted_data: Annotated[str, "Formatted data for graphing"]
-    graph_object: Annotated[Any, "The rendered graph object"]
-    can_generate_graph: Annotated[str, "Whether the query can generate a graph (Yes/No)"]
-    selected_columns: Annotated[List[str], "The selected columns for graphing"]
 
 def to_float(value: Any) -> float:
-    """Safely converts a value to a float, handling strings with commas."""
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        try:
-            return float(value.replace(',', ''))
-        except (ValueError, TypeError):
-            return 0.0
-    return 0.0
+    """
+    Safely converts a value to a float, handling separators, currency, percent
+    and scale suffixes; unparseable values become 0.0. Use `coerce_column` for
+    whole columns.
+    """
+    number = parse_number(value)
+    return 0.0 if number is None else number
+
 
 def parse_data_for_graph(formatted_data: str, selected_columns=None):
     """
     Parses a JSON string to extract data for graphing, using only selected columns if provided.
+    Returns (columns, data_rows); prefer `parse_columnar_data` for rendering.
     """
-    try:
-        formatted_data = formatted_data.strip()
-        if formatted_data.startswith("```json"):
-            formatted_data = formatted_data[7:-3].strip()
-        data = json.loads(formatted_data)
-        # Defensive: strip whitespace from all keys
-        if any(k.strip() != k for k in data.keys()):
-            data = {k.strip(): v for k, v in data.items()}
-        # Use only selected columns if provided
-        if selected_columns and isinstance(selected_columns, list) and len(selected_columns) >= 2:
-            columns = selected_columns
-            logger.info(f"Using selected columns for graph: {columns}")
-        elif "col_names" in data:
-            columns = data.get("col_names", [])
-            logger.info(f"Using all columns from col_names: {columns}")
-        else:
-            columns = list(data.keys())
-            logger.info(f"Using all columns from keys: {columns}")
-        if not columns or len(columns) < 2:
-            return None, None
-        # Reconstruct data rows from the column-oriented JSON
-        num_rows = len(data.get(columns[0], {}).get("values", []))
-        data_rows = []
-        for i in range(num_rows):
-            row = [data.get(col, {}).get("values", [])[i] for col in columns]
-            data_rows.append(row)
-        logger.info(f"Parsed data: {len(columns)} columns, {len(data_rows)} rows")
-        return columns, data_rows
-    except (json.JSONDecodeError, IndexError, KeyError) as e:
-        logger.error(f"Error parsing JSON data for graph: {formatted_data!r} | Error: {e}")
+    table = parse_columnar_data(formatted_data, selected_columns)
+    if table is None:
         return None, None
+    return table.columns, table.rows()
+
+
+def _message_figure(text: str, user_query: str) -> go.Figure:
+    fig = go.Figure()
+    fig.add_annotation(
+        text=text,
+        xref="paper", yref="paper",
+        x=0.5, y=0.5, showarrow=False,
+        font=dict(size=16)
+    )
+    fig.update_layout(title=user_query)
+    return fig
 
 
 def create_graph(graph_type: str, formatted_data: str, user_query: str, selected_columns=None):
-    logger.info(f"create_graph called with graph_type={graph_type}, selected_columns={selected_columns}")
+    logger.info("create_graph called with graph_type=%s, selected_columns=%s", graph_type, selected_columns)
     try:
-        logger.info("About to parse data for graph")
-        columns, data_rows = parse_data_for_graph(formatted_data, selected_columns)
-        logger.info(f"parse_data_for_graph returned columns={columns}, data_rows length={len(data_rows) if data_rows else 0}")
-        if not columns or not data_rows:
+        spec = get_chart(graph_type)
+        table = parse_columnar_data(formatted_data, selected_columns, min_columns=min(spec.min_columns, 2))
+        if table is None or table.num_rows == 0:
             logger.warning("No structured data found for visualization")
-            fig = go.Figure()
-            fig.add_annotation(
-                text="No structured data found for visualization",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False,
-                font=dict(size=16)
-            )
-            fig.update_layout(title=user_query)
-            logger.info("Returning from create_graph (no data)")
-            return fig
-        logger.info(f"Successfully parsed data: {len(columns)} columns, {len(data_rows)} rows")
-        logger.info(f"Rendering {graph_type} graph")
+            return _message_figure("No structured data found for visualization", user_query)
+        logger.info("Successfully parsed data: %s columns, %s rows", table.num_columns, table.num_rows)
         
-        try:
-            if graph_type == "bar_graph":
-                x_values = [str(row[0]) if len(row) > 0 else "" for row in data_rows]
-                y_values = [to_float(row[1]) if len(row) > 1 else 0.0 for row in data_rows]
-                fig = go.Figure(data=[go.Bar(x=x_values, y=y_values)])
-                fig.update_layout(title=user_query, xaxis_title=columns[0], yaxis_title=columns[1])
-            elif graph_type == "stacked_bar_chart":
-                if len(columns) >= 3:
-                    categories = [str(row[0]) for row in data_rows]
-                    traces = []
-                    for col_idx in range(1, len(columns)):
-                        series_name = columns[col_idx]
-                        y_values = [to_float(row[col_idx]) if len(row) > col_idx else 0.0 for row in data_rows]
-                        traces.append(go.Bar(name=series_name, x=categories, y=y_values))
-                    fig = go.Figure(data=traces)
-                    fig.update_layout(title=user_query, xaxis_title=columns[0], yaxis_title="Value", barmode='stack')
-                else:
-                    x_values = [str(row[0]) if len(row) > 0 else "" for row in data_rows]
-                    y_values = [to_float(row[1]) if len(row) > 1 else 0.0 for row in data_rows]
-                    fig = go.Figure(data=[go.Bar(x=x_values, y=y_values)])
-                    fig.update_layout(title=user_query, xaxis_title=columns[0], yaxis_title=columns[1])
-            elif graph_type == "pie_chart":
-                labels = [str(row[0]) if len(row) > 0 else "" for row in data_rows]
-                values = [to_float(row[1]) if len(row) > 1 else 0.0 for row in data_rows]
-                fig = go.Figure(data=[go.Pie(labels=labels, values=values)])
-                fig.update_layout(title=user_query)
-            elif graph_type == "line_graph":
-                x_values = [str(row[0]) if len(row) > 0 else "" for row in data_rows]
-                y_values = [to_float(row[1]) if len(row) > 1 else 0.0 for row in data_rows]
-                fig = go.Figure(data=[go.Scatter(x=x_values, y=y_values, mode='lines+markers')])
-                fig.update_layout(title=user_query, xaxis_title=columns[0], yaxis_title=columns[1])
-            elif graph_type == "scatterplot":
-                x_values = [to_float(row[0]) if len(row) > 0 else 0.0 for row in data_rows]
-                y_values = [to_float(row[1]) if len(row) > 1 else 0.0 for row in data_rows]
-                fig = go.Figure(data=[go.Scatter(x=x_values, y=y_values, mode='markers')])
-                fig.update_layout(title=user_query, xaxis_title=columns[0], yaxis_title=columns[1])
-            elif graph_type == "multi_bar_graph":
-                if len(columns) >= 3:
-                    categories = [str(row[0]) for row in data_rows]
-                    traces = []
-                    for col_idx in range(1, len(columns)):
-                        series_name = columns[col_idx]
-                        y_values = [to_float(row[col_idx]) if len(row) > col_idx else 0.0 for row in data_rows]
-                        traces.append(go.Bar(name=series_name, x=categories, y=y_values))
-                    fig = go.Figure(data=traces)
-                    fig.update_layout(title=user_query, xaxis_title=columns[0], yaxis_title="Value", barmode='group')
-                else:
-                    x_values = [str(row[0]) if len(row) > 0 else "" for row in data_rows]
-                    y_values = [to_float(row[1]) if len(row) > 1 else 0.0 for row in data_rows]
-                    fig = go.Figure(data=[go.Bar(x=x_values, y=y_values)])
-                    fig.update_layout(title=user_query, xaxis_title=columns[0], yaxis_title=columns[1])
-            else:
-                x_values = [str(row[0]) if len(row) > 0 else "" for row in data_rows]
-                y_values = [to_float(row[1]) if len(row) > 1 else 0.0 for row in data_rows]
-                fig = go.Figure(data=[go.Bar(x=x_values, y=y_values)])
-                fig.update_layout(title=user_query, xaxis_title=columns[0], yaxis_title=columns[1])
-            logger.info("Returning from create_graph (success)")
-            return fig
-        except Exception as e:
-            logger.error(f"Exception in create_graph inner graphing: {e}\n{traceback.format_exc()}")
-            raise
+        spec = resolve_chart(graph_type, table)
+        logger.info("Rendering %s graph", spec.name)
+        fig = spec.build(table, user_query)
+        if table.coercion_failures:
+            fig.update_layout(meta={**(fig.layout.meta or {}), "coercion_failures": table.coercion_failures})
+        logger.info("Returning from create_graph (success)")
+        return fig
     except Exception as e:
-        logger.error(f"Exception in create_graph: {e}\n{traceback.format_exc()}")
-        fig = go.Figure()
-        fig.add_annotation(
-            text=f"Error creating {graph_type}: {str(e)}",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5, showarrow=False,
-            font=dict(size=16)
-        )
-        fig.update_layout(title=user_query)
+        logger.error("Exception in create_graph: %s\n%s", e, traceback.format_exc())
         logger.info("Returning from create_graph (exception fallback)")
-        return fig
+        return _message_figure(f"Error creating {graph_type}: {str(e)}", user_query)
+
+
+def render_graph(graph_type: str, formatted_data, user_query: str, selected_columns=None):
+    """
+    Cache-aware wrapper around `create_graph`. Returns (figure, figure_json).
+
+    Figures are looked up by a hash of the data, chart type, columns, title
+    and rendering settings, so a repeat render skips both building and
+    serializing. Placeholder figures (no traces) are never cached.
+    """
+    cache = get_figure_cache()
+    data = extract_json(formatted_data)
+    if cache is None or data is None:
+        fig = create_graph(graph_type, formatted_data, user_query, selected_columns)
+        return fig, fig.to_json()
+
+    key = make_figure_key(data, graph_type, selected_columns or [], user_query, get_render_settings())
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info("Figure cache hit for %s graph", graph_type)
+        return cached
+
+    fig = create_graph(graph_type, data, user_query, selected_columns)
+    figure_json = fig.to_json()
+    if fig.data:
+        cache.put(key, fig, figure_json)
+    return fig, figure_json
 
 
 def graph_renderer_node(state: GraphState) -> GraphState:
     graph_type = state["selected_graph_type"]
     formatted_data = state["formatted_data"]
+    chart_data = state.get("trimmed_data") or state.get("parsed_data") or formatted_data
     user_query = state["user_query"]
     selected_columns = state.get("selected_columns", None)
-    logger.info(f"graph_renderer_node called with graph_type={graph_type}, selected_columns={selected_columns}")
+    logger.info("graph_renderer_node called with graph_type=%s, selected_columns=%s", graph_type, selected_columns)
     try:
-        graph_object = create_graph(graph_type, formatted_data, user_query, selected_columns)
-        logger.info(f"Rendered {graph_type} graph")
+        graph_object, graph_json = render_graph(graph_type, chart_data, user_query, selected_columns)
+        logger.info("Rendered %s graph", graph_type)
         logger.info("Returning from graph_renderer_node")
         return {
-            "messages": state["messages"],
-            "response": state["response"],
-            "search_results": state["search_results"],
-            "user_query": user_query,
-            "selected_graph_type": graph_type,
-            "selected_columns": selected_columns,
-            "formatted_data": formatted_data,
             "graph_object": graph_object,
-            "can_generate_graph": state["can_generate_graph"]
+            "graph_json": graph_json
         }
     except Exception as e:
-        logger.error(f"Exception in graph_renderer_node: {e}\n{traceback.format_exc()}")
-        raise 
\ No newline at end of file
+        logger.error("Exception in graph_renderer_node: %s\n%s", e, traceback.format_exc())
+        raise
+
+
+async def agraph_renderer_node(state: GraphState) -> GraphState:
+    """
+    Async variant of `graph_renderer_node`. Figure building is CPU-bound, so it
+    runs in a worker thread to keep the event loop free for other queries.
+    """
+    return await asyncio.to_thread(graph_renderer_node, state)
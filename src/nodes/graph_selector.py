@@ -1,85 +1,127 @@
-import os
-import json
-from typing import TypedDict, Annotated, List
-from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.messages import HumanMessage
+from src.state import GraphState
+from src.prompt_registry import render_prompt
 from src.utils import get_llm
-from src.logger import get_logger
+from src.graph_rules import select_graph_by_rules
+from src.data_profile import profile_data
+from src.json_codec import dumps, extract_json
+from src.logger import get_logger, payload
 
 logger = get_logger(__name__)
 
-# Define the state for our graph
-class GraphState(TypedDict):
-    messages: Annotated[List[BaseMessage], "The messages in the conversation"]
-    response: Annotated[str, "The response from the LLM"]
-    search_results: Annotated[str, "Results from web search"]
-    user_query: Annotated[str, "The original user query"]
-    selected_graph_type: Annotated[str, "The selected graph type"]
-    selected_columns: Annotated[List[str], "The selected columns"]
-    formatted_data: Annotated[str, "Formatted data for graphing"]
-    graph_object: Annotated[str, "The graph object"]
-    can_generate_graph: Annotated[str, "Whether the query can generate a graph (Yes/No)"]
 
 
-def load_graph_selection_instructions():
+def _load_data(state: GraphState):
     """
-    Load graph selection instructions from the prompts file.
+    Return the extracted data as a dict, reusing `parsed_data` when an earlier
+    node already decoded it. None if there is no JSON object.
     """
-    instructions_path = os.path.join(os.path.dirname(__file__), "..", "prompts", "graph-selection-instructions.txt")
-    try:
-        with open(instructions_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        logger.error(f"Graph selection instructions file not found at {instructions_path}")
-        return "Select the best graph type for this data: {data}"
+    data = state.get("parsed_data")
+    if data is not None:
+        return data
+    return extract_json(state["formatted_data"])
 
 
-def graph_selector_node(state: GraphState) -> GraphState:
+def _build_selection_prompt(state: GraphState, data=None) -> str:
     """
-    Select the best graph type based on the formatted data using OpenAI.
+    Fill the graph selection template with a compact profile of the extracted
+    data and the user query. The raw string is sent only if it is not valid JSON.
     """
-    llm = get_llm()
-    logger.info(f"Graph selector node called with state: {state}")
-    formatted_data = state["formatted_data"]
-    user_query = state["user_query"]
-
-    # Ensure formatted_data is a minified JSON string
-    if isinstance(formatted_data, dict):
-        formatted_data_str = json.dumps(formatted_data, separators=(',', ':'))
+    if data is not None:
+        formatted_data_str = dumps(profile_data(data), compact=True)
     else:
-        formatted_data_str = str(formatted_data).strip()
+        formatted_data_str = str(state["formatted_data"]).strip()
 
-    # Load instructions and replace placeholders
-    instructions_template = load_graph_selection_instructions()
-    prompt = instructions_template.format(
+    prompt = render_prompt(
+        "graph_selection",
         data=formatted_data_str,
-        user_query=user_query
+        user_query=state["user_query"]
     )
-    logger.info(f"Graph selector prompt: {prompt[:500]}...")
+    logger.debug("Graph selector prompt: %s", payload(prompt))
+    return prompt
 
-    messages = [HumanMessage(content=prompt)]
+
+def _parse_selection(response, prompt: str):
+    """
+    Parse the LLM's JSON answer into (selected_graph_type, selected_columns).
+    """
     try:
-        response = llm.invoke(messages)
-        logger.info(f"LLM response: {response.content!r}")
-        # Clean up LLM response
-        response_str = str(response.content).strip()
-        if response_str.startswith("```json"):
-            response_str = response_str[7:-3].strip()
-        result_json = json.loads(response_str)
+        logger.debug("LLM response: %r", payload(response.content))
+        result_json = extract_json(response.content)
+        if result_json is None:
+            raise ValueError("no JSON object in graph selection response")
         selected_graph_type = result_json.get("selected_graph_type", "").lower()
         selected_columns = result_json.get("selected_columns", [])
-        logger.info(f"Selected graph type: {selected_graph_type}, columns: {selected_columns}")
+        logger.info("Selected graph type: %s, columns: %s", selected_graph_type, selected_columns)
     except Exception as e:
-        logger.error(f"Error during LLM graph selection: {e}\nPrompt sent: {prompt!r}")
+        logger.error("Error during LLM graph selection: %s\nPrompt sent: %r", e, payload(prompt))
         raise
+    return selected_graph_type, selected_columns
 
+
+def _build_selection_state(selected_graph_type: str, selected_columns) -> GraphState:
     return {
-        "messages": state["messages"],
-        "response": state["response"],
-        "search_results": state["search_results"],
-        "user_query": user_query,
         "selected_graph_type": selected_graph_type,
-        "selected_columns": selected_columns,
-        "formatted_data": formatted_data,
-        "graph_object": state.get("graph_object", None),
-        "can_generate_graph": state.get("can_generate_graph", "No")
-    } 
\ No newline at end of file
+        "selected_columns": selected_columns
+    }
+
+
+def _select_by_rules(state: GraphState, data):
+    """
+    Try the deterministic dtype-based selector; returns None if the schema is ambiguous.
+    """
+    if data is None:
+        return None
+    selection = select_graph_by_rules(data, state["user_query"])
+    if selection is not None:
+        logger.info("Rule-based graph selection: %s, columns: %s", selection[0], selection[1])
+    return selection
+
+
+def graph_selector_node(state: GraphState) -> GraphState:
+    """
+    Select the best graph type based on the formatted data.
+    Common schemas are handled by rules; ambiguous ones go to OpenAI.
+    """
+    logger.info("Graph selector node called for query: %s", state.get("user_query"))
+    data = _load_data(state)
+    selection = _select_by_rules(state, data)
+    if selection is not None:
+        return _build_selection_state(*selection)
+
+    llm = get_llm(cache_scope="graph_selector")
+    prompt = _build_selection_prompt(state, data)
+
+    messages = [HumanMessage(content=prompt)]
+    try:
+        response = llm.invoke(messages)
+    except Exception as e:
+        logger.error("Error during LLM graph selection: %s\nPrompt sent: %r", e, payload(prompt))
+        raise
+    selected_graph_type, selected_columns = _parse_selection(response, prompt)
+
+    return _build_selection_state(selected_graph_type, selected_columns)
+
+
+async def agraph_selector_node(state: GraphState) -> GraphState:
+    """
+    Async variant of `graph_selector_node`.
+    """
+    logger.info("Graph selector node called for query: %s", state.get("user_query"))
+    data = _load_data(state)
+    selection = _select_by_rules(state, data)
+    if selection is not None:
+        return _build_selection_state(*selection)
+
+    llm = get_llm(cache_scope="graph_selector")
+    prompt = _build_selection_prompt(state, data)
+
+    messages = [HumanMessage(content=prompt)]
+    try:
+        response = await llm.ainvoke(messages)
+    except Exception as e:
+        logger.error("Error during LLM graph selection: %s\nPrompt sent: %r", e, payload(prompt))
+        raise
+    selected_graph_type, selected_columns = _parse_selection(response, prompt)
+
+    return _build_selection_state(selected_graph_type, selected_columns)
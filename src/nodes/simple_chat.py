@@ -1,23 +1,16 @@
-import logging
-from typing import TypedDict, Annotated, List
-from langchain_core.messages import BaseMessage
+from src.state import GraphState
 from src.utils import get_llm
+from src.logger import get_logger
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
-# Define the state for our graph
-class GraphState(TypedDict):
-    messages: Annotated[List[BaseMessage], "The messages in the conversation"]
-    response: Annotated[str, "The response from the LLM"]
-    search_results: Annotated[str, "Results from web search"]
-    user_query: Annotated[str, "The original user query"]
 
 
 def chat_node(state: GraphState) -> GraphState:
     """
     Process the conversation and generate a response.
     """
-    llm = get_llm()
+    llm = get_llm(cache_scope="chat")
     messages = state["messages"]
     
     # Invoke the LLM
@@ -28,7 +21,22 @@ def chat_node(state: GraphState) -> GraphState:
     # Update the state
     return {
         "messages": messages + [response],
-        "response": str(response.content),
-        "search_results": state.get("search_results", ""),
-        "user_query": state.get("user_query", "")
-    } 
\ No newline at end of file
+        "response": str(response.content)
+    }
+
+
+async def achat_node(state: GraphState) -> GraphState:
+    """
+    Async variant of `chat_node`.
+    """
+    llm = get_llm(cache_scope="chat")
+    messages = state["messages"]
+    
+    response = await llm.ainvoke(messages)
+    
+    logger.info("Generated simple chat response")
+    
+    return {
+        "messages": messages + [response],
+        "response": str(response.content)
+    }
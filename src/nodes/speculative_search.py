@@ -0,0 +1,51 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src.nodes.query_filtering import query_filtering_node, aquery_filtering_node
+from src.nodes.web_search import web_search_node, aweb_search_node
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Worker pool for searches started ahead of the classification verdict
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="speculative-search")
+
+
+def speculative_filter_and_search_node(state):
+    """
+    Classify the query and run the web search concurrently.
+
+    The search is started before the classifier returns. If the verdict is
+    "No" the pending search is cancelled, or its result discarded if it is
+    already running; otherwise its results are merged into the returned state.
+    """
+    search_future = _search_executor.submit(web_search_node, state)
+    filtered_state = query_filtering_node(state)
+
+    if filtered_state["can_generate_graph"] == "No":
+        if not search_future.cancel():
+            logger.info("Discarding speculative web search for non-graphable query")
+        return filtered_state
+
+    search_state = search_future.result()
+    return {**filtered_state, **search_state}
+
+
+async def aspeculative_filter_and_search_node(state):
+    """
+    Async variant of `speculative_filter_and_search_node`; the search runs as
+    a task and is cancelled outright when the query is not graphable.
+    """
+    search_task = asyncio.ensure_future(aweb_search_node(state))
+    try:
+        filtered_state = await aquery_filtering_node(state)
+    except BaseException:
+        search_task.cancel()
+        raise
+
+    if filtered_state["can_generate_graph"] == "No":
+        search_task.cancel()
+        logger.info("Cancelled speculative web search for non-graphable query")
+        return filtered_state
+
+    search_state = await search_task
+    return {**filtered_state, **search_state}
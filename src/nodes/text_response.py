@@ -13,7 +13,11 @@ def text_response_node(state):
     
     logger.info("Generated text response for non-graphable query")
     
-    return {
-        **state,
-        "response": response_text
-    } 
\ No newline at end of file
+    return {"response": response_text}
+
+
+async def atext_response_node(state):
+    """
+    Async variant of `text_response_node`; no I/O, so it runs inline.
+    """
+    return text_response_node(state)
@@ -1,56 +1,88 @@
-from openai import OpenAI
-from typing import TypedDict, Annotated, List
-from langchain_core.messages import BaseMessage
-from src.logger import get_logger
+from src.state import GraphState
+from src.utils import get_search_client, get_async_search_client, get_search_config
+from src.search_cache import get_search_cache
+from src.logger import get_logger, payload
 
 logger = get_logger(__name__)
 
-# Define the state for our graph
-class GraphState(TypedDict):
-    messages: Annotated[List[BaseMessage], "The messages in the conversation"]
-    response: Annotated[str, "The response from the LLM"]
-    search_results: Annotated[str, "Results from web search"]
-    user_query: Annotated[str, "The original user query"]
-    selected_graph_type: Annotated[str, "The selected graph type"]
-    formatted_data: Annotated[str, "The formatted data"]
-    graph_object: Annotated[str, "The graph object"]
-    can_generate_graph: Annotated[str, "Whether the query can generate a graph (Yes/No)"]
+
+def _extract_search_results(response) -> str:
+    """
+    Pull the answer text out of a Responses API result.
+    """
+    search_results = response.output_text if hasattr(response, 'output_text') else "No search results found for this query."
+    logger.debug("Raw search results: %s", payload(search_results))
+    logger.info("OpenAI web search completed successfully")
+    return search_results
+
+
+def _search(user_query: str) -> str:
+    """
+    Run one web search through the pooled client. Raises on failure.
+    """
+    client = get_search_client()
+    
+    # Use OpenAI's native web search functionality
+    response = client.responses.create(
+        model=get_search_config()["model_id"],
+        tools=[{"type": "web_search_preview"}],
+        input=user_query
+    )
+    return _extract_search_results(response)
+
+
+async def _asearch(user_query: str) -> str:
+    """
+    Async variant of `_search`.
+    """
+    client = get_async_search_client()
+    
+    response = await client.responses.create(
+        model=get_search_config()["model_id"],
+        tools=[{"type": "web_search_preview"}],
+        input=user_query
+    )
+    return _extract_search_results(response)
 
 
 def web_search_node(state: GraphState) -> GraphState:
     """
     Perform web search for the user query using OpenAI's native web search.
+    Results are served from the search cache when a fresh or stale entry exists.
     """
     user_query = state["user_query"]
-    logger.info(f"Performing web search for: {user_query}")
+    logger.info("Performing web search for: %s", user_query)
     
     try:
-        # Initialize OpenAI client when needed
-        client = OpenAI()
-        
-        # Use OpenAI's native web search functionality
-        response = client.responses.create(
-            model="gpt-4.1",
-            tools=[{"type": "web_search_preview"}],
-            input=user_query
-        )
+        cache = get_search_cache()
+        if cache is not None:
+            search_results = cache.get_or_fetch(user_query, _search)
+        else:
+            search_results = _search(user_query)
         
-        # Extract the response text
-        search_results = response.output_text if hasattr(response, 'output_text') else "No search results found for this query."
-        logger.info(f"Raw Search results: {search_results}")
-        logger.info(f"OpenAI web search completed successfully")
+    except Exception as e:
+        logger.error("OpenAI web search failed: %s", e)
+        search_results = f"Web search failed: {str(e)}"
+    
+    return {"search_results": search_results}
+
+
+async def aweb_search_node(state: GraphState) -> GraphState:
+    """
+    Async variant of `web_search_node` using `AsyncOpenAI`.
+    """
+    user_query = state["user_query"]
+    logger.info("Performing web search for: %s", user_query)
+    
+    try:
+        cache = get_search_cache()
+        if cache is not None:
+            search_results = await cache.aget_or_fetch(user_query, _asearch)
+        else:
+            search_results = await _asearch(user_query)
         
     except Exception as e:
-        logger.error(f"OpenAI web search failed: {e}")
+        logger.error("OpenAI web search failed: %s", e)
         search_results = f"Web search failed: {str(e)}"
     
-    return {
-        "messages": state["messages"],
-        "response": state["response"],
-        "search_results": search_results,
-        "user_query": user_query,
-        "selected_graph_type": state.get("selected_graph_type", ""),
-        "formatted_data": state.get("formatted_data", ""),
-        "graph_object": state.get("graph_object", None),
-        "can_generate_graph": state.get("can_generate_graph", "No")
-    } 
\ No newline at end of file
+    return {"search_results": search_results}
@@ -1,70 +1,67 @@
-import os
-from typing import TypedDict, Annotated, List
-from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.messages import HumanMessage
+from src.state import GraphState
+from src.prompt_registry import render_prompt
 from src.utils import get_llm
-from src.logger import get_logger
+from src.json_codec import extract_json
+from src.logger import get_logger, payload
 
 logger = get_logger(__name__)
 
-# Define the state for our graph
-class GraphState(TypedDict):
-    messages: Annotated[List[BaseMessage], "The messages in the conversation"]
-    response: Annotated[str, "The response from the LLM"]
-    search_results: Annotated[str, "Results from web search"]
-    user_query: Annotated[str, "The original user query"]
-    selected_graph_type: Annotated[str, "The selected graph type"]
-    formatted_data: Annotated[str, "The formatted data"]
-    graph_object: Annotated[str, "The graph object"]
-    can_generate_graph: Annotated[str, "Whether the query can generate a graph (Yes/No)"]
 
 
-def load_instructions():
+def _build_extraction_messages(state: GraphState):
     """
-    Load instructions from the web-search-instructions.txt file in src/prompts/.
+    Build the single-message prompt that turns search results into structured data.
     """
-    instructions_path = os.path.join(os.path.dirname(__file__), "..", "prompts", "web-search-instructions.txt")
-    try:
-        with open(instructions_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
-        logger.error(f"Instructions file not found at {instructions_path}")
-        return "You are a helpful assistant. Please provide a comprehensive answer to the user's query."
+    enhanced_prompt = render_prompt(
+        "web_search",
+        user_query=state["user_query"],
+        search_results=state["search_results"]
+    )
+    
+    # Use a fresh message list for the LLM call to get only the structured data
+    return [HumanMessage(content=enhanced_prompt)]
+
+
+def _build_extraction_state(response) -> GraphState:
+    cleaned_data = str(response.content)
+    logger.info("Cleaned search results into structured data.")
+
+    logger.debug("Cleaned data: %s", payload(cleaned_data))
+    
+    # Decode once here; downstream nodes read `parsed_data` instead of re-parsing
+    parsed_data = extract_json(cleaned_data)
+    if parsed_data is None:
+        logger.warning("No JSON object found in extracted data")
+    
+    # The cleaned data is the main "response" to the user, and also the formatted data for the graph
+    return {
+        "response": cleaned_data,
+        "formatted_data": cleaned_data,
+        "parsed_data": parsed_data
+    }
 
 
 def chat_with_search_node(state: GraphState) -> GraphState:
     """
     Cleans and formats web search results into structured data using an LLM.
     """
-    llm = get_llm()
-    search_results = state["search_results"]
-    user_query = state["user_query"]
-    
-    # Load instructions from file and replace placeholders
-    instructions_template = load_instructions()
-    enhanced_prompt = instructions_template.format(
-        user_query=user_query,
-        search_results=search_results
-    )
-    
-    # Use a fresh message list for the LLM call to get only the structured data
-    llm_messages = [HumanMessage(content=enhanced_prompt)]
+    llm = get_llm(cache_scope="chat_with_search")
+    llm_messages = _build_extraction_messages(state)
     
     # Get response from LLM - this response should be the cleaned data
     response = llm.invoke(llm_messages)
     
-    cleaned_data = str(response.content)
-    logger.info("Cleaned search results into structured data.")
+    return _build_extraction_state(response)
+
 
-    logger.info(f"Cleaned data: {cleaned_data}")    
+async def achat_with_search_node(state: GraphState) -> GraphState:
+    """
+    Async variant of `chat_with_search_node`.
+    """
+    llm = get_llm(cache_scope="chat_with_search")
+    llm_messages = _build_extraction_messages(state)
     
-    # The cleaned data is the main "response" to the user, and also the formatted data for the graph
-    return {
-        "messages": state["messages"], # Pass original messages through
-        "response": cleaned_data,
-        "search_results": search_results,
-        "user_query": user_query,
-        "selected_graph_type": state.get("selected_graph_type", ""),
-        "formatted_data": cleaned_data,
-        "graph_object": state.get("graph_object", None),
-        "can_generate_graph": state.get("can_generate_graph", "No")
-    } 
\ No newline at end of file
+    response = await llm.ainvoke(llm_messages)
+    
+    return _build_extraction_state(response)
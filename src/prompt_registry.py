@@ -0,0 +1,220 @@
+import os
+import string
+import threading
+import time
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+import yaml
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+LLM_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "llm_config.yaml")
+PROMPTS_DIR = os.path.join(os.path.dirname(__file__), "prompts")
+
+# Seconds between mtime checks of a watched file; within the interval a
+# lookup is a plain attribute read with no file I/O.
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+class PromptValidationError(ValueError):
+    """A prompt template's placeholders do not match what its node fills in."""
+
+
+class WatchedFile:
+    """
+    A file parsed once and re-parsed only when its mtime changes.
+
+    If a reload fails (unreadable file, invalid YAML, bad placeholders) the
+    previous value stays in service and the error is logged; a failure on the
+    very first load is raised.
+    """
+
+    def __init__(self, path: str, loader: Callable[[str], Any], check_interval: Optional[float] = None):
+        self.path = path
+        self.loader = loader
+        self.check_interval = check_interval
+        self._value = None
+        self._mtime = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        interval = RELOAD_CHECK_INTERVAL if self.check_interval is None else self.check_interval
+        if self._mtime is not None and time.monotonic() - self._checked_at < interval:
+            return self._value
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                if self._mtime is None:
+                    raise
+                logger.error("Cannot stat %s; keeping the loaded version", self.path)
+                return self._value
+            if mtime != self._mtime:
+                try:
+                    value = self.loader(self.path)
+                except Exception as e:
+                    if self._mtime is None:
+                        raise
+                    logger.error("Reload of %s failed, keeping the previous version: %s", self.path, e)
+                    self._mtime = mtime
+                    return self._value
+                if self._mtime is not None:
+                    logger.info("Reloaded %s", self.path)
+                self._value = value
+                self._mtime = mtime
+            return self._value
+
+
+def template_fields(template: str) -> FrozenSet[str]:
+    """Names of the `str.format` placeholders in `template`."""
+    return frozenset(
+        field.split(".")[0].split("[")[0]
+        for _, field, _, _ in string.Formatter().parse(template)
+        if field is not None
+    )
+
+
+class PromptSpec:
+    """
+    A prompt file under src/prompts/. `placeholders` is the exact set of
+    `str.format` fields the calling node supplies, or None for prompts that are
+    sent verbatim. `fallback` is used if the file is missing.
+    """
+
+    def __init__(self, filename: str, placeholders: Optional[FrozenSet[str]], fallback: str):
+        self.filename = filename
+        self.placeholders = placeholders
+        self.fallback = fallback
+
+    @property
+    def path(self) -> str:
+        return os.path.join(PROMPTS_DIR, self.filename)
+
+    def load(self, path: str) -> str:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        self.validate(text)
+        return text
+
+    def validate(self, text: str) -> None:
+        if self.placeholders is None:
+            if not text.strip():
+                raise PromptValidationError(f"{self.filename} is empty")
+            return
+        try:
+            fields = template_fields(text)
+        except ValueError as e:
+            raise PromptValidationError(f"{self.filename}: {e}") from None
+        if fields != self.placeholders:
+            missing = sorted(self.placeholders - fields)
+            unknown = sorted(fields - self.placeholders)
+            raise PromptValidationError(
+                f"{self.filename}: missing placeholders {missing}, unknown placeholders {unknown}"
+                " (escape literal braces as {{ }})"
+            )
+
+
+PROMPTS: Dict[str, PromptSpec] = {
+    "web_search": PromptSpec(
+        "web-search-instructions.txt",
+        frozenset({"user_query", "search_results"}),
+        "You are a helpful assistant. Please provide a comprehensive answer to the user's query.",
+    ),
+    "graph_selection": PromptSpec(
+        "graph-selection-instructions.txt",
+        frozenset({"data", "user_query"}),
+        "Select the best graph type for this data: {data}",
+    ),
+    "graph_classification": PromptSpec(
+        "graph-classification-instructions.txt",
+        None,
+        "",
+    ),
+}
+
+_prompt_files: Dict[str, WatchedFile] = {}
+_config_file: Optional[WatchedFile] = None
+_registry_lock = threading.Lock()
+
+
+def _watched_prompt(name: str) -> WatchedFile:
+    watched = _prompt_files.get(name)
+    if watched is None:
+        with _registry_lock:
+            watched = _prompt_files.get(name)
+            if watched is None:
+                spec = PROMPTS[name]
+                watched = WatchedFile(spec.path, spec.load)
+                _prompt_files[name] = watched
+    return watched
+
+
+def get_prompt(name: str) -> str:
+    """
+    Return the current text of prompt `name`, falling back to its built-in
+    default if the file does not exist.
+    """
+    try:
+        return _watched_prompt(name).get()
+    except FileNotFoundError:
+        spec = PROMPTS[name]
+        logger.error("Prompt file not found at %s", spec.path)
+        return spec.fallback
+
+
+def render_prompt(name: str, **values: Any) -> str:
+    """Fill the placeholders of prompt `name`."""
+    return get_prompt(name).format(**values)
+
+
+def _load_yaml(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    if not config:
+        raise ValueError(f"llm_config.yaml is empty or invalid at {path}")
+    return config
+
+
+def get_config() -> dict:
+    """Return the parsed llm_config.yaml, re-read when the file changes."""
+    global _config_file
+    if _config_file is None:
+        with _registry_lock:
+            if _config_file is None:
+                _config_file = WatchedFile(LLM_CONFIG_PATH, _load_yaml)
+    return _config_file.get()
+
+
+def get_model_profile(name: str) -> dict:
+    """
+    Return a model profile section (e.g. "openai", "gpt-mini") as
+    {"model_id": ..., "model_kwargs": {...}}.
+    """
+    profile = dict(get_config().get(name) or {})
+    profile["model_kwargs"] = dict(profile.get("model_kwargs") or {})
+    return profile
+
+
+def preload() -> None:
+    """
+    Load llm_config.yaml and every prompt, validating placeholders. Raises
+    PromptValidationError at startup rather than on the first request.
+    """
+    get_config()
+    for name in PROMPTS:
+        try:
+            _watched_prompt(name).get()
+        except FileNotFoundError:
+            logger.error("Prompt file not found at %s", PROMPTS[name].path)
+
+
+def reset() -> None:
+    """Forget every loaded file (for tests)."""
+    global _config_file
+    with _registry_lock:
+        _prompt_files.clear()
+        _config_file = None
@@ -0,0 +1,286 @@
+import argparse
+import json
+import math
+import os
+import random
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.logger import configure_logging, get_logger
+from src.utils import LLM_CONFIG_PATH, load_config_section
+
+logger = get_logger(__name__)
+
+# Defaults for the local classifier, overridable from the `query_classifier`
+# section of llm_config.yaml.
+DEFAULT_QUERY_CLASSIFIER_CONFIG = {
+    "enabled": True,
+    "confidence_threshold": 0.9,
+    "model_path": None,
+    "log_path": None,
+    "min_training_examples": 50,
+}
+
+# Each rule carries its own confidence. Only strong patterns reach the default
+# 0.9 threshold; weaker cues (a question lead-in, a bare "top N") still return
+# a verdict but fall through to the LLM.
+WEAK_RULE_CONFIDENCE = 0.6
+
+# Cues that a query asks for comparable or measurable numbers
+GRAPHABLE_PATTERNS = [
+    (re.compile(r"\b(by|per)\s+(country|countries|state|year|month|region|sector|gdp|population|revenue|sales|market share)\b"), 0.95),
+    (re.compile(r"\b(compare|comparison|versus|vs\.?|ranking|rank)\b.*\b(gdp|population|revenue|sales|price|budget|spending|emissions|production|income)\b"), 0.95),
+    (re.compile(r"(%|\bpercent(age)?\b|\bshare of\b|\bdistribution of\b|\bbreakdown of\b)"), 0.9),
+    (re.compile(r"\b(over time|trend|growth rate|time series|year over year|historical)\b"), 0.9),
+    (re.compile(r"\b(top|bottom|largest|smallest|biggest|highest|lowest)\s+\d+\b"), 0.8),
+]
+
+# Cues that a query asks for opinions, instructions or a list of non-numeric items
+NON_GRAPHABLE_PATTERNS = [
+    (re.compile(r"\b(do you (like|think)|your opinion|best movie|recipe|step by step)\b"), 0.95),
+    (re.compile(r"\b(reasons|tips|ways|ideas|steps|mistakes|habits)\b"), 0.8),
+]
+
+# Opening words of explanation questions; skipped when the query names a quantity
+LEAD_IN_PATTERNS = [
+    (re.compile(r"^\s*how to\b"), 0.95),
+    (re.compile(r"^\s*(define|explain|describe)\b"), 0.8),
+    (re.compile(r"^\s*(what is|what's|what are|who is|who was|why)\b"), WEAK_RULE_CONFIDENCE),
+    (re.compile(r"^\s*how (do|does|did|can|should)\b"), WEAK_RULE_CONFIDENCE),
+]
+
+# Quantity words that override a lead-in ("what are the top 5 ...")
+_QUANTITY_RE = re.compile(r"\b(\d+|gdp|population|revenue|sales|statistics|stats|numbers?|rate|percent(age)?)\b|%")
+
+_TOKEN_RE = re.compile(r"[a-z0-9%$]+")
+
+
+def classify_by_rules(query: str) -> Optional[Tuple[str, float]]:
+    """
+    Apply the keyword/regex rules. Returns (verdict, confidence) or None when
+    the rules do not fire or contradict each other.
+    """
+    text = query.casefold()
+    graphable = _best_confidence(GRAPHABLE_PATTERNS, text)
+    non_graphable = _best_confidence(NON_GRAPHABLE_PATTERNS, text)
+    if not _QUANTITY_RE.search(text):
+        non_graphable = max(non_graphable, _best_confidence(LEAD_IN_PATTERNS, text))
+    if graphable and not non_graphable:
+        return "Yes", graphable
+    if non_graphable and not graphable:
+        return "No", non_graphable
+    return None
+
+
+def _best_confidence(patterns: List[Tuple[re.Pattern, float]], text: str) -> float:
+    """Highest confidence among the matching rules, 0.0 if none match."""
+    return max((confidence for pattern, confidence in patterns if pattern.search(text)), default=0.0)
+
+
+def _features(query: str) -> List[str]:
+    """Unigrams plus bigrams of the case-folded query."""
+    tokens = _TOKEN_RE.findall(query.casefold())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class TfidfLogisticModel:
+    """
+    Minimal TF-IDF + logistic regression model, trained with SGD.
+    Predicts the probability that a query can generate a graph.
+    """
+
+    def __init__(self, idf: Dict[str, float], weights: Dict[str, float], bias: float = 0.0):
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+
+    def _vectorize(self, query: str) -> Dict[str, float]:
+        counts = Counter(term for term in _features(query) if term in self.idf)
+        vector = {term: count * self.idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        if norm:
+            vector = {term: value / norm for term, value in vector.items()}
+        return vector
+
+    def predict_proba(self, query: str) -> float:
+        return self._score(self._vectorize(query))
+
+    @classmethod
+    def fit(
+        cls,
+        queries: List[str],
+        labels: List[int],
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        seed: int = 0,
+    ) -> "TfidfLogisticModel":
+        """Fit on queries with labels 1 (Yes) / 0 (No)."""
+        document_frequency = Counter()
+        for query in queries:
+            document_frequency.update(set(_features(query)))
+        n = len(queries)
+        idf = {term: math.log((1 + n) / (1 + df)) + 1.0 for term, df in document_frequency.items()}
+
+        model = cls(idf=idf, weights={}, bias=0.0)
+        samples = [(model._vectorize(query), label) for query, label in zip(queries, labels)]
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(samples)
+            for vector, label in samples:
+                error = model._score(vector) - label
+                model.bias -= learning_rate * error
+                for term, value in vector.items():
+                    weight = model.weights.get(term, 0.0)
+                    model.weights[term] = weight - learning_rate * (error * value + l2 * weight)
+        return model
+
+    def _score(self, vector: Dict[str, float]) -> float:
+        score = self.bias + sum(self.weights.get(term, 0.0) * value for term, value in vector.items())
+        return 1.0 / (1.0 + math.exp(-max(min(score, 35.0), -35.0)))
+
+    def to_dict(self) -> dict:
+        return {"idf": self.idf, "weights": self.weights, "bias": self.bias}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TfidfLogisticModel":
+        return cls(idf=data["idf"], weights=data["weights"], bias=data.get("bias", 0.0))
+
+
+class LocalQueryClassifier:
+    """
+    Fast local tier in front of the LLM graph-classification gate.
+
+    Rules run first, then the trained model if one is available. A verdict is
+    returned only when its confidence reaches `confidence_threshold`;
+    otherwise the caller falls back to the LLM and may record its verdict
+    with `log_verdict` for the next training run.
+    """
+
+    def __init__(
+        self,
+        model: Optional[TfidfLogisticModel] = None,
+        confidence_threshold: float = 0.9,
+        log_path: Optional[str] = None,
+    ):
+        self.model = model
+        self.confidence_threshold = confidence_threshold
+        self.log_path = log_path
+        self._log_lock = threading.Lock()
+
+    def classify(self, query: str) -> Optional[str]:
+        """Return "Yes"/"No" when confident, else None."""
+        rule_verdict = classify_by_rules(query)
+        if rule_verdict is not None and rule_verdict[1] >= self.confidence_threshold:
+            logger.info("Local rule classification: %s", rule_verdict[0])
+            return rule_verdict[0]
+        if self.model is not None:
+            probability = self.model.predict_proba(query)
+            confidence = max(probability, 1.0 - probability)
+            if confidence >= self.confidence_threshold:
+                verdict = "Yes" if probability >= 0.5 else "No"
+                logger.info("Local model classification: %s (%.2f)", verdict, confidence)
+                return verdict
+        return None
+
+    def log_verdict(self, query: str, verdict: str) -> None:
+        """Append an LLM verdict to the training log."""
+        if not self.log_path or verdict not in ("Yes", "No"):
+            return
+        with self._log_lock:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"user_query": query, "can_generate_graph": verdict}) + "\n")
+
+
+def read_training_log(log_path: str) -> Tuple[List[str], List[int]]:
+    """Read (queries, labels) from a JSONL verdict log, last verdict per query wins."""
+    verdicts: Dict[str, int] = {}
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            verdicts[record["user_query"]] = 1 if record["can_generate_graph"] == "Yes" else 0
+    return list(verdicts.keys()), list(verdicts.values())
+
+
+def train_from_log(log_path: str, model_path: str, min_examples: int = 50) -> Optional[TfidfLogisticModel]:
+    """
+    Train a model from the verdict log and save it to `model_path`.
+    Returns None if there is too little (or single-class) data.
+    """
+    queries, labels = read_training_log(log_path)
+    if len(queries) < min_examples or len(set(labels)) < 2:
+        logger.warning("Not enough training data in %s: %s queries", log_path, len(queries))
+        return None
+    model = TfidfLogisticModel.fit(queries, labels)
+    directory = os.path.dirname(model_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(model_path, "w", encoding="utf-8") as f:
+        json.dump(model.to_dict(), f)
+    logger.info("Trained query classifier on %s queries -> %s", len(queries), model_path)
+    return model
+
+
+def _resolve_path(path: Optional[str]) -> Optional[str]:
+    if path and not os.path.isabs(path):
+        return os.path.join(os.path.dirname(LLM_CONFIG_PATH), path)
+    return path
+
+
+def _load_settings() -> dict:
+    settings = {**DEFAULT_QUERY_CLASSIFIER_CONFIG, **load_config_section("query_classifier")}
+    settings["model_path"] = _resolve_path(settings["model_path"])
+    settings["log_path"] = _resolve_path(settings["log_path"])
+    return settings
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_query_classifier() -> Optional[LocalQueryClassifier]:
+    """
+    Return the process-wide local classifier configured from llm_config.yaml,
+    or None if the local tier is disabled.
+    """
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            settings = _load_settings()
+            if not settings["enabled"]:
+                return None
+            model = None
+            if settings["model_path"] and os.path.exists(settings["model_path"]):
+                with open(settings["model_path"], encoding="utf-8") as f:
+                    model = TfidfLogisticModel.from_dict(json.load(f))
+            _classifier = LocalQueryClassifier(
+                model=model,
+                confidence_threshold=settings["confidence_threshold"],
+                log_path=settings["log_path"],
+            )
+        return _classifier
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    configure_logging()
+    settings = _load_settings()
+    parser = argparse.ArgumentParser(description="Train the local query classifier from logged LLM verdicts.")
+    parser.add_argument("--log", default=settings["log_path"], help="JSONL verdict log")
+    parser.add_argument("--model", default=settings["model_path"], help="Output model path")
+    parser.add_argument("--min-examples", type=int, default=settings["min_training_examples"])
+    args = parser.parse_args(argv)
+    if not args.log or not args.model:
+        parser.error("--log and --model are required when not set in llm_config.yaml")
+    return 0 if train_from_log(args.log, args.model, args.min_examples) is not None else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,272 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from src.logger import get_logger
+from src.metrics import record_cache
+from src.utils import LLM_CONFIG_PATH, load_config_section
+
+logger = get_logger(__name__)
+
+FRESH = "fresh"
+STALE = "stale"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION_RE = re.compile(r"[\s?!.]+$")
+
+# Defaults for the search cache, overridable from `web_search.cache`
+# in llm_config.yaml.
+DEFAULT_SEARCH_CACHE_CONFIG = {
+    "enabled": True,
+    "fresh_ttl": 3600,
+    "stale_ttl": 86400,
+    "max_entries": 512,
+    "sqlite_path": None,
+    "refresh_workers": 2,
+}
+
+
+def normalize_query(query: str) -> str:
+    """
+    Fold Unicode compatibility forms, case, runs of whitespace and trailing
+    "?", "!" or "." so trivially different spellings of the same query share
+    a cache entry. Other punctuation is kept: signs, decimal separators and
+    "%" change what is being asked ("below -2%" vs "below 2%").
+    """
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = _WHITESPACE_RE.sub(" ", query).strip()
+    return _TRAILING_PUNCTUATION_RE.sub("", query)
+
+
+class SearchResultCache:
+    """
+    Web search result cache keyed by normalized query.
+
+    Entries younger than `fresh_ttl` are served as-is. Entries between
+    `fresh_ttl` and `stale_ttl` are served immediately while a single
+    background refresh replaces them (stale-while-revalidate). Older entries
+    are treated as misses. An optional SQLite file backs the in-memory LRU.
+    """
+
+    def __init__(
+        self,
+        fresh_ttl: float = 3600,
+        stale_ttl: float = 86400,
+        max_entries: int = 512,
+        sqlite_path: Optional[str] = None,
+        refresh_workers: int = 2,
+    ):
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = max(stale_ttl, fresh_ttl)
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._tasks = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=refresh_workers, thread_name_prefix="search-refresh"
+        )
+        self._stats: Dict[str, int] = {"fresh_hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+        self._conn = None
+        if sqlite_path:
+            self._conn = self._open_sqlite(sqlite_path)
+
+    @staticmethod
+    def _open_sqlite(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            "key TEXT PRIMARY KEY, results TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of hit/miss/refresh counters."""
+        with self._lock:
+            return dict(self._stats)
+
+    def get(self, query: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return (results, status) where status is "fresh", "stale" or None on a miss.
+        """
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT results, created_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._memory_put(key, entry)
+            if entry is None:
+                return None, None
+            results, created_at = entry
+            age = now - created_at
+            if age <= self.fresh_ttl:
+                self._memory.move_to_end(key)
+                return results, FRESH
+            if age <= self.stale_ttl:
+                self._memory.move_to_end(key)
+                return results, STALE
+            return None, None
+
+    def put(self, query: str, results: str) -> None:
+        """Store results for `query`, stamping them as fresh."""
+        key = normalize_query(query)
+        entry = (results, time.time())
+        with self._lock:
+            self._memory_put(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, results, created_at) VALUES (?, ?, ?)",
+                    (key, results, entry[1]),
+                )
+                self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM search_cache")
+                self._conn.commit()
+
+    def get_or_fetch(self, query: str, fetch: Callable[[str], str]) -> str:
+        """
+        Return cached results for `query`, calling `fetch(query)` on a miss.
+        Stale hits are returned immediately and refreshed on a worker thread.
+        Exceptions from `fetch` propagate and are never cached.
+        """
+        results, status = self.get(query)
+        record_cache("search", status or "miss")
+        if status == FRESH:
+            self._count("fresh_hits")
+            return results
+        if status == STALE:
+            self._count("stale_hits")
+            if self._claim_refresh(query):
+                self._executor.submit(self._refresh, query, fetch)
+            return results
+
+        self._count("misses")
+        results = fetch(query)
+        self.put(query, results)
+        return results
+
+    async def aget_or_fetch(self, query: str, fetch: Callable[[str], Awaitable[str]]) -> str:
+        """
+        Async variant of `get_or_fetch`; background refreshes run as tasks on
+        the current event loop.
+        """
+        results, status = self.get(query)
+        record_cache("search", status or "miss")
+        if status == FRESH:
+            self._count("fresh_hits")
+            return results
+        if status == STALE:
+            self._count("stale_hits")
+            if self._claim_refresh(query):
+                task = asyncio.ensure_future(self._arefresh(query, fetch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return results
+
+        self._count("misses")
+        results = await fetch(query)
+        self.put(query, results)
+        return results
+
+    def close(self) -> None:
+        """Wait for background refreshes to finish and release the SQLite connection."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _claim_refresh(self, query: str) -> bool:
+        """Ensure at most one refresh per normalized query is in flight."""
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _release_refresh(self, query: str) -> None:
+        with self._lock:
+            self._refreshing.discard(normalize_query(query))
+
+    def _refresh(self, query: str, fetch: Callable[[str], str]) -> None:
+        try:
+            self.put(query, fetch(query))
+            self._count("refreshes")
+        except Exception as e:
+            logger.warning("Background search refresh failed for %r: %s", query, e)
+        finally:
+            self._release_refresh(query)
+
+    async def _arefresh(self, query: str, fetch: Callable[[str], Awaitable[str]]) -> None:
+        try:
+            self.put(query, await fetch(query))
+            self._count("refreshes")
+        except Exception as e:
+            logger.warning("Background search refresh failed for %r: %s", query, e)
+        finally:
+            self._release_refresh(query)
+
+    def _memory_put(self, key: str, entry: Tuple[str, float]) -> None:
+        """Insert into the LRU tier. Caller holds the lock."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchResultCache]:
+    """
+    Return the process-wide search cache configured from `web_search.cache`
+    in llm_config.yaml, or None if caching is disabled.
+    """
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            settings = {
+                **DEFAULT_SEARCH_CACHE_CONFIG,
+                **(load_config_section("web_search").get("cache") or {}),
+            }
+            if not settings["enabled"]:
+                return None
+            sqlite_path = settings["sqlite_path"]
+            if sqlite_path and not os.path.isabs(sqlite_path):
+                sqlite_path = os.path.join(os.path.dirname(LLM_CONFIG_PATH), sqlite_path)
+            _search_cache = SearchResultCache(
+                fresh_ttl=settings["fresh_ttl"],
+                stale_ttl=settings["stale_ttl"],
+                max_entries=settings["max_entries"],
+                sqlite_path=sqlite_path,
+                refresh_workers=settings["refresh_workers"],
+            )
+        return _search_cache
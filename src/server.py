@@ -0,0 +1,340 @@
+"""
+ASGI service exposing the workflows as JSON endpoints.
+
+    POST /v1/workflows/{name}   {"query": "..."}  -> workflow result (+ "figure")
+    GET  /v1/workflows                            -> registered workflow names
+    GET  /healthz                                 -> admission counters
+    GET  /metrics                                 -> Prometheus text (src/metrics.py)
+
+Run with `python -m src.server` (needs the `serve` extra for uvicorn) or
+point any ASGI server at `src.server:app`.
+
+Admission control: at most `max_in_flight` workflow runs execute at once and
+at most `max_queue` more wait for a slot; beyond that, or after waiting
+`queue_timeout` seconds, requests get 429. Each client (the peer address, or
+the X-Client-Id header when the peer is listed in `trusted_client_id_peers`,
+e.g. a reverse proxy) may have at most `per_client_limit` requests admitted
+at a time. Runs exceeding `request_timeout` are cancelled with 504.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from src.json_codec import JSONDecodeError, dumps, loads
+from src.logger import configure_logging, get_logger
+from src.metrics import render_prometheus
+from src.utils import load_config_section
+
+logger = get_logger(__name__)
+
+# Defaults for the HTTP service, overridable from the `server` section of
+# llm_config.yaml.
+DEFAULT_SERVER_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 8000,
+    "max_in_flight": 16,
+    "max_queue": 64,
+    "queue_timeout": 10.0,
+    "per_client_limit": 4,
+    # Peers (e.g. a reverse proxy) allowed to name the client via X-Client-Id
+    "trusted_client_id_peers": [],
+    "request_timeout": 120.0,
+    "max_body_bytes": 64 * 1024,
+    "warm_start": True,
+}
+
+PROMETHEUS_CONTENT_TYPE = b"text/plain; version=0.0.4; charset=utf-8"
+
+# State fields copied into responses when set; the figure is added separately.
+RESPONSE_FIELDS = ("response", "can_generate_graph", "selected_graph_type", "selected_columns", "search_results")
+
+
+class HTTPError(Exception):
+    """An error response with a status code and a JSON `error` message."""
+
+    def __init__(self, status: int, message: str, headers: Iterable[Tuple[bytes, bytes]] = ()):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = list(headers)
+
+
+class Admission:
+    """
+    Bounded admission queue plus per-client concurrency limits.
+
+    `admit(client)` is an async context manager; it raises HTTPError(429)
+    when the client is over its limit, the wait queue is full, or no slot
+    frees up within `queue_timeout`.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float, per_client_limit: int):
+        self.capacity = max_in_flight + max_queue
+        self.queue_timeout = queue_timeout
+        self.per_client_limit = per_client_limit
+        self._slots = asyncio.Semaphore(max_in_flight)
+        # Counted explicitly: a request admitted to the queue has not touched
+        # the semaphore yet, so its state alone under-reports the load
+        self.admitted = 0
+        self.in_flight = 0
+        self._per_client: Dict[str, int] = {}
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": self.in_flight, "queued": self.admitted - self.in_flight, "clients": len(self._per_client)}
+
+    def admit(self, client: str) -> "_Admitted":
+        return _Admitted(self, client)
+
+    async def _acquire(self, client: str) -> None:
+        if self._per_client.get(client, 0) >= self.per_client_limit:
+            raise HTTPError(429, "too many concurrent requests for this client", [(b"retry-after", b"1")])
+        if self.admitted >= self.capacity:
+            raise HTTPError(429, "server is at capacity", [(b"retry-after", b"1")])
+        self._per_client[client] = self._per_client.get(client, 0) + 1
+        self.admitted += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._leave(client)
+            raise HTTPError(429, "timed out waiting for capacity", [(b"retry-after", b"1")]) from None
+        except BaseException:
+            self._leave(client)
+            raise
+        self.in_flight += 1
+
+    def _release(self, client: str) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+        self._leave(client)
+
+    def _leave(self, client: str) -> None:
+        self.admitted -= 1
+        remaining = self._per_client.get(client, 1) - 1
+        if remaining > 0:
+            self._per_client[client] = remaining
+        else:
+            self._per_client.pop(client, None)
+
+
+class _Admitted:
+    def __init__(self, admission: Admission, client: str):
+        self.admission = admission
+        self.client = client
+
+    async def __aenter__(self):
+        await self.admission._acquire(self.client)
+
+    async def __aexit__(self, *exc_info):
+        self.admission._release(self.client)
+
+
+def _default_workflows() -> Dict[str, Any]:
+    from src.workflows.registry import get_workflow
+
+    return {
+        "conditional": get_workflow("conditional", drop_intermediates=True),
+        "web_search": get_workflow("web_search"),
+        "simple_chat": get_workflow("simple_chat"),
+    }
+
+
+def _default_initial_state(name: str, user_query: str) -> dict:
+    from src.workflows.registry import get_initial_state
+
+    return get_initial_state(name, user_query)
+
+
+def _response_body(name: str, user_query: str, result: dict, elapsed: float) -> bytes:
+    """
+    Encode a workflow result. The figure is spliced in from `graph_json`
+    as-is rather than being decoded and re-encoded.
+    """
+    payload = {"workflow": name, "query": user_query, "elapsed_ms": round(elapsed * 1000, 1)}
+    for field in RESPONSE_FIELDS:
+        value = result.get(field)
+        if value not in (None, ""):
+            payload[field] = value
+    body = dumps(payload, compact=True)
+    graph_json = result.get("graph_json")
+    if graph_json:
+        body = f'{body[:-1]},"figure":{graph_json}}}'
+    return body.encode("utf-8")
+
+
+class WorkflowServer:
+    """
+    The ASGI application. `workflows` maps names to compiled graphs (defaults
+    to the shared registry graphs, created on first use) and `initial_state`
+    builds the input state; both are injectable for tests.
+    """
+
+    def __init__(
+        self,
+        workflows: Optional[Dict[str, Any]] = None,
+        settings: Optional[dict] = None,
+        initial_state: Callable[[str, str], dict] = _default_initial_state,
+    ):
+        self.settings = {**DEFAULT_SERVER_CONFIG, **load_config_section("server"), **(settings or {})}
+        self._workflows = workflows
+        self.initial_state = initial_state
+        self._admission: Optional[Admission] = None
+
+    @property
+    def workflows(self) -> Dict[str, Any]:
+        if self._workflows is None:
+            self._workflows = _default_workflows()
+        return self._workflows
+
+    @property
+    def admission(self) -> Admission:
+        # Created lazily so the semaphore binds to the serving event loop
+        if self._admission is None:
+            self._admission = Admission(
+                max_in_flight=self.settings["max_in_flight"],
+                max_queue=self.settings["max_queue"],
+                queue_timeout=self.settings["queue_timeout"],
+                per_client_limit=self.settings["per_client_limit"],
+            )
+        return self._admission
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        try:
+            status, body, headers = await self._dispatch(scope, receive)
+        except HTTPError as e:
+            status, body, headers = e.status, dumps({"error": e.message}, compact=True).encode("utf-8"), e.headers
+        except Exception as e:
+            logger.error("Unhandled error serving %s: %s", scope.get('path'), e)
+            status, body, headers = 500, b'{"error":"internal server error"}', []
+        if not any(key == b"content-type" for key, _ in headers):
+            headers = [(b"content-type", b"application/json")] + headers
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-length", str(len(body)).encode())] + headers,
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if self.settings["warm_start"] and self._workflows is None:
+                    from src.workflows.registry import warm_start
+
+                    await asyncio.to_thread(warm_start)
+                    # The served variants differ from app.py's (no checkpointer)
+                    await asyncio.to_thread(lambda: self.workflows)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _dispatch(self, scope, receive) -> Tuple[int, bytes, list]:
+        method = scope["method"]
+        path = scope["path"].rstrip("/") or "/"
+        if path == "/healthz":
+            return 200, dumps({"status": "ok", **self.admission.stats()}, compact=True).encode("utf-8"), []
+        if path == "/metrics":
+            return 200, render_prometheus().encode("utf-8"), [(b"content-type", PROMETHEUS_CONTENT_TYPE)]
+        if path == "/v1/workflows":
+            if method != "GET":
+                raise HTTPError(405, "use GET")
+            return 200, dumps({"workflows": sorted(self.workflows)}, compact=True).encode("utf-8"), []
+        if path.startswith("/v1/workflows/"):
+            name = path[len("/v1/workflows/"):]
+            if name not in self.workflows:
+                raise HTTPError(404, f"unknown workflow {name!r}")
+            if method != "POST":
+                raise HTTPError(405, "use POST")
+            return await self._run(name, scope, receive)
+        raise HTTPError(404, "not found")
+
+    async def _read_json(self, receive) -> dict:
+        limit = self.settings["max_body_bytes"]
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                raise HTTPError(413, f"request body exceeds {limit} bytes")
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        try:
+            payload = loads(b"".join(chunks) or b"{}")
+        except JSONDecodeError:
+            raise HTTPError(400, "request body is not valid JSON") from None
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        return payload
+
+    def _client_id(self, scope) -> str:
+        client = scope.get("client")
+        peer = client[0] if client else "anonymous"
+        # The header is caller-controlled, so untrusted peers could rotate it
+        # to dodge per_client_limit
+        if peer in self.settings["trusted_client_id_peers"]:
+            for key, value in scope.get("headers", []):
+                if key == b"x-client-id":
+                    return value.decode("latin-1")
+        return peer
+
+    async def _run(self, name: str, scope, receive) -> Tuple[int, bytes, list]:
+        payload = await self._read_json(receive)
+        user_query = payload.get("query")
+        if not isinstance(user_query, str) or not user_query.strip():
+            raise HTTPError(400, "'query' must be a non-empty string")
+
+        async with self.admission.admit(self._client_id(scope)):
+            started = time.perf_counter()
+            graph = self.workflows[name]
+            try:
+                result = await asyncio.wait_for(
+                    graph.ainvoke(self.initial_state(name, user_query)),
+                    self.settings["request_timeout"],
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Workflow %s timed out for query %r", name, user_query)
+                raise HTTPError(504, f"workflow did not finish within {self.settings['request_timeout']}s") from None
+            except Exception as e:
+                logger.error("Workflow %s failed for query %r: %s", name, user_query, e)
+                raise HTTPError(500, f"workflow failed: {type(e).__name__}") from None
+            elapsed = time.perf_counter() - started
+        logger.info("Served %s in %.2fs", name, elapsed)
+        return 200, _response_body(name, user_query, result, elapsed), []
+
+
+def create_app(workflows: Optional[Dict[str, Any]] = None, settings: Optional[dict] = None, **kwargs) -> WorkflowServer:
+    """Build the ASGI application; see `WorkflowServer`."""
+    return WorkflowServer(workflows=workflows, settings=settings, **kwargs)
+
+
+app = create_app()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    settings = {**DEFAULT_SERVER_CONFIG, **load_config_section("server")}
+    parser = argparse.ArgumentParser(description="Serve the workflows over HTTP.")
+    parser.add_argument("--host", default=settings["host"])
+    parser.add_argument("--port", type=int, default=settings["port"])
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        parser.error("uvicorn is not installed; install the 'serve' extra or run src.server:app with another ASGI server")
+    configure_logging()
+    uvicorn.run(app, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
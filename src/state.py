@@ -0,0 +1,53 @@
+from typing import Any, Annotated, Callable, Iterable, List, Optional, TypedDict
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableLambda
+
+from src.metrics import node_span, record_payloads
+
+
+# Shared state for every workflow. Nodes return only the fields they change;
+# LangGraph merges those updates into the running state.
+class GraphState(TypedDict, total=False):
+    messages: Annotated[List[BaseMessage], "The messages in the conversation"]
+    response: Annotated[str, "The response from the LLM"]
+    search_results: Annotated[Optional[str], "Results from web search"]
+    user_query: Annotated[str, "The original user query"]
+    can_generate_graph: Annotated[str, "Whether the query can generate a graph (Yes/No)"]
+    selected_graph_type: Annotated[str, "The selected graph type"]
+    selected_columns: Annotated[List[str], "The selected columns for graphing"]
+    formatted_data: Annotated[str, "The extracted data as returned by the LLM"]
+    parsed_data: Annotated[Optional[dict], "formatted_data decoded once by chat_with_search"]
+    trimmed_data: Annotated[Optional[dict], "Parsed data with long-tail categories folded into Others"]
+    graph_object: Annotated[Any, "The rendered graph object"]
+    graph_json: Annotated[str, "The rendered graph as Plotly JSON"]
+
+
+def node(func: Callable, afunc: Callable, release: Iterable[str] = ()) -> RunnableLambda:
+    """
+    Wrap a node's sync and async implementations for `StateGraph.add_node`.
+
+    Each run is traced in src/metrics.py under the graph's name for the node
+    (wall time, payload sizes, and the LLM tokens and cache lookups made inside
+    it). `release` lists large intermediates that no later node reads; the
+    node's update also clears them.
+    """
+    released = dict.fromkeys(release)
+
+    def run(state, config):
+        name = config.get("metadata", {}).get("langgraph_node", func.__name__)
+        with node_span(name):
+            update = func(state)
+        record_payloads(name, update)
+        return {**update, **released} if released else update
+
+    async def arun(state, config):
+        name = config.get("metadata", {}).get("langgraph_node", func.__name__)
+        with node_span(name):
+            update = await afunc(state)
+        record_payloads(name, update)
+        return {**update, **released} if released else update
+
+    run.__name__ = getattr(func, "__name__", "run")
+    arun.__name__ = getattr(afunc, "__name__", "arun")
+    return RunnableLambda(run, afunc=arun)
@@ -1,43 +1,81 @@
 import os
-import yaml
-import logging
-import sys
+import json
+import asyncio
+import threading
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
+from src.llm_cache import LLMResponseCache, has_json_object
+from src.logger import get_logger
+from src.metrics import TOKEN_USAGE_CALLBACK
+from src.prompt_registry import LLM_CONFIG_PATH, get_config
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 # Default LLM provider
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
 
-LLM_CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "llm_config.yaml")
+
+# Defaults for the shared HTTP transport, overridable from the `http_client`
+# section of llm_config.yaml.
+DEFAULT_HTTP_CLIENT_CONFIG = {
+    "max_connections": 100,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 30.0,
+    "timeout": 60.0,
+}
+
+# Defaults for the LLM response cache, overridable from the `llm_cache`
+# section of llm_config.yaml.
+DEFAULT_LLM_CACHE_CONFIG = {
+    "enabled": True,
+    "max_entries": 1024,
+    "sqlite_path": None,
+    "max_disk_entries": 10000,
+    "default_ttl": 3600,
+    "node_ttls": {},
+}
+
+# Cache scopes whose nodes parse a JSON object from the reply; replies without
+# one are not cached, so a retry asks the model again.
+CACHE_SCOPE_VALIDATORS = {
+    "graph_selector": has_json_object,
+    "query_filtering": has_json_object,
+}
+
+# Defaults for the web search client, overridable from the `web_search`
+# section of llm_config.yaml.
+DEFAULT_WEB_SEARCH_CONFIG = {
+    "model_id": "gpt-4.1",
+    "timeout": 90.0,
+    "max_retries": 2,
+}
 
 
 class LLMProvisioner:
     """
-    Factory/provider for singleton, LangGraph-compatible LLM objects.
+    Factory/provider for pooled, LangGraph-compatible LLM objects.
     Supports OpenAI with configurable models and parameters.
-    Loads config from YAML and caches the LLM instance.
+    Reads config from the hot-reloaded llm_config.yaml and keeps one warm client per
+    (provider, model_id, model_kwargs, cache_scope), all sharing one pooled
+    HTTP transport and one response cache.
     """
 
-    _llm_instance = None
-    _llm_config = None
+    _llm_instances = {}
+    _http_client = None
+    _http_async_client = None
+    _http_async_loop = None
+    _response_cache = None
+    _lock = threading.RLock()
 
     @classmethod
-    def get_llm(cls, model_id=None, model_kwargs=None):
+    def get_llm(cls, model_id=None, model_kwargs=None, cache_scope=None):
         """
-        Return a singleton LLM instance compatible with LangGraph.
-        Loads config from YAML if not provided.
+        Return a pooled LLM instance compatible with LangGraph.
+        Loads config from YAML for any argument that is not provided.
+        `cache_scope` names the calling node and selects its response-cache TTL.
         """
-        if cls._llm_instance is not None:
-            return cls._llm_instance
-
         provider = LLM_PROVIDER
 
         # Load the LLM configuration from YAML
@@ -47,50 +85,276 @@ class LLMProvisioner:
         model_id = model_id or config.get("model_id")
         model_kwargs = model_kwargs or config.get("model_kwargs", {})
 
-        logger.info(
-            f"Using provider: {provider}, model_id: {model_id}, model_kwargs: {model_kwargs}"
+        key = cls._pool_key(provider, model_id, model_kwargs) + (cache_scope,)
+        llm = cls._llm_instances.get(key)
+        if llm is not None:
+            return llm
+
+        with cls._lock:
+            llm = cls._llm_instances.get(key)
+            if llm is not None:
+                return llm
+
+            logger.info("Using provider: %s, model_id: %s, model_kwargs: %s", provider, model_id, model_kwargs)
+
+            if provider == "openai":
+                llm = cls._create_openai_llm(
+                    model_id=model_id,
+                    model_kwargs=model_kwargs,
+                    cache=cls._get_scoped_cache(cache_scope),
+                )
+            else:
+                raise ValueError(f"Unsupported LLM provider: {provider}")
+            cls._llm_instances[key] = llm
+        return llm
+
+    @classmethod
+    def reset(cls):
+        """
+        Drop every pooled LLM, the response cache, the search clients and the
+        shared HTTP transport, closing both the sync and the async client.
+        """
+        SearchClientProvisioner.reset()
+        with cls._lock:
+            cls._llm_instances = {}
+            cls._response_cache = None
+            if cls._http_client is not None:
+                cls._http_client.close()
+            if cls._http_async_client is not None:
+                _close_async_client(cls._http_async_client, cls._http_async_loop)
+            cls._http_client = None
+            cls._http_async_client = None
+            cls._http_async_loop = None
+
+    @staticmethod
+    def _pool_key(provider, model_id, model_kwargs):
+        """
+        Build a hashable pool key; model_kwargs are canonicalised so that
+        equal dicts map to the same client regardless of key order.
+        """
+        return (provider, model_id, json.dumps(model_kwargs or {}, sort_keys=True, default=str))
+
+    @classmethod
+    def _create_openai_llm(cls, model_id, model_kwargs, cache=None):
+        """
+        Create a LangChain ChatOpenAI instance on the shared HTTP transport.
+        """
+        params = {"temperature": 0, **(model_kwargs or {})}
+        http_client, http_async_client = cls._get_http_clients()
+        return ChatOpenAI(
+            model=model_id or "gpt-4o",
+            http_client=http_client,
+            http_async_client=http_async_client,
+            cache=cache,
+            callbacks=[TOKEN_USAGE_CALLBACK],
+            **params,
         )
-        
-        if provider == "openai":
-            cls._llm_instance = cls._create_openai_llm(
-                model_id=model_id, model_kwargs=model_kwargs
-            )
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider}")
-        return cls._llm_instance
 
     @classmethod
-    def _create_openai_llm(cls, model_id, model_kwargs):
+    def get_response_cache(cls):
         """
-        Create a LangChain ChatOpenAI instance.
+        Return the process-wide LLM response cache, or None if disabled.
         """
-        temperature = (model_kwargs or {}).get("temperature", 0)
-        return ChatOpenAI(model=model_id or "gpt-4o", temperature=temperature)
+        with cls._lock:
+            if cls._response_cache is None:
+                settings = {**DEFAULT_LLM_CACHE_CONFIG, **load_config_section("llm_cache")}
+                if not settings["enabled"]:
+                    return None
+                sqlite_path = settings["sqlite_path"]
+                if sqlite_path and not os.path.isabs(sqlite_path):
+                    sqlite_path = os.path.join(os.path.dirname(LLM_CONFIG_PATH), sqlite_path)
+                cls._response_cache = LLMResponseCache(
+                    max_entries=settings["max_entries"],
+                    sqlite_path=sqlite_path,
+                    max_disk_entries=settings["max_disk_entries"],
+                    default_ttl=settings["default_ttl"],
+                )
+            return cls._response_cache
+
+    @classmethod
+    def _get_scoped_cache(cls, cache_scope):
+        """
+        Return a cache view using the TTL configured for `cache_scope` and its
+        entry in `CACHE_SCOPE_VALIDATORS`, if any.
+        """
+        response_cache = cls.get_response_cache()
+        if response_cache is None:
+            return None
+        node_ttls = load_config_section("llm_cache").get("node_ttls") or {}
+        return response_cache.scoped(node_ttls.get(cache_scope), CACHE_SCOPE_VALIDATORS.get(cache_scope))
+
+    @classmethod
+    def _get_http_clients(cls):
+        """
+        Return the process-wide sync and async httpx clients, creating them
+        on first use with the limits from the `http_client` config section.
+        """
+        with cls._lock:
+            if cls._http_client is None:
+                settings = {**DEFAULT_HTTP_CLIENT_CONFIG, **load_config_section("http_client")}
+                limits = httpx.Limits(
+                    max_connections=settings["max_connections"],
+                    max_keepalive_connections=settings["max_keepalive_connections"],
+                    keepalive_expiry=settings["keepalive_expiry"],
+                )
+                timeout = httpx.Timeout(settings["timeout"])
+                cls._http_client = httpx.Client(limits=limits, timeout=timeout)
+                cls._http_async_client = httpx.AsyncClient(
+                    limits=limits, timeout=timeout, event_hooks={"request": [cls._record_async_loop]}
+                )
+            return cls._http_client, cls._http_async_client
+
+    @classmethod
+    async def _record_async_loop(cls, request):
+        """
+        Remember the event loop the async client's connections belong to, so
+        `reset` can close them there.
+        """
+        cls._http_async_loop = asyncio.get_running_loop()
+
+    @classmethod
+    def _load_config_file(cls):
+        """
+        Return the contents of llm_config.yaml from the prompt/config
+        registry, which re-reads the file only when it changes.
+        """
+        return get_config()
 
     @classmethod
     def _load_llm_config(cls):
         """
         Load LLM config from llm_config.yaml based on LLM_PROVIDER env var.
-        Caches the config for efficiency.
-        """
-        if cls._llm_config is not None:
-            return cls._llm_config
-        with open(LLM_CONFIG_PATH) as f:
-            config = yaml.safe_load(f)
-        if not config:
-            raise ValueError(
-                f"llm_config.yaml is empty or invalid at {LLM_CONFIG_PATH}"
-            )
+        Edits to the model profile apply to the next `get_llm` call.
+        """
+        config = cls._load_config_file()
         provider = LLM_PROVIDER
         if provider not in config:
             raise ValueError(f"LLM provider '{provider}' not found in llm_config.yaml")
-        cls._llm_config = config[provider]
-        return cls._llm_config
+        return config[provider]
+
+
+def _close_async_client(client, loop=None):
+    """
+    Close a shared httpx.AsyncClient from sync code. Its pooled connections
+    belong to `loop` (the loop that last sent a request), so the close runs
+    there when that loop is still alive, and on a fresh loop otherwise.
+    """
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    try:
+        if loop is not None and loop is running:
+            loop.create_task(client.aclose())
+        elif loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+        elif running is None:
+            asyncio.run(client.aclose())
+        else:
+            running.create_task(client.aclose())
+    except Exception as e:
+        logger.warning("Could not close the shared async HTTP client: %s", e)
+
+
+class SearchClientProvisioner:
+    """
+    Provider for the process-wide OpenAI clients used by web search.
+    The clients are created once, reuse the shared HTTP transport of
+    LLMProvisioner and are safe to share across threads.
+    """
+
+    _client = None
+    _async_client = None
+    _config = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_config(cls):
+        """
+        Return the merged `web_search` configuration.
+        """
+        if cls._config is None:
+            cls._config = {**DEFAULT_WEB_SEARCH_CONFIG, **load_config_section("web_search")}
+        return cls._config
+
+    @classmethod
+    def get_client(cls):
+        """
+        Return the shared synchronous OpenAI client for web search.
+        """
+        if cls._client is None:
+            with cls._lock:
+                if cls._client is None:
+                    config = cls.get_config()
+                    http_client, _ = LLMProvisioner._get_http_clients()
+                    cls._client = OpenAI(
+                        http_client=http_client,
+                        timeout=config["timeout"],
+                        max_retries=config["max_retries"],
+                    )
+        return cls._client
+
+    @classmethod
+    def get_async_client(cls):
+        """
+        Return the shared AsyncOpenAI client for web search.
+        """
+        if cls._async_client is None:
+            with cls._lock:
+                if cls._async_client is None:
+                    config = cls.get_config()
+                    _, http_async_client = LLMProvisioner._get_http_clients()
+                    cls._async_client = AsyncOpenAI(
+                        http_client=http_async_client,
+                        timeout=config["timeout"],
+                        max_retries=config["max_retries"],
+                    )
+        return cls._async_client
+
+    @classmethod
+    def reset(cls):
+        """
+        Drop the cached clients and configuration.
+        """
+        with cls._lock:
+            cls._client = None
+            cls._async_client = None
+            cls._config = None
+
+
+def load_config_section(name):
+    """
+    Return a top-level section of llm_config.yaml, or an empty dict if absent.
+    """
+    return LLMProvisioner._load_config_file().get(name) or {}
 
 
 # Convenience function for legacy code
-def get_llm(model_id=None, model_kwargs=None):
+def get_llm(model_id=None, model_kwargs=None, cache_scope=None):
+    """
+    Return a pooled, LangGraph-compatible LLM instance (OpenAI).
+    """
+    return LLMProvisioner.get_llm(
+        model_id=model_id, model_kwargs=model_kwargs, cache_scope=cache_scope
+    )
+
+
+def get_search_client():
+    """
+    Return the pooled OpenAI client used by web search.
+    """
+    return SearchClientProvisioner.get_client()
+
+
+def get_async_search_client():
+    """
+    Return the pooled AsyncOpenAI client used by web search.
+    """
+    return SearchClientProvisioner.get_async_client()
+
+
+def get_search_config():
     """
-    Return a singleton, LangGraph-compatible LLM instance (OpenAI).
+    Return the web search configuration (model_id, timeout, max_retries).
     """
-    return LLMProvisioner.get_llm(model_id=model_id, model_kwargs=model_kwargs)
+    return SearchClientProvisioner.get_config()
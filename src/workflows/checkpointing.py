@@ -0,0 +1,142 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Any, Optional
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.logger import get_logger
+from src.search_cache import normalize_query
+from src.utils import LLM_CONFIG_PATH, load_config_section
+
+logger = get_logger(__name__)
+
+# Defaults for run checkpointing, overridable from the `checkpointing`
+# section of llm_config.yaml.
+DEFAULT_CHECKPOINT_CONFIG = {
+    "enabled": False,
+    "sqlite_path": None,
+}
+
+
+def create_checkpointer(sqlite_path: Optional[str] = None):
+    """
+    Return a SQLite-backed checkpointer for `sqlite_path`, or an in-memory one
+    when no path is given or langgraph-checkpoint-sqlite (the `checkpoint`
+    extra) is not installed.
+
+    The SQLite saver only supports the sync API (`invoke`); async callers
+    should pass an in-memory or async saver to the workflow factory instead.
+
+    Checkpoints use LangGraph's default serializer without a pickle fallback;
+    workflows compiled with a checkpointer keep the Plotly figure out of state,
+    so callers render `graph_json` instead of `graph_object`.
+    """
+    if sqlite_path:
+        try:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError:
+            logger.warning("langgraph-checkpoint-sqlite is not installed; checkpoints are kept in memory only")
+        else:
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(sqlite_path, check_same_thread=False)
+            return SqliteSaver(conn)
+    return MemorySaver()
+
+
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer():
+    """
+    Return the process-wide checkpointer configured from `checkpointing` in
+    llm_config.yaml, or None if checkpointing is disabled.
+    """
+    global _checkpointer
+    with _checkpointer_lock:
+        if _checkpointer is None:
+            settings = {**DEFAULT_CHECKPOINT_CONFIG, **load_config_section("checkpointing")}
+            if not settings["enabled"]:
+                return None
+            sqlite_path = settings["sqlite_path"]
+            if sqlite_path and not os.path.isabs(sqlite_path):
+                sqlite_path = os.path.join(os.path.dirname(LLM_CONFIG_PATH), sqlite_path)
+            _checkpointer = create_checkpointer(sqlite_path)
+        return _checkpointer
+
+
+def thread_id_for(workflow_name: str, user_query: str, session_id: str = "") -> str:
+    """
+    Stable thread id for a (workflow, query, session) triple, so retrying the
+    same query lands on the checkpoints of the failed run.
+    """
+    digest = hashlib.sha256(
+        "\x00".join((workflow_name, normalize_query(user_query), session_id)).encode("utf-8")
+    ).hexdigest()
+    return f"{workflow_name}:{digest[:32]}"
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def _has_checkpointer(graph) -> bool:
+    return getattr(graph, "checkpointer", None) is not None
+
+
+def _delete_thread(graph, thread_id: str) -> None:
+    """Drop a completed run's checkpoints; only failed runs are kept for resuming."""
+    try:
+        graph.checkpointer.delete_thread(thread_id)
+    except NotImplementedError:
+        logger.warning("%s cannot delete threads; checkpoints for %s are kept", type(graph.checkpointer).__name__, thread_id)
+
+
+async def _adelete_thread(graph, thread_id: str) -> None:
+    try:
+        await graph.checkpointer.adelete_thread(thread_id)
+    except NotImplementedError:
+        logger.warning("%s cannot delete threads; checkpoints for %s are kept", type(graph.checkpointer).__name__, thread_id)
+
+
+def run_with_resume(graph, initial_state: dict, thread_id: str) -> Any:
+    """
+    Invoke `graph` on `thread_id`. If the thread's last run stopped part-way
+    (a node raised), resume it so only the failed node and its successors run;
+    otherwise start a fresh run from `initial_state`. The thread's checkpoints
+    are deleted once the run completes.
+
+    Graphs compiled without a checkpointer are simply invoked.
+    """
+    if not _has_checkpointer(graph):
+        return graph.invoke(initial_state)
+    config = _config(thread_id)
+    pending = graph.get_state(config).next
+    if pending:
+        logger.info("Resuming thread %s at %s", thread_id, ', '.join(pending))
+        result = graph.invoke(None, config)
+    else:
+        result = graph.invoke(initial_state, config)
+    _delete_thread(graph, thread_id)
+    return result
+
+
+async def arun_with_resume(graph, initial_state: dict, thread_id: str) -> Any:
+    """
+    Async variant of `run_with_resume`.
+    """
+    if not _has_checkpointer(graph):
+        return await graph.ainvoke(initial_state)
+    config = _config(thread_id)
+    pending = (await graph.aget_state(config)).next
+    if pending:
+        logger.info("Resuming thread %s at %s", thread_id, ', '.join(pending))
+        result = await graph.ainvoke(None, config)
+    else:
+        result = await graph.ainvoke(initial_state, config)
+    await _adelete_thread(graph, thread_id)
+    return result
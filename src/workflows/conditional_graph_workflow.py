@@ -4,18 +4,21 @@ from langchain_core.messages import SystemMessage
 # Import logger
 from src.logger import get_logger
 
-# Import nodes
-from src.nodes.web_search import web_search_node, GraphState
-from src.nodes.web_search_context import chat_with_search_node
-from src.nodes.query_filtering import query_filtering_node
-from src.nodes.text_response import text_response_node
-from src.nodes.graph_selector import graph_selector_node
-from src.nodes.graph_renderer import graph_renderer_node
+# Import state and nodes
+from src.state import GraphState, node
+from src.nodes.web_search import web_search_node, aweb_search_node
+from src.nodes.web_search_context import chat_with_search_node, achat_with_search_node
+from src.nodes.query_filtering import query_filtering_node, aquery_filtering_node
+from src.nodes.text_response import text_response_node, atext_response_node
+from src.nodes.graph_selector import graph_selector_node, agraph_selector_node
+from src.nodes.data_trimming import data_trimming_node, adata_trimming_node
+from src.nodes.graph_renderer import graph_renderer_node, agraph_renderer_node
+from src.nodes.speculative_search import speculative_filter_and_search_node, aspeculative_filter_and_search_node
 
 logger = get_logger(__name__)
 
 
-def create_conditional_graph_workflow():
+def create_conditional_graph_workflow(speculative_search: bool = False, drop_intermediates: bool = False, checkpointer=None):
     """
     Create a conditional graph workflow that first checks if a query can generate a graph.
     
@@ -27,40 +30,80 @@ def create_conditional_graph_workflow():
     Workflow:
     1. query_filtering -> classifies if query can generate a graph
     2. If "No" -> text_response -> END
-    3. If "Yes" -> web_search -> chat_with_search -> graph_selector -> graph_renderer -> END
+    3. If "Yes" -> web_search -> chat_with_search -> graph_selector -> data_trimming -> graph_renderer -> END
+
+    data_trimming folds long-tail categories into "Others" for categorical
+    charts (see the `trimming` section of llm_config.yaml).
+
+    With `speculative_search=True`, classification and web search run
+    concurrently in a single `filter_and_search` node; the search is cancelled
+    or discarded when the query is routed to text_response:
+    1. filter_and_search -> classifies the query while searching the web
+    2. If "No" -> text_response -> END
+    3. If "Yes" -> chat_with_search -> graph_selector -> data_trimming -> graph_renderer -> END
+
+    With `drop_intermediates=True`, large intermediate fields are cleared as
+    soon as their last reader has run: `search_results` after chat_with_search,
+    and `parsed_data`/`trimmed_data` after graph_renderer. `formatted_data`
+    and the rendered graph are always kept.
+
+    With a `checkpointer` (see src/workflows/checkpointing.py) state is saved
+    after every node, so a run that fails in e.g. graph_selector can be
+    resumed without repeating the search and extraction calls. The Plotly
+    figure is then left out of state; only `graph_json` is checkpointed.
+
+    Every node has a sync and an async implementation, so the compiled graph
+    can be driven with either `invoke` or `ainvoke`.
     """
     
     # Create the graph
     workflow = StateGraph(GraphState)
     
     # Add nodes
-    workflow.add_node("query_filtering", query_filtering_node)
-    workflow.add_node("text_response", text_response_node)
-    workflow.add_node("web_search", web_search_node)
-    workflow.add_node("chat_with_search", chat_with_search_node)
-    workflow.add_node("graph_selector", graph_selector_node)
-    workflow.add_node("graph_renderer", graph_renderer_node)
+    if speculative_search:
+        entry_point = "filter_and_search"
+        graph_path = "chat_with_search"
+        workflow.add_node(entry_point, node(speculative_filter_and_search_node, aspeculative_filter_and_search_node))
+    else:
+        entry_point = "query_filtering"
+        graph_path = "web_search"
+        workflow.add_node("query_filtering", node(query_filtering_node, aquery_filtering_node))
+        workflow.add_node("web_search", node(web_search_node, aweb_search_node))
+    workflow.add_node("text_response", node(text_response_node, atext_response_node))
+    workflow.add_node("chat_with_search", node(
+        chat_with_search_node, achat_with_search_node,
+        release=["search_results"] if drop_intermediates else ()
+    ))
+    workflow.add_node("graph_selector", node(graph_selector_node, agraph_selector_node))
+    workflow.add_node("data_trimming", node(data_trimming_node, adata_trimming_node))
+    renderer_release = ["parsed_data", "trimmed_data"] if drop_intermediates else []
+    if checkpointer is not None:
+        renderer_release.append("graph_object")
+    workflow.add_node("graph_renderer", node(graph_renderer_node, agraph_renderer_node, release=renderer_release))
     
     # Set the entry point
-    workflow.set_entry_point("query_filtering")
+    workflow.set_entry_point(entry_point)
     
     # Add conditional edges
     workflow.add_conditional_edges(
-        "query_filtering",
-        lambda state: "text_response" if state["can_generate_graph"] == "No" else "web_search"
+        entry_point,
+        lambda state: "text_response" if state["can_generate_graph"] == "No" else graph_path,
+        ["text_response", graph_path]
     )
     
     # Add edges for graph generation path
-    workflow.add_edge("web_search", "chat_with_search")
+    if not speculative_search:
+        workflow.add_edge("web_search", "chat_with_search")
     workflow.add_edge("chat_with_search", "graph_selector")
-    workflow.add_edge("graph_selector", "graph_renderer")
+    workflow.add_edge("graph_selector", "data_trimming")
+    workflow.add_edge("data_trimming", "graph_renderer")
     workflow.add_edge("graph_renderer", END)
     
     # Add edge for text response path
     workflow.add_edge("text_response", END)
     
     # Compile the graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 def get_initial_state(user_query: str):
@@ -75,7 +118,11 @@ def get_initial_state(user_query: str):
         "search_results": "",
         "user_query": user_query,
         "selected_graph_type": "",
+        "selected_columns": [],
         "formatted_data": "",
+        "parsed_data": None,
+        "trimmed_data": None,
         "graph_object": None,
+        "graph_json": "",
         "can_generate_graph": ""
     } 
\ No newline at end of file
@@ -0,0 +1,180 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from src.logger import get_logger
+from src.workflows.conditional_graph_workflow import create_conditional_graph_workflow, get_initial_state as get_conditional_state
+from src.workflows.web_search_workflow import create_web_search_graph, get_initial_state as get_web_search_state
+from src.workflows.simple_chat_workflow import create_simple_chat_graph, get_initial_state as get_chat_state
+
+logger = get_logger(__name__)
+
+
+class WorkflowSpec:
+    """
+    A registered workflow: the factory that builds and compiles it and the
+    function producing its initial state for a user query.
+    """
+
+    def __init__(self, name: str, factory: Callable[..., Any], initial_state: Callable[[str], dict], description: str = ""):
+        self.name = name
+        self.factory = factory
+        self.initial_state = initial_state
+        self.description = description
+
+    def __repr__(self) -> str:
+        return f"WorkflowSpec(name={self.name!r})"
+
+
+_WORKFLOW_REGISTRY: Dict[str, WorkflowSpec] = {}
+_compiled: Dict[tuple, Any] = {}
+_lock = threading.Lock()
+_warmed = False
+
+
+def register_workflow(name: str, factory: Callable[..., Any], initial_state: Callable[[str], dict], description: str = "") -> None:
+    """Register a workflow factory under `name`, dropping any compiled copies."""
+    with _lock:
+        _WORKFLOW_REGISTRY[name] = WorkflowSpec(name, factory, initial_state, description)
+        for key in [key for key in _compiled if key[0] == name]:
+            del _compiled[key]
+
+
+def available_workflows() -> List[str]:
+    """Names of all registered workflows."""
+    return list(_WORKFLOW_REGISTRY)
+
+
+def get_workflow(name: str, **options) -> Any:
+    """
+    Return the compiled graph for `name` built with `options`, compiling it on
+    first use. Compiled graphs are stateless between invocations, so one copy
+    per (name, options) is shared by every session in the process.
+    """
+    key = (name, tuple(sorted(options.items())))
+    graph = _compiled.get(key)
+    if graph is not None:
+        return graph
+    with _lock:
+        graph = _compiled.get(key)
+        if graph is None:
+            spec = _WORKFLOW_REGISTRY[name]
+            started = time.perf_counter()
+            graph = spec.factory(**options)
+            _compiled[key] = graph
+            logger.info("Compiled workflow %r %s in %.3fs", name, dict(options), time.perf_counter() - started)
+        return graph
+
+
+def get_initial_state(name: str, user_query: str) -> dict:
+    """Initial state for running workflow `name` on `user_query`."""
+    return _WORKFLOW_REGISTRY[name].initial_state(user_query)
+
+
+def reset() -> None:
+    """Drop compiled graphs and the warm-start flag (for tests and config reloads)."""
+    global _warmed
+    with _lock:
+        _compiled.clear()
+        _warmed = False
+
+
+def _warm_prompts() -> None:
+    from src.prompt_registry import preload
+
+    preload()
+
+
+def _warm_llm_clients() -> None:
+    from src.prompt_registry import get_model_profile
+    from src.utils import get_async_search_client, get_llm, get_search_client
+
+    # One pooled instance per cache scope, matching the keys the nodes use
+    for cache_scope in ("chat_with_search", "graph_selector", "chat"):
+        get_llm(cache_scope=cache_scope)
+    gpt_mini_config = get_model_profile("gpt-mini")
+    get_llm(
+        model_id=gpt_mini_config.get("model_id"),
+        model_kwargs=gpt_mini_config.get("model_kwargs"),
+        cache_scope="query_filtering",
+    )
+    get_search_client()
+    get_async_search_client()
+
+
+def _warm_plotly() -> None:
+    """Build every registered chart once so Plotly's lazily imported validators are loaded."""
+    from src.charts import available_charts, build_chart, parse_columnar_data
+
+    table = parse_columnar_data({
+        "col_names": ["label", "a", "b"],
+        "label": {"dtype": "str", "values": ["2021", "2022", "2023"]},
+        "a": {"dtype": "float", "values": [1, 2, 3]},
+        "b": {"dtype": "float", "values": [3, 2, 1]},
+    })
+    for name in available_charts():
+        build_chart(name, table, "warm-up").to_json()
+
+
+def _warm_workflows() -> None:
+    from src.workflows.checkpointing import get_checkpointer
+
+    # The variants app.py serves, so its first request finds them compiled
+    checkpointer = get_checkpointer()
+    for speculative_search in (False, True):
+        get_workflow("conditional", speculative_search=speculative_search, checkpointer=checkpointer)
+    get_workflow("web_search", checkpointer=checkpointer)
+    get_workflow("simple_chat")
+
+
+WARM_STEPS = {
+    "workflows": _warm_workflows,
+    "prompts": _warm_prompts,
+    "llm_clients": _warm_llm_clients,
+    "plotly": _warm_plotly,
+}
+
+
+def warm_start(force: bool = False) -> Dict[str, float]:
+    """
+    Pay the cold-start costs of the first request up front: compile every
+    registered workflow, load and validate the prompt files, create the pooled LLM and
+    search clients, and load Plotly's figure machinery.
+
+    Runs once per process (unless `force`). A failing step, e.g. a missing
+    API key, is logged and skipped. Returns seconds spent per step.
+    """
+    global _warmed
+    if _warmed and not force:
+        return {}
+    timings = {}
+    for step, warm in WARM_STEPS.items():
+        started = time.perf_counter()
+        try:
+            warm()
+        except Exception as e:
+            logger.warning("Warm start step %r failed: %s", step, e)
+        timings[step] = time.perf_counter() - started
+    _warmed = True
+    logger.info("Warm start finished: %s", ', '.join(f'{step}={seconds:.3f}s' for step, seconds in timings.items()))
+    return timings
+
+
+register_workflow(
+    "conditional",
+    create_conditional_graph_workflow,
+    get_conditional_state,
+    "Classify the query, then search, extract, select and render a graph",
+)
+register_workflow(
+    "web_search",
+    create_web_search_graph,
+    get_web_search_state,
+    "Search the web and summarise the results",
+)
+register_workflow(
+    "simple_chat",
+    create_simple_chat_graph,
+    get_chat_state,
+    "Plain chat without search or graphs",
+)
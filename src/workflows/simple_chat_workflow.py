@@ -4,13 +4,14 @@ from langchain_core.messages import SystemMessage
 # Import logger
 from src.logger import get_logger
 
-# Import nodes
-from src.nodes.simple_chat import chat_node, GraphState
+# Import state and nodes
+from src.state import GraphState, node
+from src.nodes.simple_chat import chat_node, achat_node
 
 logger = get_logger(__name__)
 
 
-def create_simple_chat_graph():
+def create_simple_chat_graph(checkpointer=None):
     """
     Create a simple chat graph using LangGraph and our LLM utilities.
     
@@ -22,13 +23,16 @@ def create_simple_chat_graph():
     Workflow:
     1. chat -> processes the conversation and generates a response
     2. END
+
+    The chat node has an async implementation, so `ainvoke` is fully non-blocking.
+    An optional `checkpointer` saves state after each node for resumable runs.
     """
     
     # Create the graph
     workflow = StateGraph(GraphState)
     
     # Add the chat node
-    workflow.add_node("chat", chat_node)
+    workflow.add_node("chat", node(chat_node, achat_node))
     
     # Set the entry point
     workflow.set_entry_point("chat")
@@ -37,7 +41,7 @@ def create_simple_chat_graph():
     workflow.add_edge("chat", END)
     
     # Compile the graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 def get_initial_state(user_query: str):
@@ -4,14 +4,15 @@ from langchain_core.messages import SystemMessage
 # Import logger
 from src.logger import get_logger
 
-# Import nodes
-from src.nodes.web_search import web_search_node, GraphState
-from src.nodes.web_search_context import chat_with_search_node
+# Import state and nodes
+from src.state import GraphState, node
+from src.nodes.web_search import web_search_node, aweb_search_node
+from src.nodes.web_search_context import chat_with_search_node, achat_with_search_node
 
 logger = get_logger(__name__)
 
 
-def create_web_search_graph():
+def create_web_search_graph(checkpointer=None):
     """
     Create a graph that performs web search and then generates a response.
     
@@ -24,14 +25,17 @@ def create_web_search_graph():
     1. web_search -> performs web search for the query
     2. chat_with_search -> processes search results and generates a response
     3. END
+
+    Both nodes have async implementations, so `ainvoke` is fully non-blocking.
+    An optional `checkpointer` saves state after each node for resumable runs.
     """
     
     # Create the graph
     workflow = StateGraph(GraphState)
     
     # Add nodes
-    workflow.add_node("web_search", web_search_node)
-    workflow.add_node("chat_with_search", chat_with_search_node)
+    workflow.add_node("web_search", node(web_search_node, aweb_search_node))
+    workflow.add_node("chat_with_search", node(chat_with_search_node, achat_with_search_node))
     
     # Set the entry point
     workflow.set_entry_point("web_search")
@@ -41,7 +45,7 @@ def create_web_search_graph():
     workflow.add_edge("chat_with_search", END)
     
     # Compile the graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 def get_initial_state(user_query: str):
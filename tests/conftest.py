@@ -5,6 +5,33 @@ Shared test fixtures and configuration for pytest.
 import pytest
 from unittest.mock import Mock
 from langchain_core.messages import SystemMessage
+from src import figure_cache, metrics, query_classifier, search_cache
+from src.figure_cache import FigureCache
+from src.llm_cache import LLMResponseCache
+from src.logger import shutdown_logging
+from src.metrics import MetricsRegistry
+from src.query_classifier import LocalQueryClassifier
+from src.search_cache import SearchResultCache
+from src.utils import LLMProvisioner
+from src.workflows import checkpointing
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(monkeypatch):
+    """
+    Keep tests off the on-disk LLM/search/figure caches, checkpoints, classifier
+    files and shared metrics, and remove log handlers installed by entry points.
+    """
+    LLMProvisioner.reset()
+    monkeypatch.setattr(LLMProvisioner, "_response_cache", LLMResponseCache())
+    monkeypatch.setattr(search_cache, "_search_cache", SearchResultCache())
+    monkeypatch.setattr(figure_cache, "_figure_cache", FigureCache())
+    monkeypatch.setattr(query_classifier, "_classifier", LocalQueryClassifier())
+    monkeypatch.setattr(checkpointing, "_checkpointer", checkpointing.create_checkpointer())
+    monkeypatch.setattr(metrics, "_registry", MetricsRegistry())
+    yield
+    LLMProvisioner.reset()
+    shutdown_logging()
 
 
 @pytest.fixture
@@ -0,0 +1,98 @@
+"""
+Unit tests for the batch query runner.
+"""
+
+import json
+import pytest
+from langchain_core.runnables import RunnableLambda
+from src.batch import completed_ids, main, read_queries, run_batch
+
+
+def fake_workflow(failing=()):
+    """A stand-in for the compiled conditional workflow."""
+    calls = []
+
+    def run(state):
+        query = state["user_query"]
+        calls.append(query)
+        if query in failing:
+            raise RuntimeError("selector exploded")
+        if query.startswith("why"):
+            return {**state, "can_generate_graph": "No", "response": "Graph is not possible"}
+        return {
+            **state,
+            "can_generate_graph": "Yes",
+            "selected_graph_type": "bar_graph",
+            "selected_columns": ["A", "B"],
+            "graph_json": json.dumps({"data": [], "layout": {"title": query}}),
+        }
+
+    return RunnableLambda(run), calls
+
+
+def write_queries(path, lines):
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+
+
+class TestReadQueries:
+    """Test cases for the JSONL reader."""
+
+    def test_ids_and_formats(self, tmp_path):
+        """Test explicit ids, generated ids, bare strings and duplicates."""
+        path = tmp_path / "q.jsonl"
+        write_queries(path, [{"id": "a/1", "query": "GDP"}, "Population", {"user_query": "Population"}])
+
+        records = read_queries(str(path))
+
+        assert [record["query"] for record in records] == ["GDP", "Population"]
+        assert records[0]["id"].startswith("a_1-")
+        assert len(records[1]["id"]) == 16
+
+    def test_sanitized_ids_do_not_collide(self, tmp_path):
+        """Test that ids differing only in unsafe characters are kept apart."""
+        path = tmp_path / "q.jsonl"
+        write_queries(path, [{"id": "a/1", "query": "GDP"}, {"id": "a_1", "query": "Population"}, {"id": "a 1", "query": "Debt"}])
+
+        records = read_queries(str(path))
+
+        assert [record["query"] for record in records] == ["GDP", "Population", "Debt"]
+        assert len({record["id"] for record in records}) == 3
+        assert records[1]["id"] == "a_1"
+
+
+class TestRunBatch:
+    """Test cases for run_batch."""
+
+    def test_streams_results_and_figures(self, tmp_path):
+        """Test result lines, timing and figure files."""
+        graph, _ = fake_workflow(failing={"broken"})
+        records = [{"id": "gdp", "query": "GDP"}, {"id": "why", "query": "why is the sky blue"}, {"id": "bad", "query": "broken"}]
+
+        counts = run_batch(records, str(tmp_path), max_concurrency=2, graph=graph)
+
+        assert counts == {"ok": 1, "no_graph": 1, "error": 1, "skipped": 0}
+        results = {r["id"]: r for r in map(json.loads, (tmp_path / "results.jsonl").read_text().splitlines())}
+        assert results["gdp"]["figure_path"] == "figures/gdp.json"
+        assert results["gdp"]["elapsed_ms"] >= 0
+        assert json.loads((tmp_path / "figures" / "gdp.json").read_text())["layout"]["title"] == "GDP"
+        assert results["bad"]["error"] == "RuntimeError: selector exploded"
+
+    def test_resume_skips_completed(self, tmp_path):
+        """Test that a rerun only retries failed and new queries."""
+        graph, calls = fake_workflow(failing={"broken"})
+        records = [{"id": "gdp", "query": "GDP"}, {"id": "bad", "query": "broken"}]
+        run_batch(records, str(tmp_path), graph=graph)
+        with open(tmp_path / "results.jsonl", "a") as f:
+            f.write('{"id": "torn')
+
+        calls.clear()
+        counts = run_batch(records + [{"id": "pop", "query": "Population"}], str(tmp_path), graph=graph)
+
+        assert sorted(calls) == ["Population", "broken"]
+        assert counts["skipped"] == 1
+        assert completed_ids(str(tmp_path / "results.jsonl")) == {"gdp", "pop"}
+
+    def test_cli_rejects_bad_concurrency(self, tmp_path):
+        """Test argument validation."""
+        with pytest.raises(SystemExit):
+            main([str(tmp_path / "q.jsonl"), "--max-concurrency", "0"])
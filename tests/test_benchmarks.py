@@ -0,0 +1,109 @@
+"""
+Unit tests for the benchmark suite's payloads and regression checks.
+"""
+
+import json
+import pytest
+from benchmarks.payloads import make_payload
+from benchmarks.run import compare, main, run_suite
+from src.charts import parse_columnar_data
+
+
+class TestPayloads:
+    """Test cases for synthetic payloads."""
+
+    def test_shape_and_parsing(self):
+        """Test payloads have the requested size and parse without failures."""
+        payload = make_payload(50, 4)
+        table = parse_columnar_data(payload)
+
+        assert payload["col_names"] == ["label", "series_1", "series_2", "series_3"]
+        assert (table.num_rows, table.num_columns) == (50, 4)
+        assert isinstance(payload["series_2"]["values"][0], str)
+        for column in payload["col_names"]:
+            table.numeric(column)
+        assert table.coercion_failures == {}
+
+
+class TestCompare:
+    """Test cases for baseline comparison."""
+
+    def test_thresholds_and_noise_floor(self):
+        """Test only regressions above both the ratio and the absolute floor are reported."""
+        baseline = {
+            "slow": {"time_s": 0.010, "peak_bytes": 1000},
+            "tiny": {"time_s": 0.00001, "peak_bytes": 1000},
+            "memory": {"time_s": 0.010, "peak_bytes": 1_000_000},
+        }
+        results = {
+            "slow": {"time_s": 0.020, "peak_bytes": 1000},
+            "tiny": {"time_s": 0.00005, "peak_bytes": 2000},
+            "memory": {"time_s": 0.010, "peak_bytes": 2_000_000},
+            "new": {"time_s": 1.0, "peak_bytes": 1},
+        }
+
+        regressions = compare(results, baseline, time_threshold=0.2, memory_threshold=0.2)
+
+        assert len(regressions) == 2
+        assert regressions[0].startswith("slow: time")
+        assert regressions[1].startswith("memory: peak memory")
+
+
+class TestRunSuite:
+    """Test cases for running the suite."""
+
+    def test_cases_cover_charts(self):
+        """Test every hot path is measured for each chart."""
+        results = run_suite(rows=[10], columns=[3], charts=["bar_graph", "pie_chart"], repeat=1, min_time=0.001)
+
+        assert sorted(results) == sorted([
+            "to_float/rows=10/cols=3",
+            "coerce_column/rows=10/cols=3",
+            "parse_data_for_graph/rows=10/cols=3",
+            "create_graph/bar_graph/rows=10/cols=3",
+            "graph_renderer/bar_graph/rows=10/cols=3",
+            "create_graph/pie_chart/rows=10/cols=3",
+            "graph_renderer/pie_chart/rows=10/cols=3",
+        ])
+        assert all(result["time_s"] > 0 and result["peak_bytes"] > 0 for result in results.values())
+
+    def test_baseline_round_trip(self, tmp_path):
+        """Test --compare passes against a fresh baseline and fails against a faster one."""
+        baseline_path = tmp_path / "baseline.json"
+        args = [
+            "--rows", "10", "--columns", "3", "--charts", "bar_graph", "--filter", "create_graph",
+            "--repeat", "1", "--min-time", "0.001",
+        ]
+
+        assert main(args + ["--save-baseline", str(baseline_path)]) == 0
+        document = json.loads(baseline_path.read_text())
+        assert main(args + ["--compare", str(baseline_path), "--threshold", "100"]) == 0
+
+        for result in document["results"].values():
+            result["time_s"] /= 1000
+        baseline_path.write_text(json.dumps(document))
+        assert main(args + ["--compare", str(baseline_path)]) == 1
+
+    def test_compare_without_baseline_is_a_usage_error(self, tmp_path, capsys):
+        """Test --compare reports a missing baseline instead of crashing."""
+        with pytest.raises(SystemExit) as excinfo:
+            main(["--compare", str(tmp_path / "missing.json")])
+
+        assert excinfo.value.code == 2
+        assert "--save-baseline" in capsys.readouterr().err
+
+    def test_save_and_compare_uses_previous_baseline(self, tmp_path):
+        """Test --save-baseline --compare checks against the old baseline before replacing it."""
+        baseline_path = tmp_path / "baseline.json"
+        args = [
+            "--rows", "10", "--columns", "3", "--charts", "bar_graph", "--filter", "create_graph",
+            "--repeat", "1", "--min-time", "0.001",
+        ]
+        assert main(args + ["--save-baseline", str(baseline_path)]) == 0
+        document = json.loads(baseline_path.read_text())
+        for result in document["results"].values():
+            result["time_s"] /= 1000
+        baseline_path.write_text(json.dumps(document))
+
+        assert main(args + ["--save-baseline", str(baseline_path), "--compare", str(baseline_path)]) == 1
+        assert main(args + ["--compare", str(baseline_path), "--threshold", "100"]) == 0
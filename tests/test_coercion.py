@@ -0,0 +1,102 @@
+"""
+Unit tests for the numeric coercion engine.
+"""
+
+import numpy as np
+import pytest
+from src.coercion import coerce_column, parse_number
+from src.nodes.graph_renderer import to_float
+
+
+class TestParseNumber:
+    """Test cases for single-value parsing."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("$1.2B", 1.2e9),
+        ("12.5%", 12.5),
+        ("3.4 trillion", 3.4e12),
+        ("1,234 (est.)", 1234.0),
+        ("US$ 2.5 bn", 2.5e9),
+        ("(350)", -350.0),
+        ("~45 percent", 45.0),
+        ("€3,400,000", 3.4e6),
+        ("-5.2%", -5.2),
+    ])
+    def test_formats(self, text, expected):
+        """Test currency, scale, percent and annotation handling."""
+        assert parse_number(text) == pytest.approx(expected)
+
+    @pytest.mark.parametrize("text", ["n/a", "", "unknown", "12 apples", None])
+    def test_unparseable(self, text):
+        """Test that junk is reported rather than guessed."""
+        assert parse_number(text) is None
+
+    def test_to_float_keeps_zero_fallback(self):
+        """Test that the scalar helper keeps its 0.0 contract."""
+        assert to_float("$2k") == 2000.0
+        assert to_float("n/a") == 0.0
+
+
+class TestCoerceColumn:
+    """Test cases for column coercion."""
+
+    def test_fast_path(self):
+        """Test already-numeric and comma-separated columns."""
+        assert coerce_column([1, 2.5, "3"]).values.tolist() == [1.0, 2.5, 3.0]
+        assert coerce_column(["1,000", "2,000"]).failed == []
+
+    def test_mixed_column_reports_failures(self):
+        """Test that failures are listed by row index."""
+        result = coerce_column(["$1.2B", "12.5%", None, "x", "12.5%"])
+
+        assert result.values[[0, 1, 4]].tolist() == [1.2e9, 12.5, 12.5]
+        assert np.isnan(result.values[[2, 3]]).all()
+        assert result.failed == [2, 3]
+
+    def test_integer_dtype_rounds(self):
+        """Test that a declared int dtype is honoured."""
+        assert coerce_column(["1.6k", "2.4"], dtype="int").values.tolist() == [1600.0, 2.0]
+
+    def test_formatted_column_matches_parse_number(self):
+        """Test that the column-wise affix parser agrees with the per-value parser."""
+        values = [
+            "$1.2B", "12.5%", "3.4 trillion", "1,234 (est.)", "US$ 2.5 bn", "(350)", "-$3k",
+            "about 3M USD", "$-5", "1.2bn.", ".5", "2,380", "n/a", "12 apples", "1.2.3", None, 7,
+        ]
+        expected = [parse_number(value) for value in values]
+
+        result = coerce_column(values)
+
+        assert result.values.tolist() == pytest.approx([np.nan if v is None else v for v in expected], nan_ok=True)
+        assert result.failed == [index for index, value in enumerate(expected) if value is None]
+
+    def test_long_cell_does_not_widen_the_column(self):
+        """Test that one verbose cell is parsed on its own instead of sizing the whole column."""
+        import tracemalloc
+
+        values = [f"${index}.5M" for index in range(10000)]
+        values[5000] = "1,234 (" + "note " * 400 + ")"
+        tracemalloc.start()
+        try:
+            result = coerce_column(values)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        assert result.values[5000] == 1234.0
+        assert result.values[7] == 7.5e6
+        assert result.failed == []
+        assert peak < 20 * 1024 * 1024
+
+    def test_comma_grouping_matches_parse_number(self):
+        """Test that only thousands-separator commas are accepted, as in parse_number."""
+        values = [
+            "12,34", "1,2,3", "1,234", "12,345,678.9", "1234,567", "1,234.5,6",
+            ",123", "1,234,", "$1,234.5M", "-1,000%", "1,23", "123,456,78",
+        ]
+        expected = [parse_number(value) for value in values]
+
+        result = coerce_column(values)
+
+        assert result.values.tolist() == pytest.approx([np.nan if v is None else v for v in expected], nan_ok=True)
+        assert result.failed == [index for index, value in enumerate(expected) if value is None]
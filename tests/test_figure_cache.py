@@ -0,0 +1,106 @@
+"""
+Unit tests for the content-addressed figure cache.
+"""
+
+import plotly.graph_objects as go
+from unittest.mock import patch
+from src import figure_cache
+from src import figure_cache
+from src.figure_cache import FigureCache, make_figure_key
+from src.nodes.graph_renderer import render_graph
+
+
+def bar_figure():
+    return go.Figure([go.Bar(x=["a", "b"], y=[1, 2])])
+
+
+def bar_figure_for(graph_type, data, user_query, selected_columns=None):
+    return go.Figure([go.Bar(x=["a"], y=[1])], layout={"title": f"{graph_type}: {user_query}"})
+
+
+class TestFigureKey:
+    """Test cases for figure content addresses."""
+
+    def test_key_ignores_dict_order(self):
+        """Test that equal data hashes equally regardless of key order."""
+        first = make_figure_key({"A": 1, "B": 2}, "bar_graph", ["A", "B"])
+        second = make_figure_key({"B": 2, "A": 1}, "bar_graph", ["A", "B"])
+        assert first == second
+
+    def test_key_depends_on_chart_type(self):
+        """Test that the same data under another chart type misses."""
+        assert make_figure_key({"A": 1}, "bar_graph") != make_figure_key({"A": 1}, "pie_chart")
+
+    def test_key_depends_on_code_and_plotly_versions(self, monkeypatch):
+        """Test that figures rendered by older code or another Plotly release miss."""
+        key = make_figure_key({"A": 1}, "bar_graph")
+
+        monkeypatch.setattr(figure_cache, "FIGURE_CACHE_VERSION", figure_cache.FIGURE_CACHE_VERSION + 1)
+        assert make_figure_key({"A": 1}, "bar_graph") != key
+        monkeypatch.undo()
+
+        monkeypatch.setattr(figure_cache.plotly, "__version__", "0.0.0")
+        assert make_figure_key({"A": 1}, "bar_graph") != key
+
+
+class TestFigureCache:
+    """Test cases for FigureCache."""
+
+    def test_memory_hit_returns_same_objects(self):
+        """Test that a memory hit returns the stored figure and JSON."""
+        cache = FigureCache()
+        fig = bar_figure()
+        figure_json = cache.put("k", fig)
+
+        assert cache.get("k") == (fig, figure_json)
+        assert cache.get("missing") is None
+        assert cache.stats["memory_hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    def test_lru_eviction_by_count_and_bytes(self):
+        """Test that the memory tier stays within both bounds."""
+        cache = FigureCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, bar_figure())
+        assert cache.get("a") is None
+
+        size = len(bar_figure().to_json())
+        cache = FigureCache(max_memory_bytes=size * 2)
+        for key in ("a", "b", "c"):
+            cache.put(key, bar_figure())
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
+
+    def test_disk_tier_is_shared(self, tmp_path):
+        """Test that another cache instance reads figures from SQLite."""
+        path = str(tmp_path / "figures.sqlite")
+        figure_json = FigureCache(sqlite_path=path).put("k", bar_figure())
+
+        other = FigureCache(sqlite_path=path)
+        fig, cached_json = other.get("k")
+        assert cached_json == figure_json
+        assert list(fig.data[0].y) == [1, 2]
+        assert other.stats["disk_hits"] == 1
+
+
+class TestRenderGraph:
+    """Test cases for the cache-aware renderer."""
+
+    def test_repeat_render_skips_building(self, sample_json_data):
+        """Test that identical inputs are built and serialized once."""
+        with patch("src.nodes.graph_renderer.create_graph", wraps=bar_figure_for) as create:
+            first = render_graph("bar_graph", sample_json_data, "Population")
+            second = render_graph("bar_graph", dict(reversed(sample_json_data.items())), "Population")
+            third = render_graph("pie_chart", sample_json_data, "Population")
+
+        assert create.call_count == 2
+        assert second == first
+        assert third[1] != first[1]
+        assert figure_cache.get_figure_cache().stats["hits"] == 1
+
+    def test_placeholder_figures_are_not_cached(self):
+        """Test that 'no data' figures are rebuilt each time."""
+        render_graph("bar_graph", {"A": {"values": []}, "B": {"values": []}}, "Empty")
+        render_graph("bar_graph", {"A": {"values": []}, "B": {"values": []}}, "Empty")
+
+        assert figure_cache.get_figure_cache().stats["hits"] == 0
@@ -0,0 +1,247 @@
+"""
+Unit tests for graph data parsing and rendering.
+"""
+
+import json
+import numpy as np
+import plotly.graph_objects as go
+from src.charts import available_charts, build_chart, register_chart, resolve_chart
+from src.charts import registry as chart_registry
+from src.charts.downsample import downsample, lttb_indices
+from src.charts.trimming import trim_categories
+from src.nodes.data_trimming import data_trimming_node
+from src.nodes.graph_renderer import create_graph, parse_columnar_data, parse_data_for_graph
+
+
+def dumps(data):
+    return "```json\n" + json.dumps(data) + "\n```"
+
+
+class TestParseColumnarData:
+    """Test cases for the NumPy-backed columnar parser."""
+
+    def test_numeric_and_label_views(self, sample_json_data):
+        """Test that columns are coerced once into typed arrays."""
+        table = parse_columnar_data(dumps(sample_json_data))
+
+        assert table.columns == ["Country", "Population"]
+        assert table.numeric("Population").dtype == np.float64
+        assert table.numeric("Population").tolist() == [331.0, 1441.0, 1380.0]
+        assert table.labels("Country").tolist() == ["USA", "China", "India"]
+        assert table.numeric("Population") is table.numeric("Population")
+
+    def test_comma_strings_are_vectorized(self):
+        """Test thousands separators and unparseable cells."""
+        data = {"A": {"values": ["x", "y", "z"]}, "B": {"values": ["1,234", "5", None]}}
+        table = parse_columnar_data(json.dumps(data))
+
+        assert table.numeric("B")[:2].tolist() == [1234.0, 5.0]
+        assert np.isnan(table.numeric("B")[2])
+        assert table.coercion_failures == {"B": [2]}
+
+    def test_accepts_parsed_dict(self, sample_json_data):
+        """Test that already-decoded data is used without re-parsing."""
+        table = parse_columnar_data(sample_json_data)
+
+        assert table.columns == ["Country", "Population"]
+
+    def test_short_column_is_rejected(self):
+        """Test that ragged columns produce no table."""
+        data = {"A": {"values": ["x", "y"]}, "B": {"values": [1]}}
+
+        assert parse_columnar_data(json.dumps(data)) is None
+
+    def test_legacy_row_output(self, sample_json_data):
+        """Test that parse_data_for_graph still returns row lists."""
+        columns, rows = parse_data_for_graph(json.dumps(sample_json_data))
+
+        assert columns == ["Country", "Population"]
+        assert rows == [["USA", 331], ["China", 1441], ["India", 1380]]
+
+
+class TestCreateGraph:
+    """Test cases for create_graph."""
+
+    def test_bar_graph_traces(self, sample_json_data):
+        """Test that traces are fed from the columnar arrays."""
+        fig = create_graph("bar_graph", dumps(sample_json_data), "Population")
+
+        assert list(fig.data[0].x) == ["USA", "China", "India"]
+        assert list(fig.data[0].y) == [331.0, 1441.0, 1380.0]
+
+    def test_multi_series(self):
+        """Test that every series becomes a trace."""
+        data = {
+            "col_names": ["Country", "A", "B"],
+            "Country": {"values": ["USA", "India"]},
+            "A": {"values": [1, 2]},
+            "B": {"values": [3, 4]},
+        }
+        fig = create_graph("stacked_bar_chart", json.dumps(data), "q")
+
+        assert [trace.name for trace in fig.data] == ["A", "B"]
+        assert fig.layout.barmode == "stack"
+
+    def test_unit_values_are_plotted(self):
+        """Test that currency/scale/percent strings are not plotted as zero."""
+        data = {
+            "Company": {"dtype": "str", "values": ["A", "B", "C"]},
+            "Revenue": {"dtype": "float", "values": ["$1.2B", "3.4 trillion", "unknown"]},
+        }
+        fig = create_graph("bar_graph", json.dumps(data), "q")
+
+        assert list(fig.data[0].y[:2]) == [1.2e9, 3.4e12]
+        assert fig.layout.meta == {"coercion_failures": {"Revenue": [2]}}
+
+    def test_invalid_data_renders_placeholder(self):
+        """Test the no-data fallback figure."""
+        fig = create_graph("bar_graph", "not json", "q")
+
+        assert fig.layout.annotations[0].text == "No structured data found for visualization"
+
+
+class TestChartRegistry:
+    """Test cases for the pluggable chart registry."""
+
+    def make_table(self, columns=("Country", "A", "B")):
+        data = {col: {"values": ["USA", "India"] if i == 0 else [i, i + 1]} for i, col in enumerate(columns)}
+        return parse_columnar_data(json.dumps({"col_names": list(columns), **data}))
+
+    def test_all_chart_types_build(self):
+        """Test that every registered chart type renders the sample table."""
+        table = self.make_table()
+        for name in available_charts():
+            fig = build_chart(name, table, "q")
+            assert len(fig.data) >= 1, name
+
+    def test_fallback_when_requirements_not_met(self):
+        """Test that multi-series charts fall back to a bar chart on two columns."""
+        table = self.make_table(("Country", "A"))
+
+        assert resolve_chart("stacked_bar_chart", table).name == "bar_graph"
+        assert resolve_chart("heatmap", table).name == "bar_graph"
+        assert resolve_chart("unknown_type", table).name == "bar_graph"
+
+    def test_new_types(self):
+        """Test the histogram, area and heatmap builders."""
+        table = self.make_table()
+
+        assert build_chart("histogram", table, "q").data[0].type == "histogram"
+        assert build_chart("area_chart", table, "q").data[1].stackgroup == "one"
+        assert build_chart("heatmap", table, "q").data[0].z.shape == (2, 2)
+
+    def test_register_custom_chart(self, monkeypatch):
+        """Test that new chart types plug in without touching create_graph."""
+        monkeypatch.setattr(chart_registry, "_CHART_REGISTRY", dict(chart_registry._CHART_REGISTRY))
+
+        @register_chart("test_funnel", description="test only")
+        def build_funnel(table, title):
+            return go.Figure(data=[go.Funnel(y=table.labels(table.columns[0]), x=table.numeric(table.columns[1]))])
+
+        data = {"Stage": {"values": ["a", "b"]}, "Count": {"values": [10, 5]}}
+        assert create_graph("test_funnel", json.dumps(data), "q").data[0].type == "funnel"
+        monkeypatch.undo()
+        assert "test_funnel" not in available_charts()
+
+
+class TestLargeSeries:
+    """Test cases for size-aware rendering."""
+
+    def make_series(self, rows):
+        return json.dumps({
+            "col_names": ["x", "y"],
+            "x": {"dtype": "float", "values": list(range(rows))},
+            "y": {"dtype": "float", "values": [float(np.sin(i / 50.0)) for i in range(rows)]},
+        })
+
+    def test_line_graph_is_downsampled(self):
+        """Test LTTB reduction above the threshold and its record in meta."""
+        fig = create_graph("line_graph", self.make_series(10000), "q")
+
+        assert len(fig.data[0].y) == 2000
+        assert fig.layout.meta["downsampling"] == {"method": "lttb", "original_points": 10000, "rendered_points": 2000}
+
+    def test_small_line_graph_untouched(self):
+        """Test that small series keep every point."""
+        fig = create_graph("line_graph", self.make_series(100), "q")
+
+        assert len(fig.data[0].y) == 100
+        assert fig.layout.meta is None
+
+    def test_scatter_switches_to_webgl(self):
+        """Test Scattergl above the threshold."""
+        assert create_graph("scatterplot", self.make_series(5000), "q").data[0].type == "scattergl"
+        assert create_graph("scatterplot", self.make_series(50), "q").data[0].type == "scatter"
+
+    def test_downsamplers_keep_extremes(self):
+        """Test that both methods keep endpoints and peaks."""
+        y = np.zeros(1000)
+        y[500] = 10.0
+        for method in ("lttb", "minmax"):
+            keep = downsample(y, 50, method)
+            assert 500 in keep
+            assert len(keep) <= 50
+        assert lttb_indices(y, 50)[[0, -1]].tolist() == [0, 999]
+
+
+def long_tail_data(n=15):
+    names = [f"C{i}" for i in range(n)]
+    return {
+        "col_names": ["Name", "Sales", "Profit"],
+        "Name": {"dtype": "str", "values": names},
+        "Sales": {"dtype": "float", "values": [100.0 - i * 6 for i in range(n)]},
+        "Profit": {"dtype": "float", "values": [1.0] * n},
+    }
+
+
+class TestDataTrimming:
+    """Test cases for Top-N + Others aggregation."""
+
+    def test_tail_folds_into_others(self):
+        """Test that categories beyond top_n are summed per series."""
+        data = long_tail_data()
+        trimmed, summary = trim_categories(data, ["Name", "Sales", "Profit"], top_n=5)
+
+        assert trimmed["Name"]["values"] == ["C0", "C1", "C2", "C3", "C4", "Others"]
+        assert trimmed["Sales"]["values"][-1] == sum(100.0 - i * 6 for i in range(5, 15))
+        assert trimmed["Profit"]["values"][-1] == 10.0
+        assert summary["folded_categories"] == 10
+
+    def test_min_share_drops_small_categories(self):
+        """Test that small categories are folded even inside the top_n."""
+        data = {
+            "Name": {"values": ["A", "B", "C", "D"]},
+            "Share": {"values": [90, 8, 1, 1]},
+        }
+        trimmed, _ = trim_categories(data, ["Name", "Share"], top_n=10, min_share=0.05)
+
+        assert trimmed["Name"]["values"] == ["A", "B", "Others"]
+        assert trimmed["Share"]["values"] == [90.0, 8.0, 2.0]
+
+    def test_small_data_is_untouched(self):
+        """Test that folding a single category is skipped."""
+        data = long_tail_data(6)
+        trimmed, summary = trim_categories(data, ["Name", "Sales"], top_n=5)
+
+        assert trimmed is data
+        assert summary is None
+
+    def test_mixed_sign_series_is_not_folded(self):
+        """Test that positive and negative tails are not summed into one bucket."""
+        data = long_tail_data(30)
+        trimmed, summary = trim_categories(data, ["Name", "Sales"], top_n=5)
+
+        assert trimmed is data
+        assert summary is None
+
+    def test_node_trims_pie_charts_only(self):
+        """Test that the node trims pie charts and leaves bar and line graphs alone by default."""
+        state = {"formatted_data": dumps(long_tail_data(15)), "selected_columns": ["Name", "Sales"]}
+
+        pie = data_trimming_node({**state, "selected_graph_type": "pie_chart"})
+        bar = data_trimming_node({**state, "selected_graph_type": "bar_graph"})
+        line = data_trimming_node({**state, "selected_graph_type": "line_graph"})
+
+        assert pie["trimmed_data"]["Name"]["values"][-1] == "Others"
+        assert bar["trimmed_data"] is None
+        assert line["trimmed_data"] is None
@@ -0,0 +1,125 @@
+"""
+Unit tests for graph type selection.
+"""
+
+import json
+from unittest.mock import Mock, patch
+from src.graph_rules import select_graph_by_rules, is_time_like
+from src.data_profile import profile_data
+from src.nodes.graph_selector import graph_selector_node
+
+
+def column(dtype, values):
+    return {"dtype": dtype, "values": values}
+
+
+class TestSelectGraphByRules:
+    """Test cases for the dtype-driven selector."""
+
+    def test_category_and_numeric_is_bar(self):
+        """Test the str + numeric shape."""
+        data = {"col_names": ["Country", "GDP"], "Country": column("str", ["USA", "China"]), "GDP": column("float", [25.4, 17.9])}
+
+        assert select_graph_by_rules(data, "GDP of countries") == ("bar_graph", ["Country", "GDP"])
+
+    def test_share_query_is_pie(self):
+        """Test that share-style queries choose a pie chart."""
+        data = {"col_names": ["Sector", "Share"], "Sector": column("str", ["Services", "Industry"]), "Share": column("float", [60, 40])}
+
+        assert select_graph_by_rules(data, "percentage share of sectors")[0] == "pie_chart"
+
+    def test_time_axis_is_line(self):
+        """Test that year-valued first columns choose a line graph."""
+        data = {"col_names": ["Year", "Price"], "Year": column("int", [2020, 2021]), "Price": column("float", [1.0, 2.0])}
+
+        assert select_graph_by_rules(data)[0] == "line_graph"
+        assert is_time_like("x", column("str", ["2023-01", "2023-02"]))
+
+    def test_numeric_pair_is_scatter(self):
+        """Test numeric-vs-numeric pairs."""
+        data = {"col_names": ["Height", "Weight"], "Height": column("float", [1.7, 1.8]), "Weight": column("float", [70, 80])}
+
+        assert select_graph_by_rules(data)[0] == "scatterplot"
+
+    def test_multi_series(self):
+        """Test category + several numeric series."""
+        data = {
+            "col_names": ["Country", "Agriculture", "Industry"],
+            "Country": column("str", ["USA", "India"]),
+            "Agriculture": column("float", [1, 17]),
+            "Industry": column("float", [18, 26]),
+        }
+
+        assert select_graph_by_rules(data, "% contribution of sectors")[0] == "stacked_bar_chart"
+        assert select_graph_by_rules(data, "compare sectors")[0] == "multi_bar_graph"
+        assert select_graph_by_rules(data, "sectors") is None
+
+    def test_ambiguous_schema_defers(self):
+        """Test that mixed schemas are left to the LLM."""
+        data = {
+            "col_names": ["City", "Country", "Population"],
+            "City": column("str", ["London"]),
+            "Country": column("str", ["UK"]),
+            "Population": column("int", [9000000]),
+        }
+
+        assert select_graph_by_rules(data) is None
+
+
+class TestProfileData:
+    """Test cases for the data profile sent to the LLM."""
+
+    def make_data(self, rows):
+        return {
+            "col_names": ["City", "Country", "Population"],
+            "City": column("str", [f"city{i}" for i in range(rows)]),
+            "Country": column("str", ["UK" if i % 2 else "FR" for i in range(rows)]),
+            "Population": column("int", list(range(rows, 0, -1))),
+        }
+
+    def test_profile_contents(self):
+        """Test column statistics and sample rows."""
+        profile = profile_data(self.make_data(10))
+        population = profile["columns"][2]
+
+        assert profile["row_count"] == 10
+        assert profile["columns"][1]["cardinality"] == 2
+        assert (population["min"], population["max"], population["monotonic"]) == (1, 10, "decreasing")
+        assert profile["sample_rows"][0] == ["city0", "FR", 10]
+        assert profile["sample_rows"][-1] == ["city9", "UK", 1]
+
+    def test_profile_size_is_flat(self):
+        """Test that profile size does not grow with row count."""
+        small = json.dumps(profile_data(self.make_data(5)))
+        large = json.dumps(profile_data(self.make_data(5000)))
+
+        assert len(large) < len(small) + 50
+
+
+class TestGraphSelectorNode:
+    """Test cases for graph_selector_node."""
+
+    @patch('src.nodes.graph_selector.get_llm')
+    def test_rule_hit_skips_llm(self, mock_get_llm, sample_state):
+        """Test that a simple schema is selected without a network call."""
+        data = {"col_names": ["Country", "GDP"], "Country": column("str", ["USA"]), "GDP": column("float", [25.4])}
+        state = {**sample_state, "formatted_data": "```json\n" + json.dumps(data) + "\n```"}
+
+        result = graph_selector_node(state)
+
+        assert result == {"selected_graph_type": "bar_graph", "selected_columns": ["Country", "GDP"]}
+        mock_get_llm.assert_not_called()
+
+    @patch('src.nodes.graph_selector.get_llm')
+    def test_ambiguous_schema_uses_llm(self, mock_get_llm, sample_state):
+        """Test the LLM fallback."""
+        data = {"col_names": ["A", "B", "C"], "A": column("str", ["x"]), "B": column("str", ["y"]), "C": column("int", [1])}
+        mock_get_llm.return_value.invoke.return_value = Mock(
+            content='{"selected_graph_type": "bar_graph", "selected_columns": ["A", "C"]}'
+        )
+        state = {**sample_state, "formatted_data": json.dumps(data)}
+
+        result = graph_selector_node(state)
+
+        assert result["selected_columns"] == ["A", "C"]
+        mock_get_llm.return_value.invoke.assert_called_once()
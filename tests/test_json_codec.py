@@ -0,0 +1,58 @@
+"""
+Unit tests for JSON extraction from LLM output.
+"""
+
+import pytest
+import src.json_codec as json_codec
+from src.json_codec import dumps, extract_json, find_json_object, loads
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def codec(request, monkeypatch):
+    """Run each test with and without orjson."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_codec, "orjson", None)
+    elif json_codec.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+class TestExtractJson:
+    """Test cases for locating and decoding JSON objects."""
+
+    def test_plain_json(self, codec):
+        """Test that clean JSON decodes directly."""
+        assert extract_json('{"a": 1}') == {"a": 1}
+
+    def test_fenced_json_with_prose(self, codec):
+        """Test that fences and surrounding text are ignored."""
+        text = 'Here is the data:\n```json\n{"a": {"values": [1, 2]}}\n```\nLet me know!'
+        assert extract_json(text) == {"a": {"values": [1, 2]}}
+
+    def test_braces_inside_strings(self, codec):
+        """Test that braces in string values do not end the object early."""
+        text = 'note {"label": "a } b {", "n": "\\"}"} trailing }'
+        assert find_json_object(text) == '{"label": "a } b {", "n": "\\"}"}'
+        assert extract_json(text) == {"label": "a } b {", "n": '"}'}
+
+    def test_skips_unbalanced_prefix(self, codec):
+        """Test that an unclosed brace before the object is skipped."""
+        assert extract_json('{ oops {"a": 1}') == {"a": 1}
+
+    def test_no_object(self, codec):
+        """Test that text without an object, or a non-object, gives None."""
+        assert extract_json("No data available.") is None
+        assert extract_json("[1, 2]") is None
+        assert extract_json("") is None
+        assert extract_json(None) is None
+
+    def test_dict_passes_through(self, codec):
+        """Test that parsed data is returned as-is."""
+        data = {"a": 1}
+        assert extract_json(data) is data
+
+    def test_round_trip(self, codec):
+        """Test that dumps and loads agree."""
+        data = {"x": [1, 2.5, "é"], "y": None}
+        assert loads(dumps(data)) == data
+        assert loads(dumps(data, compact=True)) == data
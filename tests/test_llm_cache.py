@@ -0,0 +1,83 @@
+"""
+Unit tests for the tiered LLM response cache.
+"""
+
+import time
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+from src.llm_cache import LLMResponseCache, has_json_object
+
+
+def make_llm(cache, responses=("first", "second", "third")):
+    """Build a fake chat model that returns a new canned answer per real call."""
+    return FakeListChatModel(responses=list(responses), cache=cache)
+
+
+class TestLLMResponseCache:
+    """Test cases for LLMResponseCache."""
+
+    def test_repeated_prompt_is_served_from_memory(self):
+        """Test that an identical message list skips the model."""
+        cache = LLMResponseCache(max_entries=10)
+        llm = make_llm(cache)
+        messages = [HumanMessage(content="Top 5 countries by GDP")]
+
+        assert llm.invoke(messages).content == "first"
+        assert llm.invoke(messages).content == "first"
+        assert cache.stats["memory_hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    def test_different_messages_miss(self):
+        """Test that the message list is part of the key."""
+        cache = LLMResponseCache(max_entries=10)
+        llm = make_llm(cache)
+
+        assert llm.invoke([HumanMessage(content="a")]).content == "first"
+        assert llm.invoke([HumanMessage(content="b")]).content == "second"
+        assert cache.stats["hits"] == 0
+
+    def test_lru_eviction(self):
+        """Test that the memory tier is bounded."""
+        cache = LLMResponseCache(max_entries=1)
+        llm = make_llm(cache)
+
+        llm.invoke([HumanMessage(content="a")])
+        llm.invoke([HumanMessage(content="b")])
+
+        assert cache.stats["evictions"] == 1
+        assert llm.invoke([HumanMessage(content="a")]).content == "third"
+
+    def test_sqlite_tier_survives_new_instance(self, tmp_path):
+        """Test that entries persist on disk across cache instances."""
+        path = str(tmp_path / "llm.sqlite")
+        messages = [HumanMessage(content="persist me")]
+        make_llm(LLMResponseCache(sqlite_path=path)).invoke(messages)
+
+        cache = LLMResponseCache(sqlite_path=path)
+        assert make_llm(cache).invoke(messages).content == "first"
+        assert cache.stats["disk_hits"] == 1
+        assert cache.stats["misses"] == 0
+
+    def test_scoped_ttl(self):
+        """Test that a scoped view applies its own freshness window."""
+        cache = LLMResponseCache(max_entries=10)
+        messages = [HumanMessage(content="q")]
+        make_llm(cache.scoped(60)).invoke(messages)
+
+        time.sleep(0.01)
+        make_llm(cache.scoped(0.001)).invoke(messages)
+        assert cache.stats["misses"] == 2
+
+        make_llm(cache.scoped(60)).invoke(messages)
+        assert cache.stats["hits"] == 1
+
+    def test_scoped_validator_skips_unparseable_replies(self):
+        """Test that a reply rejected by the scope validator is fetched again."""
+        cache = LLMResponseCache(max_entries=10)
+        llm = make_llm(cache.scoped(60, has_json_object), responses=("not json", '{"a": 1}', "third"))
+        messages = [HumanMessage(content="q")]
+
+        assert llm.invoke(messages).content == "not json"
+        assert llm.invoke(messages).content == '{"a": 1}'
+        assert llm.invoke(messages).content == '{"a": 1}'
+        assert cache.stats["hits"] == 1
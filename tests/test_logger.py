@@ -0,0 +1,73 @@
+"""
+Unit tests for logging configuration and payload handling.
+"""
+
+import logging
+import logging.handlers
+from src.logger import Payload, PayloadSamplingFilter, configure_logging, get_logger, payload, shutdown_logging
+
+
+class CountingValue:
+    """A value that counts how often it is formatted."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "x" * 2000
+
+
+class TestPayload:
+    """Test cases for payload truncation and laziness."""
+
+    def test_truncates_on_format(self):
+        """Test long values are cut to the limit with a marker."""
+        text = str(payload("a" * 1000, limit=10))
+
+        assert text == "aaaaaaaaaa... [990 more chars]"
+        assert str(payload("short", limit=10)) == "short"
+        assert repr(payload("ab", limit=3)) == "'ab... [1 more chars]"
+
+    def test_not_formatted_when_level_disabled(self):
+        """Test a DEBUG payload costs nothing at INFO."""
+        logger = get_logger("tests.lazy")
+        logger.setLevel(logging.INFO)
+        value = CountingValue()
+
+        logger.debug("Search results: %s", payload(value))
+
+        assert value.formatted == 0
+
+    def test_sampling_filter(self):
+        """Test only payload records are sampled."""
+        drop_all = PayloadSamplingFilter(0.0)
+
+        def record(*args):
+            return logging.LogRecord("t", logging.INFO, __file__, 1, "msg %s", args, None)
+
+        assert drop_all.filter(record("plain")) is True
+        assert drop_all.filter(record(Payload("big"))) is False
+        assert PayloadSamplingFilter(1.0).filter(record(Payload("big"))) is True
+
+
+class TestConfigureLogging:
+    """Test cases for the single configuration point."""
+
+    def test_idempotent_and_queued(self, capsys):
+        """Test repeated calls install one queue handler that writes through a listener."""
+        root = logging.getLogger()
+        before = len(root.handlers)
+        level = root.level
+
+        configure_logging(level="DEBUG", format="%(levelname)s %(message)s", max_field_chars=8)
+        configure_logging()
+        handlers = root.handlers[before:]
+        get_logger("tests.queue").debug("Cleaned data: %s", payload("0123456789abcdef"))
+        shutdown_logging()
+        root.setLevel(level)
+
+        assert len(handlers) == 1
+        assert isinstance(handlers[0], logging.handlers.QueueHandler)
+        assert len(root.handlers) == before
+        assert "DEBUG Cleaned data: 01234567... [8 more chars]" in capsys.readouterr().out
@@ -0,0 +1,105 @@
+"""
+Unit tests for workflow metrics.
+"""
+
+import asyncio
+import httpx
+from unittest.mock import Mock, patch
+from langchain_core.outputs import LLMResult
+from src import metrics
+from src.metrics import Histogram, TOKEN_USAGE_CALLBACK, node_span, render_prometheus, summary
+from src.server import create_app
+from src.workflows.web_search_workflow import create_web_search_graph, get_initial_state
+
+
+class TestHistogram:
+    """Test cases for the histogram and exposition format."""
+
+    def test_quantile(self):
+        """Test quantiles interpolate within buckets."""
+        histogram = Histogram((1, 2, 4))
+        for value in (0.5, 1.5, 1.5, 3):
+            histogram.observe(value)
+
+        assert histogram.counts == [1, 2, 1, 0]
+        assert histogram.quantile(0.5) == 1.5
+        assert Histogram((1,)).quantile(0.5) is None
+
+    def test_render_prometheus(self):
+        """Test counters and cumulative histogram buckets are rendered."""
+        registry = metrics.get_registry()
+        registry.inc("cache_lookups_total", cache="search", node="web_search", result="fresh")
+        registry.observe("node_duration_seconds", 0.2, (0.1, 1.0), node='a"b')
+
+        text = render_prometheus()
+
+        assert "# TYPE graph_search_cache_lookups_total counter" in text
+        assert 'graph_search_cache_lookups_total{cache="search",node="web_search",result="fresh"} 1' in text
+        assert 'graph_search_node_duration_seconds_bucket{node="a\\"b",le="0.1"} 0' in text
+        assert 'graph_search_node_duration_seconds_bucket{node="a\\"b",le="+Inf"} 1' in text
+        assert 'graph_search_node_duration_seconds_count{node="a\\"b"} 1' in text
+
+
+class TestTracing:
+    """Test cases for node tracing, token usage and cache lookups."""
+
+    def test_token_usage_attributed_to_node(self):
+        """Test token counts land on the running node and cache hits are skipped."""
+        with node_span("chat_with_search"):
+            TOKEN_USAGE_CALLBACK.on_llm_end(LLMResult(
+                generations=[], llm_output={"token_usage": {"prompt_tokens": 900, "completion_tokens": 120}}
+            ))
+            TOKEN_USAGE_CALLBACK.on_llm_end(LLMResult(generations=[], llm_output=None))
+
+        histograms = metrics.get_registry().histograms()
+        prompt = histograms[("llm_prompt_tokens", (("node", "chat_with_search"),))]
+        assert (prompt.count, prompt.sum) == (1, 900)
+        assert summary()[0]["mean_completion_tokens"] == 120
+
+    @patch('src.nodes.web_search_context.get_llm')
+    @patch('src.nodes.web_search._search', return_value="search results " * 100)
+    def test_workflow_nodes_traced(self, mock_search, mock_get_llm):
+        """Test each node records wall time, payload sizes and cache lookups."""
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(content='{"col_names": []}')
+        mock_get_llm.return_value = mock_llm
+        graph = create_web_search_graph()
+
+        graph.invoke(get_initial_state("GDP"))
+        graph.invoke(get_initial_state("GDP"))
+
+        rows = {row["node"]: row for row in summary()}
+        assert rows["web_search"]["runs"] == 2
+        assert rows["chat_with_search"]["runs"] == 2
+        assert rows["web_search"]["mean_search_results_bytes"] == 1500
+        assert rows["web_search"]["search_cache_miss"] == 1
+        assert rows["web_search"]["search_cache_fresh"] == 1
+        assert "mean_formatted_data_bytes" in rows["chat_with_search"]
+
+    def test_failed_node_counted(self):
+        """Test a raising node is recorded as an error."""
+        try:
+            with node_span("graph_selector"):
+                raise ValueError("bad data")
+        except ValueError:
+            pass
+
+        row, = summary()
+        assert (row["node"], row["runs"], row["errors"]) == ("graph_selector", 1, 1)
+
+    def test_metrics_endpoint(self):
+        """Test the server exposes the Prometheus text."""
+        with node_span("graph_renderer"):
+            pass
+        app = create_app(workflows={}, settings={"warm_start": False})
+
+        async def scrape():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get("/metrics")
+
+        response = asyncio.run(scrape())
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'graph_search_node_runs_total{node="graph_renderer",status="ok"} 1' in response.text
@@ -0,0 +1,84 @@
+"""
+Unit tests for the prompt and model-config registry.
+"""
+
+import os
+import pytest
+from src import prompt_registry
+from src.prompt_registry import PromptSpec, PromptValidationError, WatchedFile, get_prompt, render_prompt
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestWatchedFile:
+    """Test cases for mtime-based reloading."""
+
+    def test_reloads_only_on_change(self, tmp_path):
+        """Test that the loader runs once until the file changes."""
+        path = tmp_path / "prompt.txt"
+        path.write_text("v1")
+        calls = []
+
+        def loader(p):
+            calls.append(p)
+            return open(p).read()
+
+        watched = WatchedFile(str(path), loader, check_interval=0)
+        assert watched.get() == "v1"
+        assert watched.get() == "v1"
+        assert len(calls) == 1
+
+        path.write_text("v2")
+        bump_mtime(path)
+        assert watched.get() == "v2"
+        assert len(calls) == 2
+
+    def test_no_stat_within_interval(self, tmp_path):
+        """Test that lookups inside the check interval do no file I/O."""
+        path = tmp_path / "prompt.txt"
+        path.write_text("v1")
+        watched = WatchedFile(str(path), lambda p: open(p).read(), check_interval=3600)
+        watched.get()
+
+        path.write_text("v2")
+        bump_mtime(path)
+        assert watched.get() == "v1"
+
+    def test_bad_reload_keeps_previous_version(self, tmp_path):
+        """Test that an invalid edit does not take down the running prompt."""
+        path = tmp_path / "prompt.txt"
+        path.write_text("Query: {user_query}")
+        spec = PromptSpec("prompt.txt", frozenset({"user_query"}), "")
+        watched = WatchedFile(str(path), spec.load, check_interval=0)
+        assert watched.get() == "Query: {user_query}"
+
+        path.write_text("Query: {user_qurey}")
+        bump_mtime(path)
+        assert watched.get() == "Query: {user_query}"
+
+
+class TestPromptValidation:
+    """Test cases for placeholder validation."""
+
+    def test_shipped_prompts_validate(self):
+        """Test that every prompt in src/prompts matches its node's placeholders."""
+        prompt_registry.reset()
+        prompt_registry.preload()
+        assert "{search_results}" in get_prompt("web_search")
+        assert "**User Query:** q" in render_prompt("graph_selection", data="{}", user_query="q")
+
+    def test_mismatched_placeholders_raise(self):
+        """Test that missing and unknown fields are reported."""
+        spec = PromptSpec("x.txt", frozenset({"data", "user_query"}), "")
+        with pytest.raises(PromptValidationError, match="missing placeholders \\['user_query'\\]"):
+            spec.validate("{data} {extra}")
+        spec.validate("{data} {{literal}} {user_query}")
+
+    def test_model_profile(self):
+        """Test that model profiles always carry model_kwargs."""
+        profile = prompt_registry.get_model_profile("gpt-mini")
+        assert profile["model_id"]
+        assert isinstance(profile["model_kwargs"], dict)
@@ -0,0 +1,119 @@
+"""
+Unit tests for the local query classifier tier.
+"""
+
+import json
+from unittest.mock import Mock, patch
+from src.query_classifier import (
+    LocalQueryClassifier,
+    TfidfLogisticModel,
+    classify_by_rules,
+    train_from_log,
+)
+from src.nodes.query_filtering import query_filtering_node
+
+GRAPHABLE = [
+    "top 10 countries by gdp", "population by country", "sales by month",
+    "market share of smartphone brands", "revenue by sector in 2023",
+    "top 5 car makers by sales", "gdp growth rate of india", "defense budget by country",
+]
+NON_GRAPHABLE = [
+    "what is machine learning", "how does photosynthesis work", "define democracy",
+    "explain quantum computing", "how to cook pasta", "describe a cat",
+    "who is the president of france", "why is the sky blue",
+]
+GRAPHABLE_QUESTIONS = [
+    "What are the largest economies in the world?",
+    "What are the most populous cities in Europe",
+    "How does US defense spending compare to China",
+    "How did unemployment change during covid",
+]
+
+
+class TestRules:
+    """Test cases for the keyword/regex tier."""
+
+    def test_obvious_queries(self):
+        """Test that clear-cut queries are decided by rules."""
+        assert classify_by_rules("Top 10 countries by defense budget in USD")[0] == "Yes"
+        assert classify_by_rules("How does photosynthesis work?")[0] == "No"
+
+    def test_quantity_overrides_question_lead_in(self):
+        """Test that numeric questions are not rejected by a 'what are' prefix."""
+        assert classify_by_rules("What are the top 5 countries by population?")[0] == "Yes"
+
+    def test_lead_in_alone_is_not_confident(self):
+        """Test that graphable questions with a 'what are'/'how does' lead-in reach the LLM."""
+        classifier = LocalQueryClassifier()
+        for query in GRAPHABLE_QUESTIONS:
+            verdict = classify_by_rules(query)
+            assert verdict is None or verdict[1] < classifier.confidence_threshold
+            assert classifier.classify(query) is None
+
+    def test_top_n_of_non_numeric_items_defers(self):
+        """Test that a bare 'top N' does not accept listicle queries."""
+        assert classify_by_rules("top 10 reasons to learn python") is None
+        assert LocalQueryClassifier().classify("top 10 reasons to learn python") is None
+
+    def test_ambiguous_query_defers(self):
+        """Test that rules abstain when nothing fires."""
+        assert classify_by_rules("Test query") is None
+
+
+class TestTfidfLogisticModel:
+    """Test cases for the trainable model."""
+
+    def test_fit_separates_classes(self):
+        """Test that the model learns the training verdicts."""
+        model = TfidfLogisticModel.fit(GRAPHABLE + NON_GRAPHABLE, [1] * 8 + [0] * 8)
+
+        assert model.predict_proba("top 10 countries by population") > 0.5
+        assert model.predict_proba("what is democracy") < 0.5
+
+    def test_round_trip(self):
+        """Test that a model survives serialization."""
+        model = TfidfLogisticModel.fit(GRAPHABLE + NON_GRAPHABLE, [1] * 8 + [0] * 8)
+        restored = TfidfLogisticModel.from_dict(json.loads(json.dumps(model.to_dict())))
+
+        assert restored.predict_proba("sales by month") == model.predict_proba("sales by month")
+
+    def test_train_from_log(self, tmp_path):
+        """Test training from a logged verdict file."""
+        log_path = tmp_path / "log.jsonl"
+        classifier = LocalQueryClassifier(log_path=str(log_path))
+        for query in GRAPHABLE:
+            classifier.log_verdict(query, "Yes")
+        for query in NON_GRAPHABLE:
+            classifier.log_verdict(query, "No")
+
+        model_path = tmp_path / "model.json"
+        assert train_from_log(str(log_path), str(model_path), min_examples=10) is not None
+        assert model_path.exists()
+        assert train_from_log(str(log_path), str(model_path), min_examples=100) is None
+
+
+class TestQueryFilteringFastPath:
+    """Test cases for query_filtering_node with the local tier."""
+
+    @patch('src.nodes.query_filtering.get_llm')
+    def test_confident_local_verdict_skips_llm(self, mock_get_llm, sample_state):
+        """Test that rule hits never reach the LLM."""
+        state = {**sample_state, "user_query": "How to install Python"}
+
+        result = query_filtering_node(state)
+
+        assert result["can_generate_graph"] == "No"
+        mock_get_llm.return_value.invoke.assert_not_called()
+
+    @patch('src.nodes.query_filtering.get_query_classifier')
+    @patch('src.nodes.query_filtering.get_llm')
+    def test_llm_verdict_is_logged(self, mock_get_llm, mock_get_classifier, sample_state, tmp_path):
+        """Test that low-confidence queries fall back to the LLM and are logged."""
+        log_path = tmp_path / "log.jsonl"
+        mock_get_classifier.return_value = LocalQueryClassifier(log_path=str(log_path))
+        mock_get_llm.return_value.invoke.return_value = Mock(content='{"can_generate_graph": "Yes"}')
+
+        result = query_filtering_node(sample_state)
+
+        assert result["can_generate_graph"] == "Yes"
+        assert json.loads(log_path.read_text()) == {"user_query": "Test query", "can_generate_graph": "Yes"}
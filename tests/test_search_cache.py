@@ -0,0 +1,90 @@
+"""
+Unit tests for the web search result cache.
+"""
+
+import asyncio
+import time
+from unittest.mock import Mock
+from src.search_cache import SearchResultCache, normalize_query, FRESH
+
+
+class TestNormalizeQuery:
+    """Test cases for query normalization."""
+
+    def test_folds_case_whitespace_and_trailing_punctuation(self):
+        """Test that cosmetic differences map to one key."""
+        assert normalize_query("  Top 10 countries by GDP?! ") == "top 10 countries by gdp"
+        assert normalize_query("top   10 countries\tby ＧＤＰ.") == "top 10 countries by gdp"
+
+    def test_keeps_meaningful_punctuation(self):
+        """Test that signs, decimal separators and percent signs stay distinct."""
+        assert normalize_query("GDP growth below -2%") != normalize_query("GDP growth below 2%")
+        assert len({normalize_query(q) for q in ("rate above 2.5", "rate above 2,5", "rate above 2 5")}) == 3
+
+
+class TestSearchResultCache:
+    """Test cases for SearchResultCache."""
+
+    def test_miss_then_fresh_hit(self):
+        """Test that a second lookup is served without fetching."""
+        cache = SearchResultCache()
+        fetch = Mock(return_value="results")
+
+        assert cache.get_or_fetch("GDP by country", fetch) == "results"
+        assert cache.get_or_fetch("gdp by country!", fetch) == "results"
+        fetch.assert_called_once()
+        assert cache.stats["fresh_hits"] == 1
+
+    def test_stale_entry_served_and_refreshed(self):
+        """Test stale-while-revalidate on the thread pool."""
+        cache = SearchResultCache(fresh_ttl=0, stale_ttl=60)
+        cache.put("q", "old")
+        fetch = Mock(return_value="new")
+
+        assert cache.get_or_fetch("q", fetch) == "old"
+        cache.close()
+        assert cache.get("q")[0] == "new"
+        assert cache.stats["refreshes"] == 1
+
+    def test_expired_entry_is_a_miss(self):
+        """Test that entries beyond stale_ttl are refetched synchronously."""
+        cache = SearchResultCache(fresh_ttl=0, stale_ttl=0)
+        cache.put("q", "old")
+        time.sleep(0.01)
+
+        assert cache.get("q") == (None, None)
+        assert cache.get_or_fetch("q", Mock(return_value="new")) == "new"
+
+    def test_failures_are_not_cached(self):
+        """Test that a raising fetch leaves the cache empty."""
+        cache = SearchResultCache()
+        fetch = Mock(side_effect=RuntimeError("boom"))
+
+        try:
+            cache.get_or_fetch("q", fetch)
+        except RuntimeError:
+            pass
+        assert cache.get("q") == (None, None)
+
+    def test_sqlite_backing_store(self, tmp_path):
+        """Test that results persist across cache instances."""
+        path = str(tmp_path / "search.sqlite")
+        SearchResultCache(sqlite_path=path).put("q", "results")
+
+        assert SearchResultCache(sqlite_path=path).get("Q") == ("results", FRESH)
+
+    def test_async_stale_refresh(self):
+        """Test that the async path refreshes stale entries as a task."""
+        cache = SearchResultCache(fresh_ttl=0, stale_ttl=60)
+        cache.put("q", "old")
+
+        async def fetch(query):
+            return "new"
+
+        async def run():
+            first = await cache.aget_or_fetch("q", fetch)
+            await asyncio.gather(*cache._tasks)
+            return first
+
+        assert asyncio.run(run()) == "old"
+        assert cache.get("q")[0] == "new"
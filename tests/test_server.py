@@ -0,0 +1,175 @@
+"""
+Unit tests for the ASGI workflow service.
+"""
+
+import asyncio
+import json
+import httpx
+from unittest.mock import AsyncMock, Mock, patch
+from langchain_core.runnables import RunnableLambda
+from src.server import create_app
+from src.workflows.conditional_graph_workflow import create_conditional_graph_workflow
+
+
+def stub_workflow(delay=0.0, figure=None):
+    """A stand-in compiled workflow that echoes the query after `delay` seconds."""
+
+    async def run(state):
+        await asyncio.sleep(delay)
+        result = {**state, "response": f"answer to {state['user_query']}"}
+        if figure is not None:
+            result.update(can_generate_graph="Yes", selected_graph_type="bar_graph", graph_json=json.dumps(figure))
+        return result
+
+    return RunnableLambda(lambda state: state, afunc=run)
+
+
+def make_app(workflows=None, **settings):
+    return create_app(
+        workflows=workflows or {"simple_chat": stub_workflow()},
+        settings={"warm_start": False, **settings},
+        initial_state=lambda name, query: {"user_query": query},
+    )
+
+
+async def post(app, name, body, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(f"/v1/workflows/{name}", json=body, headers=headers)
+
+
+async def get(app, path):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+class TestRoutes:
+    """Test cases for routing and request validation."""
+
+    def test_runs_workflow(self):
+        """Test a successful run returns the workflow response."""
+        response = asyncio.run(post(make_app(), "simple_chat", {"query": "hello"}))
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["workflow"] == "simple_chat"
+        assert body["response"] == "answer to hello"
+        assert "figure" not in body
+
+    def test_figure_json_in_response(self):
+        """Test the rendered figure is embedded as JSON."""
+        figure = {"data": [{"type": "bar", "x": ["a"], "y": [1]}], "layout": {"title": {"text": "t"}}}
+        app = make_app({"conditional": stub_workflow(figure=figure)})
+
+        body = asyncio.run(post(app, "conditional", {"query": "GDP"})).json()
+
+        assert body["figure"] == figure
+        assert body["selected_graph_type"] == "bar_graph"
+
+    def test_errors(self):
+        """Test 400, 404, 405 and 413 responses."""
+        app = make_app(max_body_bytes=64)
+
+        async def run():
+            return (
+                await post(app, "simple_chat", {"question": "hello"}),
+                await post(app, "missing", {"query": "hello"}),
+                await get(app, "/v1/workflows/simple_chat"),
+                await post(app, "simple_chat", {"query": "x" * 100}),
+                await get(app, "/v1/workflows"),
+            )
+
+        bad, missing, wrong_method, too_large, listing = asyncio.run(run())
+
+        assert bad.status_code == 400
+        assert missing.status_code == 404
+        assert wrong_method.status_code == 405
+        assert too_large.status_code == 413
+        assert listing.json() == {"workflows": ["simple_chat"]}
+
+
+class TestAdmission:
+    """Test cases for overload handling and timeouts."""
+
+    def test_queue_full_returns_429(self):
+        """Test requests beyond in-flight plus queue capacity are rejected."""
+        app = make_app({"simple_chat": stub_workflow(delay=0.2)}, max_in_flight=1, max_queue=1, per_client_limit=10)
+
+        async def run():
+            return await asyncio.gather(*(post(app, "simple_chat", {"query": f"q{i}"}) for i in range(3)))
+
+        statuses = sorted(response.status_code for response in asyncio.run(run()))
+
+        assert statuses == [200, 200, 429]
+
+    def test_per_client_limit(self):
+        """Test one client cannot take more than its share of slots."""
+        app = make_app({"simple_chat": stub_workflow(delay=0.2)}, per_client_limit=1, trusted_client_id_peers=["127.0.0.1"])
+
+        async def run():
+            return await asyncio.gather(
+                post(app, "simple_chat", {"query": "a"}, headers={"x-client-id": "alice"}),
+                post(app, "simple_chat", {"query": "b"}, headers={"x-client-id": "alice"}),
+                post(app, "simple_chat", {"query": "c"}, headers={"x-client-id": "bob"}),
+            )
+
+        alice_1, alice_2, bob = asyncio.run(run())
+
+        assert sorted([alice_1.status_code, alice_2.status_code]) == [200, 429]
+        assert alice_2.headers.get("retry-after") or alice_1.headers.get("retry-after")
+        assert bob.status_code == 200
+        assert app.admission.stats() == {"in_flight": 0, "queued": 0, "clients": 0}
+
+    def test_client_id_header_ignored_from_untrusted_peers(self):
+        """Test that rotating X-Client-Id does not get around the per-client limit."""
+        app = make_app({"simple_chat": stub_workflow(delay=0.2)}, per_client_limit=1)
+
+        async def run():
+            return await asyncio.gather(*(
+                post(app, "simple_chat", {"query": str(i)}, headers={"x-client-id": f"client-{i}"})
+                for i in range(3)
+            ))
+
+        statuses = sorted(response.status_code for response in asyncio.run(run()))
+
+        assert statuses == [200, 429, 429]
+
+    def test_request_timeout(self):
+        """Test slow workflows are cancelled with 504 and release their slot."""
+        app = make_app({"simple_chat": stub_workflow(delay=1.0)}, request_timeout=0.05)
+
+        response = asyncio.run(post(app, "simple_chat", {"query": "slow"}))
+
+        assert response.status_code == 504
+        assert app.admission.in_flight == 0
+
+
+class TestEndToEnd:
+    """Test the service over the real conditional workflow with stubbed backends."""
+
+    @patch('src.nodes.web_search_context.get_llm')
+    @patch('src.nodes.web_search._asearch', new_callable=AsyncMock, return_value="search results")
+    @patch('src.nodes.query_filtering._classify_locally', return_value="Yes")
+    def test_conditional_workflow(self, mock_classify, mock_search, mock_get_llm):
+        """Test a graph query returns the rendered figure."""
+        data = {
+            "col_names": ["Country", "Population"],
+            "Country": {"dtype": "str", "values": ["USA", "China", "India"]},
+            "Population": {"dtype": "int", "values": [331, 1441, 1380]},
+        }
+        mock_llm = Mock()
+        mock_llm.ainvoke = AsyncMock(return_value=Mock(content=json.dumps(data)))
+        mock_get_llm.return_value = mock_llm
+        app = create_app(
+            workflows={"conditional": create_conditional_graph_workflow(drop_intermediates=True)},
+            settings={"warm_start": False},
+        )
+
+        response = asyncio.run(post(app, "conditional", {"query": "Population by country"}))
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["can_generate_graph"] == "Yes"
+        assert body["figure"]["data"][0]["x"] == ["USA", "China", "India"]
+        assert "search_results" not in body
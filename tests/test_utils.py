@@ -0,0 +1,105 @@
+"""
+Unit tests for LLM provisioning utilities.
+"""
+
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from src.utils import LLMProvisioner, get_llm, get_search_client, get_search_config
+
+
+@pytest.fixture
+def llm_pool(monkeypatch):
+    """Give each test a dummy API key; the pool itself is reset by conftest."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    return LLMProvisioner
+
+
+class TestLLMProvisioner:
+    """Test cases for the keyed LLM client pool."""
+
+    def test_same_profile_returns_pooled_instance(self, llm_pool):
+        """Test that repeated calls with the same profile reuse one client."""
+        assert get_llm() is get_llm()
+
+    def test_profiles_get_distinct_models(self, llm_pool):
+        """Test that a different model_id yields its own client."""
+        default_llm = get_llm()
+        mini_llm = get_llm(model_id="o4-mini-2025-04-16", model_kwargs={"temperature": 1})
+
+        assert default_llm is not mini_llm
+        assert default_llm.model_name == "gpt-4o"
+        assert mini_llm.model_name == "o4-mini-2025-04-16"
+
+    def test_model_kwargs_are_part_of_pool_key(self, llm_pool):
+        """Test that kwargs order does not matter but values do."""
+        a = get_llm(model_id="gpt-4o", model_kwargs={"temperature": 0, "max_tokens": 10})
+        b = get_llm(model_id="gpt-4o", model_kwargs={"max_tokens": 10, "temperature": 0})
+        c = get_llm(model_id="gpt-4o", model_kwargs={"temperature": 0.5})
+
+        assert a is b
+        assert a is not c
+
+    def test_clients_share_http_transport(self, llm_pool):
+        """Test that all pooled clients use the same HTTP connection pool."""
+        a = get_llm()
+        b = get_llm(model_id="o4-mini-2025-04-16")
+
+        assert a.http_client is b.http_client
+        assert a.http_async_client is b.http_async_client
+
+    def test_reset_closes_both_http_clients(self, llm_pool):
+        """Test that reset closes the async transport as well as the sync one."""
+        http_client, http_async_client = LLMProvisioner._get_http_clients()
+
+        LLMProvisioner.reset()
+
+        assert http_client.is_closed
+        assert http_async_client.is_closed
+
+    def test_reset_closes_async_client_on_its_loop(self, llm_pool):
+        """Test that the async client is closed on the loop that owns its connections."""
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            _, http_async_client = LLMProvisioner._get_http_clients()
+            asyncio.run_coroutine_threadsafe(LLMProvisioner._record_async_loop(None), loop).result()
+            assert LLMProvisioner._http_async_loop is loop
+
+            LLMProvisioner.reset()
+
+            assert http_async_client.is_closed
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+class TestSearchClientProvisioner:
+    """Test cases for the pooled web search client."""
+
+    def test_search_client_is_reused(self, llm_pool):
+        """Test that every caller gets the same process-wide client."""
+        client = get_search_client()
+
+        assert client is get_search_client()
+        assert client._client is LLMProvisioner._get_http_clients()[0]
+
+    def test_search_model_comes_from_config(self, llm_pool):
+        """Test that the search model is read from llm_config.yaml."""
+        assert get_search_config()["model_id"] == "gpt-4.1"
+
+    @patch('src.nodes.web_search.get_search_client')
+    def test_web_search_node_uses_pooled_client(self, mock_get_client, sample_state):
+        """Test that web_search_node calls the shared client with the configured model."""
+        from src.nodes.web_search import web_search_node
+
+        mock_get_client.return_value.responses.create.return_value = Mock(output_text="results")
+
+        result = web_search_node(sample_state)
+
+        assert result["search_results"] == "results"
+        kwargs = mock_get_client.return_value.responses.create.call_args.kwargs
+        assert kwargs["model"] == get_search_config()["model_id"]